@@ -0,0 +1,311 @@
+"""
+Архив объектов: много именованных pickle-объектов в одном файле
+"""
+import os
+import pickle
+import struct
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from serialization import PickleSerializer
+
+ARCHIVE_MAGIC = b'OARC'
+ARCHIVE_VERSION = 1
+INDEX_VERSION = 1
+
+# Заголовок файла: сигнатура, версия, поколение (увеличивается при compact)
+_FILE_HEADER = struct.Struct('<4sBQ')
+# Заголовок записи: тип, длина имени, длина данных
+_RECORD_HEADER = struct.Struct('<BHI')
+_RECORD_PUT = 0
+_RECORD_DELETE = 1
+
+
+class ObjectArchive:
+    """Хранилище именованных объектов в одном файле с индексом смещений
+    
+    Объекты дописываются в конец файла данных записями
+    ``<тип><длина имени><длина данных><имя><pickle>``; удаление - запись-
+    надгробие. Индекс имя -> (смещение, длина) хранится в памяти и
+    сохраняется рядом (``<файл>.idx``) при ``flush``/``close``. При открытии
+    индекс читается из файла и дополняется записями, дописанными после его
+    сохранения, поэтому архив переживает аварийное завершение без потерь
+    (оборванная последняя запись отбрасывается). Индекс привязан к
+    поколению файла данных из его заголовка: индекс от другого поколения
+    (например, если процесс прервался внутри ``compact``) отбрасывается,
+    и индекс строится заново сканированием файла.
+    
+    ``get`` - одно обращение к словарю и одно чтение с диска. Место,
+    занятое перезаписанными и удалёнными объектами, освобождает ``compact``.
+    """
+    
+    def __init__(self, filename: str, directory: str = 'data'):
+        """
+        Args:
+            filename: Название файла архива
+            directory: Директория
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.index_path = self.path + '.idx'
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._garbage = 0
+        self._generation = 0
+        self._open()
+    
+    # --- Открытие и индекс ------------------------------------------------
+    
+    def _open(self) -> None:
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self._file = open(self.path, 'r+b' if exists else 'w+b')
+        if not exists:
+            self._file.write(_FILE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0))
+            self._end = _FILE_HEADER.size
+            self._index_valid_upto = 0
+            return
+        
+        header = self._file.read(_FILE_HEADER.size)
+        if len(header) < _FILE_HEADER.size:
+            self._file.close()
+            raise pickle.UnpicklingError(f"{self.path}: файл слишком короткий")
+        magic, version, self._generation = _FILE_HEADER.unpack(header)
+        if magic != ARCHIVE_MAGIC:
+            self._file.close()
+            raise pickle.UnpicklingError(f"{self.path}: не файл архива")
+        if version > ARCHIVE_VERSION:
+            self._file.close()
+            raise pickle.UnpicklingError(f"{self.path}: неподдерживаемая версия {version}")
+        
+        size = os.fstat(self._file.fileno()).st_size
+        start = _FILE_HEADER.size
+        saved = self._load_index(size)
+        if saved is not None:
+            self._index, self._garbage, start = saved
+        self._end = self._scan(start, size)
+        self._index_valid_upto = start if saved is not None else 0
+    
+    def _load_index(self, size: int) -> Optional[Tuple[Dict[str, Tuple[int, int]], int, int]]:
+        """Прочитать сохранённый индекс, если он относится к текущему файлу данных
+        
+        Индекс - только кэш: любой повреждённый, чужой или устаревший файл
+        индекса игнорируется, и записи перечитываются из файла данных.
+        """
+        try:
+            with open(self.index_path, 'rb') as f:
+                saved = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(saved, dict):
+            return None
+        entries = saved.get('entries')
+        garbage = saved.get('garbage')
+        valid_upto = saved.get('valid_upto')
+        if (saved.get('version') != INDEX_VERSION or saved.get('generation') != self._generation
+                or not isinstance(entries, dict) or not isinstance(garbage, int)
+                or not isinstance(valid_upto, int) or valid_upto > size):
+            return None
+        return entries, garbage, valid_upto
+    
+    def _scan(self, start: int, size: int) -> int:
+        """Дополнить индекс записями из [start, size); оборванный хвост отбрасывается
+        
+        Returns:
+            Смещение конца последней целой записи
+        """
+        f = self._file
+        f.seek(start)
+        pos = start
+        index = self._index
+        header_size = _RECORD_HEADER.size
+        while pos < size:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                break
+            kind, name_len, data_len = _RECORD_HEADER.unpack(header)
+            end = pos + header_size + name_len + data_len
+            if end > size:
+                break
+            name = f.read(name_len).decode('utf-8')
+            f.seek(data_len, os.SEEK_CUR)
+            old = index.pop(name, None)
+            if old is not None:
+                self._garbage += old[1]
+            if kind == _RECORD_PUT:
+                index[name] = (pos + header_size + name_len, data_len)
+            else:
+                self._garbage += end - pos
+            pos = end
+        if pos < size:
+            f.truncate(pos)
+        return pos
+    
+    def _write_index(self) -> None:
+        state = {
+            'version': INDEX_VERSION,
+            'generation': self._generation,
+            'valid_upto': self._end,
+            'garbage': self._garbage,
+            'entries': self._index,
+        }
+        with open(self.index_path + '.tmp', 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.index_path + '.tmp', self.index_path)
+        self._index_valid_upto = self._end
+    
+    # --- Запись -----------------------------------------------------------
+    
+    def _append(self, kind: int, name: str, payload: bytes = b'') -> int:
+        encoded = name.encode('utf-8')
+        if len(encoded) > 0xFFFF:
+            raise ValueError("Имя объекта длиннее 65535 байт")
+        f = self._file
+        f.seek(self._end)
+        f.write(_RECORD_HEADER.pack(kind, len(encoded), len(payload)))
+        f.write(encoded)
+        f.write(payload)
+        data_offset = self._end + _RECORD_HEADER.size + len(encoded)
+        self._end = data_offset + len(payload)
+        return data_offset
+    
+    def put(self, name: str, obj: Any) -> None:
+        """Сохранить объект под именем (старая версия становится мусором)
+        
+        Args:
+            name: Имя объекта
+            obj: Объект
+        """
+        payload = PickleSerializer.serialize_to_bytes(obj)
+        offset = self._append(_RECORD_PUT, name, payload)
+        old = self._index.get(name)
+        if old is not None:
+            self._garbage += old[1]
+        self._index[name] = (offset, len(payload))
+    
+    def delete(self, name: str) -> bool:
+        """Удалить объект (в файл дописывается надгробие)
+        
+        Returns:
+            True, если объект был в архиве
+        """
+        old = self._index.pop(name, None)
+        if old is None:
+            return False
+        start = self._end
+        self._append(_RECORD_DELETE, name)
+        self._garbage += old[1] + (self._end - start)
+        return True
+    
+    # --- Чтение -----------------------------------------------------------
+    
+    def get_bytes(self, name: str) -> bytes:
+        """Pickle-представление объекта без десериализации
+        
+        Raises:
+            KeyError: Объекта нет
+        """
+        offset, length = self._index[name]
+        f = self._file
+        f.seek(offset)
+        return f.read(length)
+    
+    def get(self, name: str, default: Any = None) -> Any:
+        """Объект по имени или ``default``"""
+        if name not in self._index:
+            return default
+        return PickleSerializer.deserialize_from_bytes(self.get_bytes(name))
+    
+    def __getitem__(self, name: str) -> Any:
+        return PickleSerializer.deserialize_from_bytes(self.get_bytes(name))
+    
+    def __setitem__(self, name: str, obj: Any) -> None:
+        self.put(name, obj)
+    
+    def __delitem__(self, name: str) -> None:
+        if not self.delete(name):
+            raise KeyError(name)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __iter__(self) -> Iterator[str]:
+        """Имена объектов (без чтения данных)"""
+        return iter(list(self._index))
+    
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Пары (имя, объект); объекты читаются по одному в порядке файла"""
+        for name, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+            yield name, self[name]
+    
+    @property
+    def garbage_bytes(self) -> int:
+        """Байт, занятых перезаписанными и удалёнными объектами"""
+        return self._garbage
+    
+    @property
+    def size(self) -> int:
+        """Размер файла данных"""
+        return self._end
+    
+    # --- Обслуживание -----------------------------------------------------
+    
+    def compact(self) -> int:
+        """Переписать архив, оставив только живые объекты
+        
+        Новый файл со следующим поколением пишется рядом, сбрасывается на
+        диск и атомарно подменяет старый; индекс старого поколения после
+        этого недействителен, даже если не успел обновиться.
+        
+        Returns:
+            Количество освобождённых байт
+        """
+        old_size = self._end
+        tmp_path = self.path + '.compact'
+        generation = self._generation + 1
+        index: Dict[str, Tuple[int, int]] = {}
+        with open(tmp_path, 'wb') as out:
+            out.write(_FILE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, generation))
+            pos = _FILE_HEADER.size
+            for name, (offset, length) in sorted(self._index.items(), key=lambda item: item[1][0]):
+                encoded = name.encode('utf-8')
+                out.write(_RECORD_HEADER.pack(_RECORD_PUT, len(encoded), length))
+                out.write(encoded)
+                out.write(self.get_bytes(name))
+                index[name] = (pos + _RECORD_HEADER.size + len(encoded), length)
+                pos += _RECORD_HEADER.size + len(encoded) + length
+            out.flush()
+            os.fsync(out.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'r+b')
+        self._generation = generation
+        self._index = index
+        self._garbage = 0
+        self._end = pos
+        self._write_index()
+        return old_size - pos
+    
+    def flush(self) -> None:
+        """Сбросить данные на диск и сохранить индекс"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._index_valid_upto != self._end:
+            self._write_index()
+    
+    def close(self) -> None:
+        """Сохранить индекс и закрыть файл"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+    
+    def __enter__(self) -> 'ObjectArchive':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __repr__(self) -> str:
+        return f"ObjectArchive('{self.path}', objects={len(self._index)}, garbage={self._garbage})"
@@ -0,0 +1,201 @@
+"""
+Асинхронные обёртки для файловых операций и сериализаторов
+"""
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import file_operations
+from serialization import JSONSerializer, PickleSerializer
+
+
+class AsyncFileIO:
+    """Асинхронный доступ к файлам через ограниченный пул потоков
+    
+    Блокирующие вызовы ``file_operations`` и сериализаторов выполняются в
+    собственном ``ThreadPoolExecutor`` и не блокируют цикл событий.
+    Одновременно в пул передаётся не больше ``max_concurrency`` вызовов:
+    остальные ждут на семафоре и при отмене снимаются, не начав работу.
+    Семафор создаётся для каждого цикла событий отдельно, поэтому один
+    экземпляр можно использовать из нескольких ``asyncio.run``; лимит
+    действует в пределах цикла.
+    Вызов, уже выполняющийся в потоке, прервать нельзя - отмена лишь
+    перестаёт ждать его результат.
+    
+    Типичное использование::
+    
+        async with AsyncFileIO(max_workers=8) as aio:
+            data = await aio.read_binary("user.bin")
+            blobs = await aio.read_many(["a.bin", "b.bin"])
+    """
+    
+    def __init__(self, max_workers: int = 8, max_concurrency: Optional[int] = None):
+        """
+        Args:
+            max_workers: Размер пула потоков
+            max_concurrency: Сколько вызовов может ждать в пуле одновременно
+                (None - равно max_workers)
+        
+        Raises:
+            ValueError: max_workers или max_concurrency меньше 1
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers должен быть не меньше 1")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency должен быть не меньше 1")
+        self.max_workers = max_workers
+        self.max_concurrency = max_workers if max_concurrency is None else max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='async-file-io')
+        # Семафоры по циклам событий: asyncio.Semaphore привязывается к циклу
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+    
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Выполнить блокирующую функцию в пуле с учётом лимита
+        
+        Args:
+            func: Функция
+            *args: Позиционные аргументы
+            **kwargs: Именованные аргументы
+        
+        Returns:
+            Результат функции
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs))
+    
+    # --- Файловые операции ----------------------------------------------
+    
+    async def read_text(self, filename: str, directory: str = 'data') -> str:
+        """Асинхронный ``read_text``"""
+        return await self.run(file_operations.read_text, filename, directory)
+    
+    async def write_text(self, filename: str, content: str, directory: str = 'data') -> None:
+        """Асинхронный ``write_text``"""
+        await self.run(file_operations.write_text, filename, content, directory)
+    
+    async def read_binary(self, filename: str, directory: str = 'data') -> bytes:
+        """Асинхронный ``read_binary``"""
+        return await self.run(file_operations.read_binary, filename, directory)
+    
+    async def write_binary(self, filename: str, data: bytes, directory: str = 'data') -> None:
+        """Асинхронный ``write_binary``"""
+        await self.run(file_operations.write_binary, filename, data, directory)
+    
+    async def delete_file(self, filename: str, directory: str = 'data') -> bool:
+        """Асинхронный ``delete_file``"""
+        return await self.run(file_operations.delete_file, filename, directory)
+    
+    # --- Сериализаторы --------------------------------------------------
+    
+    async def serialize_pickle(self, obj: Any, filename: str, directory: str = 'data',
+                               **kwargs) -> None:
+        """Асинхронный ``PickleSerializer.serialize``"""
+        await self.run(PickleSerializer.serialize, obj, filename, directory, **kwargs)
+    
+    async def deserialize_pickle(self, filename: str, directory: str = 'data') -> Any:
+        """Асинхронный ``PickleSerializer.deserialize``"""
+        return await self.run(PickleSerializer.deserialize, filename, directory)
+    
+    async def serialize_json(self, obj: Any, filename: str, directory: str = 'data',
+                             **kwargs) -> None:
+        """Асинхронный ``JSONSerializer.serialize``"""
+        await self.run(JSONSerializer.serialize, obj, filename, directory, **kwargs)
+    
+    async def deserialize_json(self, filename: str, directory: str = 'data') -> Any:
+        """Асинхронный ``JSONSerializer.deserialize``"""
+        return await self.run(JSONSerializer.deserialize, filename, directory)
+    
+    # --- Пакетные операции ----------------------------------------------
+    
+    async def gather(self, calls: Iterable[Tuple[Callable[..., Any], tuple]],
+                     return_exceptions: bool = False) -> List[Any]:
+        """Выполнить набор вызовов конкурентно с учётом лимита
+        
+        При первой ошибке (если ``return_exceptions`` выключен) или при
+        отмене самого ``gather`` ещё не завершённые вызовы отменяются.
+        
+        Args:
+            calls: Пары (функция, аргументы)
+            return_exceptions: Возвращать исключения в результатах, а не бросать
+        
+        Returns:
+            Результаты в порядке вызовов
+        """
+        tasks = [asyncio.ensure_future(self.run(func, *args)) for func, args in calls]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    async def read_many(self, filenames: Iterable[str], directory: str = 'data',
+                        binary: bool = True, return_exceptions: bool = False) -> List[Any]:
+        """Прочитать несколько файлов конкурентно
+        
+        Args:
+            filenames: Названия файлов
+            directory: Директория
+            binary: Читать через ``read_binary`` (иначе ``read_text``)
+            return_exceptions: Возвращать исключения в результатах, а не бросать
+        
+        Returns:
+            Содержимое файлов в порядке названий
+        """
+        read = file_operations.read_binary if binary else file_operations.read_text
+        return await self.gather(((read, (name, directory)) for name in filenames),
+                                 return_exceptions)
+    
+    async def write_many(self, items: Iterable[Tuple[str, Any]], directory: str = 'data',
+                         return_exceptions: bool = False) -> List[Any]:
+        """Записать несколько файлов конкурентно
+        
+        Args:
+            items: Пары (название файла, данные); bytes пишутся через
+                ``write_binary``, str - через ``write_text``
+            directory: Директория
+            return_exceptions: Возвращать исключения в результатах, а не бросать
+        
+        Returns:
+            Результаты записи (None или исключения) в порядке файлов
+        """
+        calls = (
+            (file_operations.write_text if isinstance(data, str) else file_operations.write_binary,
+             (name, data, directory))
+            for name, data in items
+        )
+        return await self.gather(calls, return_exceptions)
+    
+    async def deserialize_many(self, filenames: Iterable[str], directory: str = 'data',
+                               return_exceptions: bool = False) -> List[Any]:
+        """Десериализовать несколько pickle-файлов конкурентно"""
+        return await self.gather(
+            ((PickleSerializer.deserialize, (name, directory)) for name in filenames),
+            return_exceptions)
+    
+    # --- Жизненный цикл -------------------------------------------------
+    
+    def close(self, cancel_pending: bool = True) -> None:
+        """Остановить пул потоков
+        
+        Args:
+            cancel_pending: Отменить вызовы, ещё не начавшие выполняться
+        """
+        self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+    
+    async def __aenter__(self) -> 'AsyncFileIO':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __repr__(self) -> str:
+        return f"AsyncFileIO(max_workers={self.max_workers}, max_concurrency={self.max_concurrency})"
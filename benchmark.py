@@ -0,0 +1,308 @@
+"""
+Замеры производительности сериализации, файловых операций и Database
+
+Запуск::
+
+    python benchmark.py --scale 10K --output data/bench.json
+    python benchmark.py --scale 10K --baseline data/bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from file_operations import read_binary, write_binary
+from models import Database, Order, Product, User
+from serialization import JSONSerializer, PickleSerializer
+
+# Фиксированный момент создания записей, чтобы данные не зависели от часов
+_BASE_CREATED_US = 1_700_000_000_000_000
+
+_SUFFIXES = {'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}
+
+
+def parse_size(value: str) -> int:
+    """Разобрать число с суффиксом K/M/G ('10K' -> 10000)"""
+    value = value.strip().upper()
+    if value and value[-1] in _SUFFIXES:
+        return int(float(value[:-1]) * _SUFFIXES[value[-1]])
+    return int(value)
+
+
+def generate_database(users: int, products: Optional[int] = None,
+                      orders: Optional[int] = None, seed: int = 0) -> Database:
+    """Сгенерировать детерминированную базу заданного размера
+    
+    Одинаковые аргументы всегда дают одинаковые данные, включая
+    ``created_at`` и статусы заказов.
+    
+    Args:
+        users: Количество пользователей
+        products: Количество продуктов (по умолчанию равно users)
+        orders: Количество заказов (по умолчанию равно users)
+        seed: Зерно генератора случайных чисел
+    
+    Returns:
+        Заполненная база
+    """
+    products = users if products is None else products
+    orders = users if orders is None else orders
+    rng = random.Random(seed)
+    db = Database()
+    
+    def make_users():
+        for i in range(users):
+            user = User(i, f"User {i}", f"user{i}@example.com")
+            user._created_us = _BASE_CREATED_US + i * 1_000_000
+            yield user
+    
+    def make_products():
+        for i in range(products):
+            yield Product(i, f"Product {i % 1000}",
+                          round(rng.uniform(1, 1000), 2), rng.randrange(0, 500))
+    
+    db.add_users(make_users())
+    db.add_products(make_products())
+    if orders and (not users or not products):
+        raise ValueError("Для заказов нужны пользователи и продукты")
+    
+    def make_orders():
+        for i in range(orders):
+            items = [db.products[rng.randrange(products)] for _ in range(rng.randint(1, 4))]
+            order = Order(i, db.users[rng.randrange(users)], items,
+                          round(sum(p.price for p in items), 2))
+            order._created_us = _BASE_CREATED_US + i * 500_000
+            status = rng.random()
+            if status < 0.6:
+                order.complete()
+            elif status < 0.7:
+                order.cancel()
+            yield order
+    
+    db.add_orders(make_orders())
+    return db
+
+
+class BenchmarkResult(NamedTuple):
+    """Результат одного замера
+    
+    Attributes:
+        name: Название замера
+        seconds: Лучшее время из повторов, сек
+        ops: Количество операций (записей, вызовов) за прогон
+        nbytes: Объём данных за прогон, байт
+    """
+    name: str
+    seconds: float
+    ops: int
+    nbytes: int
+
+
+def _best_of(repeat: int, func: Callable[[], None]) -> float:
+    """Лучшее время из ``repeat`` прогонов"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_database(db: Database, repeat: int) -> List[BenchmarkResult]:
+    """Замеры вставки и поиска в Database"""
+    users = db.users
+    count = len(users)
+    rng = random.Random(1)
+    lookups = [rng.randrange(count) for _ in range(min(count, 100_000))] if count else []
+    
+    def insert_bulk():
+        Database().add_users(users)
+    
+    def insert_one_by_one():
+        target = Database()
+        for user in users:
+            target.add_user(user)
+    
+    def lookup():
+        get_user = db.get_user
+        for user_id in lookups:
+            get_user(user_id)
+    
+    return [
+        BenchmarkResult('database.add_users', _best_of(repeat, insert_bulk), count, 0),
+        BenchmarkResult('database.add_user', _best_of(repeat, insert_one_by_one), count, 0),
+        BenchmarkResult('database.get_user', _best_of(repeat, lookup), len(lookups), 0),
+    ]
+
+
+def bench_serializers(db: Database, directory: str, repeat: int) -> List[BenchmarkResult]:
+    """Замеры записи и чтения Database через PickleSerializer и JSONSerializer"""
+    records = len(db.users) + len(db.products) + len(db.orders)
+    rows = [[u.user_id, u.name, u.email] for u in db.users]
+    pickle_path = os.path.join(directory, 'bench.pkl')
+    json_path = os.path.join(directory, 'bench.json')
+    
+    pickle_write = _best_of(repeat, lambda: PickleSerializer.serialize(db, 'bench.pkl', directory))
+    pickle_size = os.path.getsize(pickle_path)
+    results = [BenchmarkResult('pickle.serialize', pickle_write, records, pickle_size)]
+    results.append(BenchmarkResult('pickle.deserialize', _best_of(
+        repeat, lambda: PickleSerializer.deserialize('bench.pkl', directory)), records, pickle_size))
+    
+    json_write = _best_of(repeat, lambda: JSONSerializer.serialize(rows, 'bench.json', directory))
+    json_size = os.path.getsize(json_path)
+    results.append(BenchmarkResult('json.serialize', json_write, len(rows), json_size))
+    results.append(BenchmarkResult('json.deserialize', _best_of(
+        repeat, lambda: JSONSerializer.deserialize('bench.json', directory)), len(rows), json_size))
+    return results
+
+
+def bench_file_operations(sizes: List[int], directory: str, repeat: int) -> List[BenchmarkResult]:
+    """Замеры write_binary / read_binary на файлах разного размера"""
+    results = []
+    for size in sizes:
+        data = os.urandom(size)
+        results.append(BenchmarkResult(f'write_binary.{size}', _best_of(
+            repeat, lambda: write_binary('bench.bin', data, directory)), 1, size))
+        results.append(BenchmarkResult(f'read_binary.{size}', _best_of(
+            repeat, lambda: read_binary('bench.bin', directory)), 1, size))
+    return results
+
+
+def run_benchmarks(users: int, sizes: List[int], repeat: int = 3, seed: int = 0,
+                   directory: Optional[str] = None) -> dict:
+    """Выполнить все замеры
+    
+    Args:
+        users: Масштаб базы (пользователей, продуктов и заказов поровну)
+        sizes: Размеры файлов для замеров файловых операций, байт
+        repeat: Количество повторов каждого замера
+        seed: Зерно генератора данных
+        directory: Рабочая директория (по умолчанию - временная)
+    
+    Returns:
+        Отчёт, пригодный для json.dump и compare_reports
+    """
+    workdir = directory or tempfile.mkdtemp(prefix='bench_')
+    try:
+        start = time.perf_counter()
+        db = generate_database(users, seed=seed)
+        generate_s = time.perf_counter() - start
+        results = [BenchmarkResult('generate_database', generate_s, users * 3, 0)]
+        results += bench_database(db, repeat)
+        results += bench_serializers(db, workdir, repeat)
+        results += bench_file_operations(sizes, workdir, repeat)
+    finally:
+        if directory is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        'meta': {
+            'users': users,
+            'sizes': sizes,
+            'repeat': repeat,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {
+            r.name: {'seconds': r.seconds, 'ops': r.ops, 'bytes': r.nbytes}
+            for r in results
+        },
+    }
+
+
+class Comparison(NamedTuple):
+    """Сравнение одного замера с базовым
+    
+    Attributes:
+        name: Название замера
+        baseline: Время в базовом отчёте, сек
+        current: Текущее время, сек
+        change: Относительное изменение (0.25 - на 25% медленнее)
+        regression: Превышен ли допустимый порог
+    """
+    name: str
+    baseline: float
+    current: float
+    change: float
+    regression: bool
+
+
+def compare_reports(current: dict, baseline: dict, threshold: float = 0.10) -> List[Comparison]:
+    """Сравнить отчёт с базовым
+    
+    Args:
+        current: Текущий отчёт ``run_benchmarks``
+        baseline: Базовый отчёт
+        threshold: Допустимое замедление (0.10 - 10%)
+    
+    Returns:
+        Сравнения для замеров, присутствующих в обоих отчётах
+    """
+    comparisons = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or base['seconds'] <= 0:
+            continue
+        change = result['seconds'] / base['seconds'] - 1
+        comparisons.append(Comparison(name, base['seconds'], result['seconds'],
+                                      change, change > threshold))
+    return comparisons
+
+
+def format_report(report: dict, comparisons: Optional[List[Comparison]] = None) -> str:
+    """Оформить отчёт текстовой таблицей"""
+    by_name: Dict[str, Comparison] = {c.name: c for c in comparisons or []}
+    lines = [f"{'Замер':<28}{'Время, мс':>12}{'Опер/с':>14}{'МБ/с':>10}{'Изм.':>9}", '-' * 73]
+    for name, result in report['results'].items():
+        seconds = result['seconds']
+        rate = f"{result['ops'] / seconds:,.0f}" if result['ops'] and seconds else '-'
+        throughput = f"{result['bytes'] / seconds / 1e6:.1f}" if result['bytes'] and seconds else '-'
+        comparison = by_name.get(name)
+        change = '-' if comparison is None else f"{comparison.change:+.0%}" + (' !' if comparison.regression else '')
+        lines.append(f"{name:<28}{seconds * 1000:>12.2f}{rate:>14}{throughput:>10}{change:>9}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры производительности")
+    parser.add_argument('--scale', default='10K',
+                        help="Пользователей/продуктов/заказов, например 1K, 100K, 10M")
+    parser.add_argument('--sizes', default='1K,1M,16M',
+                        help="Размеры файлов для read/write_binary через запятую")
+    parser.add_argument('--repeat', type=int, default=3, help="Повторов каждого замера")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора данных")
+    parser.add_argument('--output', help="Куда записать отчёт JSON")
+    parser.add_argument('--baseline', help="Базовый отчёт JSON для сравнения")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Допустимое замедление относительно базового отчёта")
+    args = parser.parse_args(argv)
+    
+    report = run_benchmarks(parse_size(args.scale),
+                            [parse_size(size) for size in args.sizes.split(',') if size],
+                            args.repeat, args.seed)
+    comparisons = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            comparisons = compare_reports(report, json.load(f), args.threshold)
+    print(format_report(report, comparisons))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    if comparisons and any(c.regression for c in comparisons):
+        print("\n✗ Обнаружены регрессии относительно базового отчёта")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Двоичные файлы записей фиксированной длины с произвольным доступом
+"""
+import os
+import struct
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Tuple
+
+from models import Product, User
+
+# Заголовок файла: <сигнатура><тип записей><размер записи>
+RECORD_MAGIC = b'FREC'
+_HEADER = struct.Struct('<4s4sI')
+
+# Сколько записей декодировать за одно чтение при последовательном обходе
+_BATCH_RECORDS = 4096
+
+
+def _pack_str(value: str, width: int, field: str) -> bytes:
+    """Закодировать строку в UTF-8 и проверить, что она помещается в поле"""
+    data = value.encode('utf-8')
+    if len(data) > width:
+        raise ValueError(f"Поле '{field}' длиннее {width} байт: {value!r}")
+    return data
+
+
+def _unpack_str(data: bytes) -> str:
+    """Декодировать строковое поле, дополненное нулями"""
+    return data.rstrip(b'\0').decode('utf-8')
+
+
+class RecordFile(ABC):
+    """Файл записей фиксированной длины
+    
+    Записи лежат друг за другом после заголовка, поэтому запись N
+    находится по смещению ``header + N * size``: чтение и обновление одной
+    записи стоят одного seek. Последовательный обход декодирует записи
+    пачками через ``struct.iter_unpack``.
+    
+    Подклассы задают ``kind`` (4 байта), скомпилированный ``record``
+    (``struct.Struct``) и методы ``_to_fields`` / ``_from_fields``.
+    """
+    
+    kind: bytes = b''
+    record: struct.Struct
+    
+    def __init__(self, filename: str, directory: str = 'data'):
+        """
+        Args:
+            filename: Название файла (создаётся, если не существует)
+            directory: Директория
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.file_path = Path(directory) / filename
+        exists = self.file_path.exists() and self.file_path.stat().st_size > 0
+        self._file = open(self.file_path, 'r+b' if exists else 'w+b')
+        if exists:
+            self._check_header()
+            size = os.fstat(self._file.fileno()).st_size
+            self._count = (size - _HEADER.size) // self.record.size
+        else:
+            self._file.write(_HEADER.pack(RECORD_MAGIC, self.kind, self.record.size))
+            self._file.flush()
+            self._count = 0
+    
+    def _check_header(self) -> None:
+        """Проверить сигнатуру, тип и размер записей"""
+        header = self._file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"'{self.file_path}' не является файлом записей")
+        magic, kind, size = _HEADER.unpack(header)
+        if magic != RECORD_MAGIC:
+            raise ValueError(f"'{self.file_path}' не является файлом записей")
+        if kind != self.kind or size != self.record.size:
+            raise ValueError(
+                f"'{self.file_path}' содержит записи {kind!r} по {size} байт, "
+                f"ожидались {self.kind!r} по {self.record.size} байт")
+    
+    @abstractmethod
+    def _to_fields(self, obj: Any) -> Tuple:
+        """Поля записи в порядке ``record``"""
+    
+    @abstractmethod
+    def _from_fields(self, fields: Tuple) -> Any:
+        """Объект из распакованных полей записи"""
+    
+    def _offset(self, index: int) -> int:
+        """Смещение записи в файле (поддерживаются отрицательные индексы)"""
+        count = self._count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"Запись {index} вне диапазона (всего {count})")
+        return _HEADER.size + index * self.record.size
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, obj: Any) -> int:
+        """Дописать запись в конец файла
+        
+        Returns:
+            Номер записанной записи
+        """
+        index = self._count
+        data = self.record.pack(*self._to_fields(obj))
+        self._file.seek(_HEADER.size + index * self.record.size)
+        self._file.write(data)
+        self._count += 1
+        return index
+    
+    def extend(self, objects: Iterable[Any]) -> int:
+        """Дописать записи пачками
+        
+        Args:
+            objects: Итерируемый объект или генератор
+        
+        Returns:
+            Количество записанных записей
+        """
+        record = self.record
+        to_fields = self._to_fields
+        self._file.seek(_HEADER.size + self._count * record.size)
+        buffer = bytearray(_BATCH_RECORDS * record.size)
+        filled = count = 0
+        for obj in objects:
+            record.pack_into(buffer, filled * record.size, *to_fields(obj))
+            filled += 1
+            if filled == _BATCH_RECORDS:
+                self._file.write(buffer)
+                self._count += filled
+                count += filled
+                filled = 0
+        if filled:
+            self._file.write(memoryview(buffer)[:filled * record.size])
+            self._count += filled
+            count += filled
+        return count
+    
+    def read(self, index: int) -> Any:
+        """Прочитать запись по номеру (один seek и одно чтение)"""
+        self._file.seek(self._offset(index))
+        return self._from_fields(self.record.unpack(self._file.read(self.record.size)))
+    
+    def update(self, index: int, obj: Any) -> None:
+        """Перезаписать запись по номеру на месте"""
+        self._file.seek(self._offset(index))
+        self._file.write(self.record.pack(*self._to_fields(obj)))
+    
+    def __getitem__(self, index: int) -> Any:
+        return self.read(index)
+    
+    def __setitem__(self, index: int, obj: Any) -> None:
+        self.update(index, obj)
+    
+    def __iter__(self) -> Iterator[Any]:
+        """Последовательно декодировать все записи пачками"""
+        record_size = self.record.size
+        iter_unpack = self.record.iter_unpack
+        from_fields = self._from_fields
+        remaining = self._count
+        offset = _HEADER.size
+        buffer = bytearray(_BATCH_RECORDS * record_size)
+        view = memoryview(buffer)
+        try:
+            while remaining:
+                batch = min(remaining, _BATCH_RECORDS) * record_size
+                self._file.seek(offset)
+                n = self._file.readinto(view[:batch])
+                if n < batch:
+                    raise ValueError(f"Обрезанный файл записей '{self.file_path}'")
+                for fields in iter_unpack(view[:batch]):
+                    yield from_fields(fields)
+                offset += batch
+                remaining -= batch // record_size
+        finally:
+            view.release()
+    
+    def flush(self) -> None:
+        """Сбросить буферы записи"""
+        self._file.flush()
+    
+    def close(self) -> None:
+        """Закрыть файл"""
+        self._file.close()
+    
+    def __enter__(self) -> 'RecordFile':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(file='{self.file_path}', records={len(self)})"
+
+
+class UserRecordFile(RecordFile):
+    """Файл записей User: ID, имя (64 байта), email (128 байт), время создания"""
+    
+    kind = b'USER'
+    record = struct.Struct('<q64s128sq')
+    
+    def _to_fields(self, user: User) -> Tuple:
+        return (user.user_id,
+                _pack_str(user.name, 64, 'name'),
+                _pack_str(user.email, 128, 'email'),
+                user._created_us)
+    
+    def _from_fields(self, fields: Tuple) -> User:
+        user_id, name, email, created_us = fields
+        user = User(user_id, _unpack_str(name), _unpack_str(email))
+        user._created_us = created_us
+        return user
+
+
+class ProductRecordFile(RecordFile):
+    """Файл записей Product: ID, название (64 байта), цена, остаток"""
+    
+    kind = b'PROD'
+    record = struct.Struct('<q64sdq')
+    
+    def _to_fields(self, product: Product) -> Tuple:
+        return (product.product_id,
+                _pack_str(product.name, 64, 'name'),
+                product.price,
+                product.stock)
+    
+    def _from_fields(self, fields: Tuple) -> Product:
+        product_id, name, price, stock = fields
+        return Product(product_id, _unpack_str(name), price, stock)
@@ -0,0 +1,126 @@
+"""
+LRU-кэш с бюджетом в байтах и версиями записей
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Tuple
+
+# Признак промаха: None может быть законным закэшированным значением
+MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    """Счётчики кэша
+    
+    Attributes:
+        hits: Попадания
+        misses: Промахи (в том числе устаревшие записи)
+        evictions: Записи, вытесненные из-за бюджета
+        entries: Текущее количество записей
+        bytes: Текущий объём записей
+        max_bytes: Бюджет в байтах
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш с ограничением суммарного размера
+    
+    Каждая запись хранится вместе с версией (например, ``(mtime_ns, size)``
+    файла): ``get`` с другой версией считается промахом и удаляет запись.
+    Размер записи указывает вызывающий код; запись больше всего бюджета
+    не кэшируется.
+    """
+    
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Бюджет в байтах
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes не может быть отрицательным")
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, Any, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, version: Any) -> Any:
+        """Значение по ключу или ``MISSING``
+        
+        Args:
+            key: Ключ
+            version: Ожидаемая версия записи
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._bytes -= entry[2]
+            self.misses += 1
+            return MISSING
+    
+    def put(self, key: Hashable, version: Any, value: Any, nbytes: int) -> bool:
+        """Сохранить значение, вытеснив давно не использованные записи
+        
+        Returns:
+            True, если значение помещено в кэш
+        """
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if nbytes > self.max_bytes:
+                return False
+            self._entries[key] = (version, value, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+            return True
+    
+    def invalidate(self, key: Hashable) -> bool:
+        """Удалить запись
+        
+        Returns:
+            True, если запись была в кэше
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[2]
+            return True
+    
+    def clear(self) -> None:
+        """Удалить все записи (счётчики сохраняются)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> CacheStats:
+        """Текущие счётчики"""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self._entries), self._bytes, self.max_bytes)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def __repr__(self) -> str:
+        return f"LRUCache(entries={len(self._entries)}, bytes={self._bytes}/{self.max_bytes})"
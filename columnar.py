@@ -0,0 +1,232 @@
+"""
+Колоночное хранилище продуктов для аналитики по складу
+"""
+import operator
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import Product
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него работают циклы по array
+    np = None
+
+
+class ProductTable:
+    """Колоночная таблица продуктов
+    
+    ID, цены и остатки хранятся в непрерывных ``array``-колонках
+    (``'q'`` и ``'d'``), названия - в обычном списке. Если установлен
+    NumPy, агрегаты и массовые обновления выполняются над представлениями
+    этих колонок без копирования; иначе используются встроенные функции
+    над ``array``.
+    """
+    
+    def __init__(self):
+        self.ids = array('q')
+        self.names: List[str] = []
+        self.prices = array('d')
+        self.stock = array('q')
+        self._row_by_id: Dict[int, int] = {}
+    
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> 'ProductTable':
+        """Построить таблицу из объектов Product
+        
+        Args:
+            products: Продукты (повторные ID пропускаются)
+        
+        Returns:
+            Новая таблица
+        """
+        table = cls()
+        for product in products:
+            table.append(product)
+        return table
+    
+    def append(self, product: Product) -> bool:
+        """Добавить продукт в конец таблицы
+        
+        Args:
+            product: Продукт
+        
+        Returns:
+            True если продукт добавлен, False если ID уже есть в таблице
+        """
+        if product.product_id in self._row_by_id:
+            return False
+        self._row_by_id[product.product_id] = len(self.ids)
+        self.ids.append(product.product_id)
+        self.names.append(product.name)
+        self.prices.append(product.price)
+        self.stock.append(product.stock)
+        return True
+    
+    def to_products(self) -> List[Product]:
+        """Выгрузить таблицу в новые объекты Product"""
+        return [
+            Product(product_id, name, price, stock)
+            for product_id, name, price, stock
+            in zip(self.ids, self.names, self.prices, self.stock)
+        ]
+    
+    def row(self, product_id: int) -> Optional[int]:
+        """Номер строки продукта или None"""
+        return self._row_by_id.get(product_id)
+    
+    def get(self, product_id: int) -> Optional[Product]:
+        """Собрать объект Product для одной строки"""
+        row = self._row_by_id.get(product_id)
+        if row is None:
+            return None
+        return Product(self.ids[row], self.names[row], self.prices[row], self.stock[row])
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __repr__(self) -> str:
+        return f"ProductTable(rows={len(self.ids)})"
+    
+    # --- Агрегаты -------------------------------------------------------
+    
+    def total_stock(self) -> int:
+        """Суммарный остаток на складе"""
+        if np is not None:
+            return int(np.frombuffer(self.stock, dtype=np.int64).sum())
+        return sum(self.stock)
+    
+    def total_stock_value(self) -> float:
+        """Суммарная стоимость склада (сумма price * stock)"""
+        if np is not None:
+            prices = np.frombuffer(self.prices, dtype=np.float64)
+            stock = np.frombuffer(self.stock, dtype=np.int64)
+            return float(np.dot(prices, stock))
+        return float(sum(map(operator.mul, self.prices, self.stock)))
+    
+    def filter(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+               min_stock: Optional[int] = None, max_stock: Optional[int] = None) -> array:
+        """Отобрать продукты по диапазонам цены и остатка
+        
+        Границы включительные, ``None`` означает отсутствие ограничения.
+        
+        Args:
+            min_price: Минимальная цена
+            max_price: Максимальная цена
+            min_stock: Минимальный остаток
+            max_stock: Максимальный остаток
+        
+        Returns:
+            ID подходящих продуктов в порядке строк
+        """
+        if np is not None:
+            mask = np.ones(len(self.ids), dtype=bool)
+            prices = np.frombuffer(self.prices, dtype=np.float64)
+            stock = np.frombuffer(self.stock, dtype=np.int64)
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_price is not None:
+                mask &= prices <= max_price
+            if min_stock is not None:
+                mask &= stock >= min_stock
+            if max_stock is not None:
+                mask &= stock <= max_stock
+            return array('q', np.frombuffer(self.ids, dtype=np.int64)[mask].tobytes())
+        
+        lo_price = float('-inf') if min_price is None else min_price
+        hi_price = float('inf') if max_price is None else max_price
+        lo_stock = float('-inf') if min_stock is None else min_stock
+        hi_stock = float('inf') if max_stock is None else max_stock
+        return array('q', [
+            product_id
+            for product_id, price, stock in zip(self.ids, self.prices, self.stock)
+            if lo_price <= price <= hi_price and lo_stock <= stock <= hi_stock
+        ])
+    
+    def low_stock(self, threshold: int) -> array:
+        """ID продуктов с остатком строго меньше порога"""
+        return self.filter(max_stock=threshold - 1)
+    
+    def group_by_price(self, bucket_size: float) -> Dict[float, Tuple[int, int]]:
+        """Сгруппировать продукты по ценовым корзинам
+        
+        Args:
+            bucket_size: Ширина корзины
+        
+        Returns:
+            Словарь {нижняя граница корзины: (число продуктов, суммарный остаток)},
+            отсортированный по границе
+        """
+        if bucket_size <= 0:
+            raise ValueError("bucket_size должен быть положительным")
+        if np is not None:
+            prices = np.frombuffer(self.prices, dtype=np.float64)
+            stock = np.frombuffer(self.stock, dtype=np.int64)
+            buckets = np.floor(prices / bucket_size).astype(np.int64)
+            keys, inverse, counts = np.unique(buckets, return_inverse=True, return_counts=True)
+            sums = np.bincount(inverse, weights=stock, minlength=len(keys))
+            return {
+                float(key) * bucket_size: (int(count), int(total))
+                for key, count, total in zip(keys, counts, sums)
+            }
+        
+        groups: Dict[int, List[int]] = {}
+        for price, stock in zip(self.prices, self.stock):
+            key = int(price // bucket_size)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, stock]
+            else:
+                group[0] += 1
+                group[1] += stock
+        return {
+            key * bucket_size: (count, total)
+            for key, (count, total) in sorted(groups.items())
+        }
+    
+    # --- Массовые обновления --------------------------------------------
+    
+    def _rows(self, product_ids: Iterable[int]) -> List[int]:
+        """Номера строк для ID (KeyError для неизвестного ID)"""
+        row_by_id = self._row_by_id
+        return [row_by_id[product_id] for product_id in product_ids]
+    
+    def scale_prices(self, factor: float, product_ids: Optional[Iterable[int]] = None) -> None:
+        """Умножить цены на коэффициент
+        
+        Args:
+            factor: Множитель цены
+            product_ids: Какие продукты менять (по умолчанию все)
+        """
+        if product_ids is None:
+            if np is not None:
+                prices = np.frombuffer(self.prices, dtype=np.float64)
+                prices *= factor
+            else:
+                self.prices = array('d', [price * factor for price in self.prices])
+            return
+        prices = self.prices
+        for row in self._rows(product_ids):
+            prices[row] *= factor
+    
+    def set_stock(self, product_ids: Iterable[int], values: Iterable[int]) -> None:
+        """Установить остатки для набора продуктов
+        
+        Args:
+            product_ids: ID продуктов
+            values: Новые остатки в том же порядке
+        """
+        stock = self.stock
+        for row, value in zip(self._rows(product_ids), values):
+            stock[row] = value
+    
+    def add_stock(self, product_ids: Iterable[int], deltas: Iterable[int]) -> None:
+        """Изменить остатки на заданные величины
+        
+        Args:
+            product_ids: ID продуктов
+            deltas: Приращения остатка (отрицательные для списания)
+        """
+        stock = self.stock
+        for row, delta in zip(self._rows(product_ids), deltas):
+            stock[row] += delta
@@ -0,0 +1,309 @@
+"""
+Кодеки сжатия для сериализаторов
+"""
+import bz2
+import io
+import lzma
+import pickle
+import time
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from file_operations import DEFAULT_CHUNK_SIZE
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # Необязательный быстрый кодек
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:  # Необязательный быстрый кодек
+    zstandard = None
+
+# Сколько байт заголовка нужно для определения кодека
+_SNIFF_SIZE = 6
+
+
+class _ZlibReader(io.RawIOBase):
+    """Потоковая распаковка zlib поверх открытого файла"""
+    
+    def __init__(self, fileobj: BinaryIO):
+        self._fp = fileobj
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b''
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, b) -> int:
+        while self._pos >= len(self._buffer):
+            if self._decompressor.eof:
+                return 0
+            chunk = self._fp.read(DEFAULT_CHUNK_SIZE)
+            if not chunk:
+                raise EOFError("Сжатый поток zlib оборван")
+            self._buffer = self._decompressor.decompress(chunk)
+            self._pos = 0
+        n = min(len(b), len(self._buffer) - self._pos)
+        b[:n] = self._buffer[self._pos:self._pos + n]
+        self._pos += n
+        return n
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._fp.close()
+        super().close()
+
+
+class _ZlibWriter(io.RawIOBase):
+    """Потоковое сжатие zlib поверх открытого файла"""
+    
+    def __init__(self, fileobj: BinaryIO, level: int):
+        self._fp = fileobj
+        self._compressor = zlib.compressobj(level)
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, b) -> int:
+        data = memoryview(b)
+        self._fp.write(self._compressor.compress(data))
+        return data.nbytes
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._fp.write(self._compressor.flush())
+            self._fp.close()
+        super().close()
+
+
+# Сырой поток zlib не имеет надёжной сигнатуры (обычный текст вроде b"80"
+# проходит проверку заголовка), поэтому сжатые данные предваряются своей
+_ZLIB_MAGIC = b'ZLB1'
+
+
+def _open_zlib(file_path, mode: str, level: int) -> BinaryIO:
+    raw = open(file_path, mode)
+    if 'r' in mode:
+        # Файлы без сигнатуры (записанные раньше) читаются как сырой zlib
+        if raw.read(len(_ZLIB_MAGIC)) != _ZLIB_MAGIC:
+            raw.seek(0)
+        return io.BufferedReader(_ZlibReader(raw), DEFAULT_CHUNK_SIZE)
+    raw.write(_ZLIB_MAGIC)
+    return io.BufferedWriter(_ZlibWriter(raw, level), DEFAULT_CHUNK_SIZE)
+
+
+def _zlib_decompress(data: bytes) -> bytes:
+    if data[:len(_ZLIB_MAGIC)] == _ZLIB_MAGIC:
+        data = memoryview(data)[len(_ZLIB_MAGIC):]
+    return zlib.decompress(data)
+
+
+class Codec(NamedTuple):
+    """Описание кодека сжатия
+    
+    Attributes:
+        name: Название кодека
+        default_level: Уровень сжатия по умолчанию
+        matches: Проверка заголовка данных на принадлежность кодеку
+        open: Открыть файл на потоковое чтение/запись: (путь, режим, уровень)
+        compress: Сжать байты: (данные, уровень)
+        decompress: Распаковать байты
+    """
+    name: str
+    default_level: int
+    matches: Callable[[bytes], bool]
+    open: Callable[[Any, str, int], BinaryIO]
+    compress: Callable[[bytes, int], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: Dict[str, Codec] = {
+    'zlib': Codec(
+        'zlib', 6, lambda header: header.startswith(_ZLIB_MAGIC), _open_zlib,
+        lambda data, level: _ZLIB_MAGIC + zlib.compress(data, level),
+        _zlib_decompress),
+    'bz2': Codec(
+        'bz2', 9, lambda header: header.startswith(b'BZh'),
+        lambda path, mode, level: bz2.open(path, mode, compresslevel=level),
+        lambda data, level: bz2.compress(data, level),
+        bz2.decompress),
+    'lzma': Codec(
+        'lzma', 6, lambda header: header.startswith(b'\xfd7zXZ\x00'),
+        lambda path, mode, level: lzma.open(path, mode, preset=level if 'w' in mode else None),
+        lambda data, level: lzma.compress(data, preset=level),
+        lzma.decompress),
+}
+
+if lz4_frame is not None:
+    CODECS['lz4'] = Codec(
+        'lz4', 0, lambda header: header.startswith(b'\x04\x22\x4d\x18'),
+        lambda path, mode, level: lz4_frame.open(path, mode, compression_level=level),
+        lambda data, level: lz4_frame.compress(data, compression_level=level),
+        lz4_frame.decompress)
+
+if zstandard is not None:
+    CODECS['zstd'] = Codec(
+        'zstd', 3, lambda header: header.startswith(b'\x28\xb5\x2f\xfd'),
+        lambda path, mode, level: zstandard.open(
+            path, mode, cctx=zstandard.ZstdCompressor(level=level) if 'w' in mode else None),
+        lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data))
+
+
+def available_codecs() -> List[str]:
+    """Названия кодеков, доступных в текущем окружении"""
+    return list(CODECS)
+
+
+def get_codec(name: str) -> Codec:
+    """Найти кодек по названию
+    
+    Raises:
+        ValueError: Кодек неизвестен или его библиотека не установлена
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(
+            f"Кодек '{name}' недоступен, доступны: {', '.join(CODECS)}") from None
+
+
+def detect_codec(header: bytes) -> Optional[str]:
+    """Определить кодек по первым байтам данных
+    
+    Args:
+        header: Начало данных (достаточно 6 байт)
+    
+    Returns:
+        Название кодека или None, если данные не сжаты известным кодеком
+    """
+    for codec in CODECS.values():
+        if codec.matches(header):
+            return codec.name
+    return None
+
+
+def open_compressed(file_path, mode: str = 'rb', codec: Optional[str] = None,
+                    level: Optional[int] = None,
+                    encoding: Optional[str] = None) -> Union[BinaryIO, io.TextIOWrapper]:
+    """Открыть файл с потоковым сжатием
+    
+    При записи ``codec=None`` означает файл без сжатия. При чтении кодек
+    определяется автоматически по сигнатуре в заголовке файла, если не
+    задан явно. Файлы zlib, записанные без сигнатуры ``ZLB1``, читаются
+    только с явным ``codec='zlib'``.
+    
+    Args:
+        file_path: Путь к файлу
+        mode: 'rb', 'wb', 'ab' или текстовые 'r', 'w', 'a'
+        codec: Название кодека
+        level: Уровень сжатия (по умолчанию - уровень кодека)
+        encoding: Кодировка для текстовых режимов
+    
+    Returns:
+        Файловый объект (двоичный или текстовый)
+    """
+    text = 'b' not in mode
+    binary_mode = mode.replace('t', '') + ('b' if text else '')
+    if 'r' in binary_mode and codec is None:
+        with open(file_path, 'rb') as f:
+            codec = detect_codec(f.read(_SNIFF_SIZE))
+    if codec is None:
+        f = open(file_path, binary_mode)
+    else:
+        selected = get_codec(codec)
+        f = selected.open(file_path, binary_mode,
+                          selected.default_level if level is None else level)
+    if text:
+        return io.TextIOWrapper(f, encoding=encoding or 'utf-8')
+    return f
+
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    """Сжать байты выбранным кодеком"""
+    selected = get_codec(codec)
+    return selected.compress(data, selected.default_level if level is None else level)
+
+
+def decompress(data: bytes, codec: Optional[str] = None) -> bytes:
+    """Распаковать байты (кодек определяется по заголовку, если не задан)"""
+    if codec is None:
+        codec = detect_codec(bytes(data[:_SNIFF_SIZE]))
+        if codec is None:
+            return bytes(data)
+    return get_codec(codec).decompress(data)
+
+
+class CodecBenchmark(NamedTuple):
+    """Результат замера одного кодека
+    
+    Attributes:
+        codec: Название кодека ('none' - без сжатия)
+        level: Уровень сжатия
+        size: Размер сжатых данных в байтах
+        ratio: Степень сжатия (исходный размер / сжатый)
+        encode_s: Время сериализации и сжатия, сек
+        decode_s: Время распаковки и десериализации, сек
+    """
+    codec: str
+    level: Optional[int]
+    size: int
+    ratio: float
+    encode_s: float
+    decode_s: float
+
+
+def benchmark_codecs(obj: Any, codecs: Optional[Iterable[str]] = None,
+                     level: Optional[int] = None, repeat: int = 3) -> List[CodecBenchmark]:
+    """Сравнить кодеки на pickle-представлении объекта
+    
+    Для каждого кодека берётся лучшее время из ``repeat`` прогонов полного
+    цикла: ``pickle.dumps`` + сжатие и распаковка + ``pickle.loads``.
+    
+    Args:
+        obj: Объект для замера (например, Database)
+        codecs: Кодеки (по умолчанию все доступные)
+        level: Уровень сжатия (по умолчанию - уровень каждого кодека)
+        repeat: Количество прогонов
+    
+    Returns:
+        Строки результатов, первая - без сжатия
+    """
+    raw = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    results = []
+    for name in ['none'] + list(CODECS if codecs is None else codecs):
+        encode_s = decode_s = float('inf')
+        codec_level = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+            if name != 'none':
+                selected = get_codec(name)
+                codec_level = selected.default_level if level is None else level
+                data = selected.compress(data, codec_level)
+            encode_s = min(encode_s, time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            pickle.loads(data if name == 'none' else get_codec(name).decompress(data))
+            decode_s = min(decode_s, time.perf_counter() - start)
+        results.append(CodecBenchmark(
+            name, codec_level, len(data), len(raw) / len(data), encode_s, decode_s))
+    return results
+
+
+def format_benchmark_table(results: Iterable[CodecBenchmark]) -> str:
+    """Оформить результаты ``benchmark_codecs`` текстовой таблицей"""
+    lines = [
+        f"{'Кодек':<8}{'Уровень':>8}{'Размер, байт':>16}{'Сжатие':>9}"
+        f"{'Запись, мс':>12}{'Чтение, мс':>12}",
+        '-' * 65,
+    ]
+    for row in results:
+        level = '-' if row.level is None else str(row.level)
+        lines.append(
+            f"{row.codec:<8}{level:>8}{row.size:>16}{row.ratio:>8.2f}x"
+            f"{row.encode_s * 1000:>12.2f}{row.decode_s * 1000:>12.2f}")
+    return '\n'.join(lines)
@@ -0,0 +1,230 @@
+"""
+Инкрементальные снимки Database: базовый снимок и цепочка дельт
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from models import Database
+from serialization import PickleSerializer
+
+CHAIN_VERSION = 1
+DELTA_VERSION = 1
+
+# Коллекции в порядке применения: заказы ссылаются на пользователей и продукты
+_KINDS = ('users', 'products', 'orders')
+
+
+def _copy_state(target: Any, source: Any) -> None:
+    """Перенести значения слотов записи на существующий объект"""
+    for slot in type(source).__slots__:
+        if slot != '_owner' and hasattr(source, slot):
+            setattr(target, slot, getattr(source, slot))
+
+
+def apply_delta(db: Database, delta: Dict[str, Any]) -> int:
+    """Применить дельту к базе
+    
+    Записи с новыми ID добавляются, существующие обновляются на месте,
+    поэтому ссылки на них (например, из заказов) остаются валидными.
+    Применение идемпотентно: повторная дельта не меняет результат.
+    
+    Args:
+        db: База данных
+        delta: Дельта, прочитанная из файла
+    
+    Returns:
+        Количество применённых записей
+    """
+    getters = {'users': (db.get_user, db.add_user, 'user_id'),
+               'products': (db.get_product, db.add_product, 'product_id'),
+               'orders': (db.get_order, db.add_order, 'order_id')}
+    applied = 0
+    emails_changed = False
+    for kind in _KINDS:
+        get, add, key = getters[kind]
+        for record in delta[kind]:
+            if kind == 'orders':
+                db.relink_order(record)
+            existing = get(getattr(record, key))
+            if existing is None:
+                add(record)
+            elif existing is not record:
+                if kind == 'users' and existing.email != record.email:
+                    emails_changed = True
+                _copy_state(existing, record)
+            applied += 1
+    if emails_changed:
+        db.rebuild_indexes()
+    return applied
+
+
+class SnapshotChain:
+    """Базовый снимок Database и цепочка дельт к нему
+    
+    ``save(db)`` записывает только записи, добавленные или изменённые с
+    прошлого сохранения (см. ``Database.changes``), отдельным файлом-дельтой.
+    ``load()`` читает базовый снимок и применяет дельты по порядку.
+    ``compact()`` сворачивает цепочку в новый базовый снимок.
+    
+    Файлы в директории: ``<name>.base-00001.pkl``, ``<name>.delta-00001.pkl``,
+    ... и манифест ``<name>.chain.json`` с именем текущего снимка и списком
+    дельт, который подменяется атомарно после записи каждого файла. Новый
+    базовый снимок пишется под новым именем, поэтому до переключения
+    манифеста прежний снимок и его дельты остаются целостной версией.
+    """
+    
+    def __init__(self, directory: str, name: str = 'database',
+                 compression: Optional[str] = None, max_deltas: Optional[int] = None):
+        """
+        Args:
+            directory: Директория снимков
+            name: Префикс файлов цепочки
+            compression: Кодек сжатия снимков и дельт
+            max_deltas: После стольких дельт ``save`` сам вызывает ``compact``
+        """
+        self.directory = directory
+        self.name = name
+        self.compression = compression
+        self.max_deltas = max_deltas
+        self._manifest_path = os.path.join(directory, f"{name}.chain.json")
+        self.base_filename = self._base_name(1)
+        self._base_seq = 0
+        self.deltas: List[str] = []
+        self._next_seq = 1
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != CHAIN_VERSION:
+                raise ValueError(f"Неподдерживаемая версия цепочки: {manifest.get('version')}")
+            self.base_filename = manifest['base']
+            self._base_seq = manifest.get('base_seq', 0)
+            self.deltas = manifest['deltas']
+            self._next_seq = manifest['next_seq']
+    
+    def _base_name(self, seq: int) -> str:
+        return f"{self.name}.base-{seq:05d}.pkl"
+    
+    @property
+    def exists(self) -> bool:
+        """Записан ли базовый снимок"""
+        return os.path.exists(self._manifest_path)
+    
+    def _write_manifest(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = {
+            'version': CHAIN_VERSION,
+            'base': self.base_filename,
+            'base_seq': self._base_seq,
+            'deltas': self.deltas,
+            'next_seq': self._next_seq,
+        }
+        with open(self._manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._manifest_path + '.tmp', self._manifest_path)
+    
+    def _write_durable(self, obj: Any, filename: str) -> None:
+        """Записать файл через временный, сбросить на диск и атомарно подменить"""
+        path = os.path.join(self.directory, filename)
+        PickleSerializer.serialize(obj, filename + '.tmp', self.directory, self.compression)
+        with open(path + '.tmp', 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+    
+    def save_base(self, db: Database) -> None:
+        """Записать полный базовый снимок и удалить дельты
+        
+        Снимок пишется под новым именем (следующее поколение) и сбрасывается
+        на диск, затем манифест атомарно переключается на него с пустым
+        списком дельт, и только после этого удаляются прежние снимок и
+        дельты. Если процесс прервётся раньше, манифест указывает на
+        прежний снимок с его дельтами: старые дельты никогда не применяются
+        к новому снимку.
+        """
+        seq = self._base_seq + 1
+        filename = self._base_name(seq)
+        self._write_durable(db, filename)
+        stale = self.deltas + ([self.base_filename] if self.exists else [])
+        self.base_filename, self._base_seq = filename, seq
+        self.deltas = []
+        self._next_seq = 1
+        self._write_manifest()
+        for filename in stale:
+            path = os.path.join(self.directory, filename)
+            if os.path.exists(path):
+                os.remove(path)
+        db.clear_changes()
+    
+    def save_delta(self, db: Database) -> Optional[str]:
+        """Записать изменения базы отдельной дельтой
+        
+        Дельта, как и снимок, пишется во временный файл, сбрасывается на
+        диск и атомарно подменяется до того, как манифест на неё сошлётся.
+        
+        Returns:
+            Название файла дельты или None, если изменений нет
+        """
+        if not self.exists:
+            raise FileNotFoundError(f"{self._manifest_path}: нет базового снимка")
+        if not db.has_changes:
+            return None
+        changes = db.changes()
+        delta = {'version': DELTA_VERSION}
+        for kind in _KINDS:
+            delta[kind] = changes.new[kind] + changes.dirty[kind]
+        filename = f"{self.name}.delta-{self._next_seq:05d}.pkl"
+        self._write_durable(delta, filename)
+        self.deltas.append(filename)
+        self._next_seq += 1
+        self._write_manifest()
+        db.clear_changes()
+        return filename
+    
+    def save(self, db: Database) -> Optional[str]:
+        """Сохранить базу: базовый снимок при первом вызове, далее дельты
+        
+        Returns:
+            Название записанного файла или None, если изменений нет
+        """
+        if not self.exists:
+            self.save_base(db)
+            return self.base_filename
+        filename = self.save_delta(db)
+        if self.max_deltas is not None and len(self.deltas) >= self.max_deltas:
+            self.save_base(db)
+            return self.base_filename
+        return filename
+    
+    def load(self) -> Database:
+        """Загрузить базовый снимок и применить дельты по порядку
+        
+        Returns:
+            База без накопленных изменений
+        """
+        db = PickleSerializer.deserialize(self.base_filename, self.directory)
+        for filename in self.deltas:
+            delta = PickleSerializer.deserialize(filename, self.directory)
+            if delta.get('version', 0) > DELTA_VERSION:
+                raise ValueError(f"{filename}: неподдерживаемая версия дельты {delta['version']}")
+            apply_delta(db, delta)
+        db.clear_changes()
+        return db
+    
+    def compact(self, db: Optional[Database] = None) -> Database:
+        """Свернуть цепочку в новый базовый снимок
+        
+        Args:
+            db: Актуальная база (по умолчанию загружается из цепочки)
+        
+        Returns:
+            База, записанная базовым снимком
+        """
+        if db is None:
+            db = self.load()
+        self.save_base(db)
+        return db
+    
+    def __repr__(self) -> str:
+        return f"SnapshotChain(name='{self.name}', deltas={len(self.deltas)})"
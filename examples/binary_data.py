@@ -5,7 +5,9 @@ import struct
 import sys
 sys.path.insert(0, '..')
 
-from file_operations import write_binary, read_binary
+from file_operations import write_binary, read_binary, file_exists, delete_file
+from binary_records import UserRecordFile
+from models import User
 
 
 def example_basic_binary():
@@ -107,6 +109,27 @@ def example_image_header():
     print(f"  Глубина: {unpacked_bitdepth} bits")
 
 
+def example_record_file():
+    """Пример 5: Файл записей фиксированной длины"""
+    print("\n📋 Пример 5: Файл записей фиксированной длины")
+    print("-" * 50)
+    
+    if file_exists("users.rec"):
+        delete_file("users.rec")
+    
+    with UserRecordFile("users.rec") as records:
+        records.extend(User(i, f"User{i}", f"user{i}@example.com") for i in range(1000))
+        print(f"Записей в файле: {len(records)}")
+        print(f"Размер записи: {records.record.size} байт")
+        
+        # Запись N читается по смещению одним seek, без разбора всего файла
+        print(f"Запись 500: {records[500]}")
+        
+        # Обновление одной записи на месте
+        records[500] = User(500, "Обновлённый", "updated@example.com")
+        print(f"После обновления: {records[500]}")
+
+
 def main():
     print("\n" + "="*50)
     print("Примеры работы с двоичными данными")
@@ -116,6 +139,7 @@ def main():
     example_struct_binary()
     example_bytes_array()
     example_image_header()
+    example_record_file()
     
     print("\n" + "="*50)
     print("✓ Все примеры выполнены!")
@@ -0,0 +1,39 @@
+"""
+Сравнение кодеков сжатия на данных моделей
+"""
+import sys
+sys.path.insert(0, '..')
+
+from compression import benchmark_codecs, format_benchmark_table
+from models import User, Product, Order, Database
+
+
+def build_database(count: int) -> Database:
+    """Собрать базу с пользователями, продуктами и заказами"""
+    db = Database()
+    db.add_users(User(i, f"Пользователь {i}", f"user{i}@example.com") for i in range(count))
+    db.add_products(Product(i, f"Товар {i % 100}", 100.0 + i % 37, i % 50) for i in range(count))
+    db.add_orders(
+        Order(i, db.users[i % count], [db.products[i % count], db.products[(i * 7) % count]], 250.0)
+        for i in range(count)
+    )
+    return db
+
+
+def main():
+    print("\n" + "="*65)
+    print("Сравнение кодеков сжатия (pickle Database)")
+    print("="*65)
+    
+    for count in (1000, 10000):
+        db = build_database(count)
+        print(f"\n{db}")
+        print(format_benchmark_table(benchmark_codecs(db)))
+    
+    print("\n" + "="*65)
+    print("✓ Замер выполнен!")
+    print("="*65)
+
+
+if __name__ == "__main__":
+    main()
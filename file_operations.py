@@ -1,9 +1,66 @@
 """
 Операции для работы с файлами
 """
+import mmap
 import os
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Union
+from typing import Iterable, Iterator, Optional, Union
+
+import metrics
+from cache import MISSING, LRUCache
+
+# Размер блока по умолчанию для потоковых операций
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Кэш содержимого read_text/read_binary (None - выключен)
+_content_cache: Optional[LRUCache] = None
+
+
+def enable_content_cache(max_bytes: int = 64 * 1024 * 1024) -> LRUCache:
+    """Включить кэш содержимого файлов для ``read_text``/``read_binary``
+    
+    Записи кэша привязаны к (путь, mtime_ns, размер): файл, изменённый
+    любым способом, перечитывается с диска. ``write_text``,
+    ``write_binary``, ``delete_file`` и потоковая запись сбрасывают
+    запись сразу. Кэш отдаёт один и тот же объект str/bytes - оба типа
+    неизменяемы.
+    
+    Args:
+        max_bytes: Бюджет кэша в байтах
+    
+    Returns:
+        Включённый кэш (для статистики: ``stats()``)
+    """
+    global _content_cache
+    _content_cache = LRUCache(max_bytes)
+    return _content_cache
+
+
+def disable_content_cache() -> None:
+    """Выключить кэш содержимого и освободить его память"""
+    global _content_cache
+    _content_cache = None
+
+
+def content_cache() -> Optional[LRUCache]:
+    """Текущий кэш содержимого или None"""
+    return _content_cache
+
+
+def _file_version(file_path: str) -> tuple:
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _invalidate(file_path: str) -> None:
+    """Сбросить записи кэша для файла"""
+    cache = _content_cache
+    if cache is not None:
+        path = os.path.abspath(file_path)
+        cache.invalidate(('text', path))
+        cache.invalidate(('binary', path))
 
 
 def ensure_data_dir(directory: str = 'data') -> str:
@@ -20,15 +77,18 @@ def write_text(filename: str, content: str, directory: str = 'data') -> None:
         content: Содержимое для записи
         directory: Директория
     """
+    started = metrics.clock()
     ensure_data_dir(directory)
     file_path = os.path.join(directory, filename)
     try:
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
-        print(f"✓ Файл '{file_path}' успешно сохранён")
     except IOError as e:
-        print(f"✗ Ошибка при записи: {e}")
+        metrics.observe('write_text', started, error=e)
         raise
+    finally:
+        _invalidate(file_path)
+    metrics.observe('write_text', started, len(content))
 
 
 def read_text(filename: str, directory: str = 'data') -> str:
@@ -41,15 +101,26 @@ def read_text(filename: str, directory: str = 'data') -> str:
     Returns:
         Одочтенное содержимое
     """
+    started = metrics.clock()
     file_path = os.path.join(directory, filename)
+    cache = _content_cache
     try:
+        if cache is not None:
+            key = ('text', os.path.abspath(file_path))
+            version = _file_version(file_path)
+            content = cache.get(key, version)
+            if content is not MISSING:
+                metrics.observe('read_text', started, len(content))
+                return content
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        print(f"✓ Набор данных из '{file_path}'")
-        return content
     except IOError as e:
-        print(f"✗ Ошибка при чтении: {e}")
+        metrics.observe('read_text', started, error=e)
         raise
+    if cache is not None:
+        cache.put(key, version, content, sys.getsizeof(content))
+    metrics.observe('read_text', started, len(content))
+    return content
 
 
 def write_binary(filename: str, data: bytes, directory: str = 'data') -> None:
@@ -60,15 +131,18 @@ def write_binary(filename: str, data: bytes, directory: str = 'data') -> None:
         data: Двоичные данные
         directory: Директория
     """
+    started = metrics.clock()
     ensure_data_dir(directory)
     file_path = os.path.join(directory, filename)
     try:
         with open(file_path, 'wb') as f:
             f.write(data)
-        print(f"✓ Файл '{file_path}' успешно сохранён ({len(data)} байт)")
     except IOError as e:
-        print(f"✗ Ошибка при записи: {e}")
+        metrics.observe('write_binary', started, error=e)
         raise
+    finally:
+        _invalidate(file_path)
+    metrics.observe('write_binary', started, len(data))
 
 
 def read_binary(filename: str, directory: str = 'data') -> bytes:
@@ -81,15 +155,233 @@ def read_binary(filename: str, directory: str = 'data') -> bytes:
     Returns:
         Одочтенные двоичные данные
     """
+    started = metrics.clock()
     file_path = os.path.join(directory, filename)
+    cache = _content_cache
     try:
+        if cache is not None:
+            key = ('binary', os.path.abspath(file_path))
+            version = _file_version(file_path)
+            data = cache.get(key, version)
+            if data is not MISSING:
+                metrics.observe('read_binary', started, len(data))
+                return data
         with open(file_path, 'rb') as f:
             data = f.read()
-        print(f"✓ Набор данных из '{file_path}' ({len(data)} байт)")
-        return data
     except IOError as e:
-        print(f"✗ Ошибка при чтении: {e}")
+        metrics.observe('read_binary', started, error=e)
+        raise
+    if cache is not None:
+        cache.put(key, version, data, len(data))
+    metrics.observe('read_binary', started, len(data))
+    return data
+
+
+def iter_binary_chunks(filename: str, directory: str = 'data',
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Читать двоичный файл блоками
+    
+    Args:
+        filename: Название файла
+        directory: Директория
+        chunk_size: Размер блока в байтах
+    
+    Yields:
+        Блоки данных (последний может быть короче)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size должен быть положительным")
+    file_path = os.path.join(directory, filename)
+    with open(file_path, 'rb') as f:
+        read = f.read
+        while True:
+            chunk = read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_binary_into(filename: str, buffer: bytearray, directory: str = 'data') -> Iterator[memoryview]:
+    """Читать двоичный файл в один переиспользуемый буфер
+    
+    Каждый блок читается через ``readinto`` в ``buffer``, новых объектов
+    bytes не создаётся. Отданный срез действителен только до следующей
+    итерации: затем буфер перезаписывается.
+    
+    Args:
+        filename: Название файла
+        buffer: Заранее выделенный буфер, его размер задаёт размер блока
+        directory: Директория
+    
+    Yields:
+        memoryview заполненной части буфера
+    """
+    if len(buffer) == 0:
+        raise ValueError("Буфер не должен быть пустым")
+    file_path = os.path.join(directory, filename)
+    view = memoryview(buffer)
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            readinto = f.readinto
+            while True:
+                n = readinto(view)
+                if not n:
+                    return
+                yield view[:n]
+    finally:
+        view.release()
+
+
+def readinto_binary(filename: str, buffer: Union[bytearray, memoryview],
+                    directory: str = 'data', offset: int = 0) -> int:
+    """Прочитать данные файла в заранее выделенный буфер
+    
+    Args:
+        filename: Название файла
+        buffer: Буфер для заполнения (bytearray или записываемый memoryview)
+        directory: Директория
+        offset: Смещение в файле, с которого начинать чтение
+    
+    Returns:
+        Количество прочитанных байт (меньше размера буфера у конца файла)
+    """
+    file_path = os.path.join(directory, filename)
+    view = memoryview(buffer)
+    total = 0
+    with open(file_path, 'rb', buffering=0) as f:
+        if offset:
+            f.seek(offset)
+        # readinto может вернуть меньше запрошенного и до конца файла
+        while total < len(view):
+            n = f.readinto(view[total:])
+            if not n:
+                break
+            total += n
+    return total
+
+
+def iter_text_chunks(filename: str, directory: str = 'data',
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Читать текстовый файл блоками
+    
+    Args:
+        filename: Название файла
+        directory: Директория
+        chunk_size: Размер блока в символах
+    
+    Yields:
+        Блоки текста (последний может быть короче)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size должен быть положительным")
+    file_path = os.path.join(directory, filename)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        read = f.read
+        while True:
+            chunk = read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def write_binary_chunks(filename: str, chunks: Iterable[bytes], directory: str = 'data',
+                        append: bool = False) -> int:
+    """Записать двоичные данные из последовательности блоков
+    
+    Args:
+        filename: Название файла
+        chunks: Итерируемый объект или генератор блоков (bytes-like)
+        directory: Директория
+        append: Дописать в конец существующего файла
+    
+    Returns:
+        Количество записанных байт
+    """
+    started = metrics.clock()
+    ensure_data_dir(directory)
+    file_path = os.path.join(directory, filename)
+    try:
+        total = 0
+        with open(file_path, 'ab' if append else 'wb') as f:
+            write = f.write
+            for chunk in chunks:
+                total += write(chunk)
+    except IOError as e:
+        metrics.observe('write_binary_chunks', started, error=e)
+        raise
+    finally:
+        _invalidate(file_path)
+    metrics.observe('write_binary_chunks', started, total)
+    return total
+
+
+def write_text_chunks(filename: str, chunks: Iterable[str], directory: str = 'data',
+                      append: bool = False) -> int:
+    """Записать текст из последовательности блоков
+    
+    Args:
+        filename: Название файла
+        chunks: Итерируемый объект или генератор строк
+        directory: Директория
+        append: Дописать в конец существующего файла
+    
+    Returns:
+        Количество записанных символов
+    """
+    started = metrics.clock()
+    ensure_data_dir(directory)
+    file_path = os.path.join(directory, filename)
+    try:
+        total = 0
+        with open(file_path, 'a' if append else 'w', encoding='utf-8') as f:
+            write = f.write
+            for chunk in chunks:
+                total += write(chunk)
+    except IOError as e:
+        metrics.observe('write_text_chunks', started, error=e)
+        raise
+    finally:
+        _invalidate(file_path)
+    metrics.observe('write_text_chunks', started, total)
+    return total
+
+
+@contextmanager
+def read_binary_mmap(filename: str, directory: str = 'data') -> Iterator[memoryview]:
+    """Отобразить файл в память и отдать его содержимое без копирования
+    
+    Возвращает контекстный менеджер с read-only ``memoryview`` поверх
+    ``mmap``. Представление (и все его срезы) действительно только внутри
+    блока ``with``: срезы, сохранённые за его пределами, не дадут закрыть
+    отображение (BufferError).
+    
+    Args:
+        filename: Название файла
+        directory: Директория
+    
+    Yields:
+        Read-only memoryview содержимого файла
+    """
+    started = metrics.clock()
+    file_path = os.path.join(directory, filename)
+    try:
+        f = open(file_path, 'rb')
+    except IOError as e:
+        metrics.observe('read_binary_mmap', started, error=e)
         raise
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        metrics.observe('read_binary_mmap', started, size)
+        if size == 0:
+            # Пустой файл нельзя отобразить в память
+            yield memoryview(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
 
 
 def file_exists(filename: str, directory: str = 'data') -> bool:
@@ -132,17 +424,20 @@ def delete_file(filename: str, directory: str = 'data') -> bool:
     Returns:
         True если файл успешно удален
     """
+    started = metrics.clock()
     file_path = os.path.join(directory, filename)
     try:
         if os.path.exists(file_path):
+            _invalidate(file_path)
             os.remove(file_path)
-            print(f"✓ Файл '{file_path}' удален")
+            metrics.observe('delete_file', started)
             return True
         else:
-            print(f"✗ Файл '{file_path}' не найден")
+            metrics.observe('delete_file', started,
+                            error=FileNotFoundError(f"Файл не найден: {file_path}"))
             return False
     except IOError as e:
-        print(f"✗ Ошибка при удалении: {e}")
+        metrics.observe('delete_file', started, error=e)
         return False
 
 
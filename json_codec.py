@@ -0,0 +1,226 @@
+"""
+JSON-кодек для моделей: компактные массивы, ссылки по ID, восстановление объектов
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
+
+from models import (PICKLE_STATE_VERSION, Database, Order, Product, User,
+                    _restore_order, _restore_product, _restore_user)
+
+try:
+    import orjson
+except ImportError:  # Необязательный ускоренный бэкенд
+    orjson = None
+
+CODEC_VERSION = 1
+# Ключ, по которому декодер узнаёт объект модели
+MODEL_KEY = '$model'
+
+TIMESTAMPS_EPOCH = 'epoch'
+TIMESTAMPS_ISO = 'iso'
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+
+def _iso_to_us(value: str) -> int:
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _ONE_US
+
+
+def _us_to_iso(value: int) -> str:
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def available_backends() -> List[str]:
+    """Доступные JSON-бэкенды (первый - используемый по умолчанию)"""
+    return ['orjson', 'json'] if orjson is not None else ['json']
+
+
+class ModelJSONCodec:
+    """Кодирование User, Product, Order и Database в JSON и обратно
+    
+    Записи кодируются массивами без имён полей:
+    
+    - User: ``[id, name, email, created]``
+    - Product: ``[id, name, price, stock]``
+    - Order: ``[id, user, [products], total, created, status]``
+    
+    Объект модели в любом месте JSON-документа - словарь
+    ``{"$model": "User", "v": 1, "row": [...]}``. В Database пользователь
+    и продукты заказа записываются своими ID, если это записи той же базы,
+    иначе - массивами целиком. Время создания - целое число микросекунд
+    от эпохи (``timestamps='epoch'``) или строка ISO 8601 в UTC
+    (``timestamps='iso'``); декодер понимает оба варианта.
+    """
+    
+    def __init__(self, timestamps: str = TIMESTAMPS_EPOCH, backend: Optional[str] = None):
+        """
+        Args:
+            timestamps: 'epoch' или 'iso'
+            backend: 'orjson' или 'json' (по умолчанию - orjson, если установлен)
+        """
+        if timestamps not in (TIMESTAMPS_EPOCH, TIMESTAMPS_ISO):
+            raise ValueError(f"Неизвестный формат времени: {timestamps}")
+        backend = backend or available_backends()[0]
+        if backend not in available_backends():
+            raise ValueError(f"JSON-бэкенд '{backend}' недоступен")
+        self.timestamps = timestamps
+        self.backend = backend
+    
+    # --- Кодирование -------------------------------------------------------
+    
+    def _ts(self, value: int) -> Union[int, str]:
+        return value if self.timestamps == TIMESTAMPS_EPOCH else _us_to_iso(value)
+    
+    def _user_row(self, user: User) -> list:
+        return [user.user_id, user.name, user.email, self._ts(user._created_us)]
+    
+    @staticmethod
+    def _product_row(product: Product) -> list:
+        return [product.product_id, product.name, product.price, product.stock]
+    
+    def _order_row(self, order: Order, db: Optional[Database] = None) -> list:
+        user = order.user
+        if db is not None and db.get_user(user.user_id) is user:
+            user_ref = user.user_id
+        else:
+            user_ref = self._user_row(user)
+        products = []
+        for product in order.products:
+            if db is not None and db.get_product(product.product_id) is product:
+                products.append(product.product_id)
+            else:
+                products.append(self._product_row(product))
+        return [order.order_id, user_ref, products, order.total,
+                self._ts(order._created_us), order.status]
+    
+    def _default(self, obj: Any) -> Any:
+        """Преобразовать модель в JSON-совместимое значение (вызывается бэкендом)"""
+        if isinstance(obj, Database):
+            return {
+                MODEL_KEY: 'Database', 'v': CODEC_VERSION,
+                'users': [self._user_row(user) for user in obj.users],
+                'products': [self._product_row(product) for product in obj.products],
+                'orders': [self._order_row(order, obj) for order in obj.orders],
+            }
+        if isinstance(obj, User):
+            return {MODEL_KEY: 'User', 'v': CODEC_VERSION, 'row': self._user_row(obj)}
+        if isinstance(obj, Product):
+            return {MODEL_KEY: 'Product', 'v': CODEC_VERSION, 'row': self._product_row(obj)}
+        if isinstance(obj, Order):
+            return {MODEL_KEY: 'Order', 'v': CODEC_VERSION, 'row': self._order_row(obj)}
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Тип {type(obj).__name__} не сериализуется в JSON")
+    
+    def encode(self, obj: Any) -> bytes:
+        """Закодировать объект (модели могут быть вложены в списки и словари)
+        
+        Нестроковые ключи словарей записываются строками, как в модуле
+        json. То, что orjson не поддерживает (целые шире 64 бит), кодируется
+        через json, поэтому результат не зависит от бэкенда.
+        
+        Returns:
+            Компактный JSON в UTF-8
+        """
+        if self.backend == 'orjson':
+            try:
+                return orjson.dumps(obj, default=self._default, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                pass
+        return json.dumps(obj, default=self._default, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+    
+    # --- Декодирование ----------------------------------------------------
+    
+    @staticmethod
+    def _us(value: Union[int, str]) -> int:
+        return _iso_to_us(value) if isinstance(value, str) else value
+    
+    def _user(self, row: list) -> User:
+        user_id, name, email, created = row
+        return _restore_user(PICKLE_STATE_VERSION, user_id, name, email, self._us(created))
+    
+    @staticmethod
+    def _product(row: list) -> Product:
+        return _restore_product(PICKLE_STATE_VERSION, *row)
+    
+    def _order(self, row: list, db: Optional[Database] = None) -> Order:
+        order_id, user_ref, product_refs, total, created, status = row
+        if isinstance(user_ref, list):
+            user = self._user(user_ref)
+        else:
+            user = db.get_user(user_ref)
+            if user is None:
+                raise ValueError(f"Заказ {order_id}: пользователь {user_ref} не найден")
+        products = []
+        for ref in product_refs:
+            if isinstance(ref, list):
+                products.append(self._product(ref))
+                continue
+            product = db.get_product(ref)
+            if product is None:
+                raise ValueError(f"Заказ {order_id}: продукт {ref} не найден")
+            products.append(product)
+        return _restore_order(PICKLE_STATE_VERSION, order_id, user, products,
+                              total, self._us(created), status)
+    
+    def _revive(self, obj: Dict[str, Any]) -> Any:
+        """Восстановить модель из словаря с ключом ``$model``"""
+        model = obj.get(MODEL_KEY)
+        if model is None:
+            return obj
+        if obj.get('v', 0) > CODEC_VERSION:
+            raise ValueError(f"{model}: версия {obj['v']} новее поддерживаемой {CODEC_VERSION}")
+        if model == 'Database':
+            db = Database()
+            db.add_users(self._user(row) for row in obj['users'])
+            db.add_products(self._product(row) for row in obj['products'])
+            db.add_orders(self._order(row, db) for row in obj['orders'])
+            db.clear_changes()
+            return db
+        if model == 'User':
+            return self._user(obj['row'])
+        if model == 'Product':
+            return self._product(obj['row'])
+        if model == 'Order':
+            return self._order(obj['row'])
+        raise ValueError(f"Неизвестная модель: {model}")
+    
+    def _walk(self, value: Any) -> Any:
+        """Восстановить модели во вложенных контейнерах (для бэкенда без object_hook)"""
+        if isinstance(value, dict):
+            if MODEL_KEY in value:
+                return self._revive(value)
+            return {key: self._walk(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._walk(item) for item in value]
+        return value
+    
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Декодировать JSON, восстановив объекты моделей
+        
+        Raises:
+            ValueError: Неизвестная модель, более новая версия или битая ссылка
+        """
+        if self.backend == 'orjson':
+            return self._walk(orjson.loads(data))
+        return json.loads(data, object_hook=self._revive)
+
+
+_DEFAULT = ModelJSONCodec()
+
+
+def dumps(obj: Any, timestamps: str = TIMESTAMPS_EPOCH) -> bytes:
+    """Закодировать объект с моделями в компактный JSON"""
+    codec = _DEFAULT if timestamps == TIMESTAMPS_EPOCH else ModelJSONCodec(timestamps)
+    return codec.encode(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Декодировать JSON, восстановив объекты моделей"""
+    return _DEFAULT.decode(data)
@@ -0,0 +1,351 @@
+"""
+Ленивая загрузка Database из файла с индексом смещений
+"""
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from models import Database, Order, Product, User
+
+LAZY_MAGIC = b'LZDB'
+LAZY_VERSION = 2
+# Заголовок: сигнатура, версия, смещение индекса
+_HEADER = struct.Struct('<4sBQ')
+_COUNT = struct.Struct('<Q')
+# Столбцы индекса: ID, смещения, длины, порядок сортировки по ID.
+# С версии 2 - little-endian, каждый столбец выровнен на 8 байт
+_COLUMNS = ('q', 'Q', 'I', 'q')
+_ALIGN = 8
+# Столбцы можно отображать из mmap без копирования
+_ZERO_COPY = sys.byteorder == 'little'
+
+_KINDS = ('users', 'products', 'orders')
+
+
+def save_lazy(db: Database, filename: str, directory: str = 'data') -> int:
+    """Сохранить базу в формате для ленивой загрузки
+    
+    Каждая запись сериализуется отдельным pickle-блоком, за блоками следует
+    индекс: для каждой коллекции массивы ID, смещений, длин и порядок
+    сортировки по ID, затем словарь email -> ID. Массивы индекса пишутся
+    в little-endian (int64/uint64/uint32) и выравниваются на 8 байт,
+    чтобы LazyDatabase отображала их из mmap без копирования. Файл
+    пишется во временный и атомарно подменяется.
+    
+    Args:
+        db: База данных
+        filename: Название файла
+        directory: Директория
+    
+    Returns:
+        Размер файла в байтах
+    """
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, filename)
+    dumps = pickle.dumps
+    protocol = pickle.HIGHEST_PROTOCOL
+    sections = []
+    with open(file_path + '.tmp', 'wb') as f:
+        f.write(_HEADER.pack(LAZY_MAGIC, LAZY_VERSION, 0))
+        for kind in _KINDS:
+            ids, offsets, lengths = array('q'), array('Q'), array('I')
+            for record in getattr(db, kind):
+                if kind == 'users':
+                    key, payload = record.user_id, dumps(record, protocol)
+                elif kind == 'products':
+                    key, payload = record.product_id, dumps(record, protocol)
+                else:
+                    key, payload = record.order_id, dumps(db.order_row(record), protocol)
+                ids.append(key)
+                offsets.append(f.tell())
+                lengths.append(len(payload))
+                f.write(payload)
+            by_id = array('q', sorted(range(len(ids)), key=ids.__getitem__))
+            sections.append((ids, offsets, lengths, by_id))
+        
+        _pad(f)
+        index_offset = f.tell()
+        for ids, offsets, lengths, by_id in sections:
+            f.write(_COUNT.pack(len(ids)))
+            for column in (ids, offsets, lengths, by_id):
+                if sys.byteorder != 'little':
+                    column.byteswap()
+                column.tofile(f)
+                _pad(f)
+        emails = dumps({user.email: user.user_id for user in db.users}, protocol)
+        f.write(_COUNT.pack(len(emails)))
+        f.write(emails)
+        size = f.tell()
+        f.seek(0)
+        f.write(_HEADER.pack(LAZY_MAGIC, LAZY_VERSION, index_offset))
+    os.replace(file_path + '.tmp', file_path)
+    return size
+
+
+def _pad(f) -> None:
+    """Дописать нули до границы выравнивания"""
+    f.write(bytes(-f.tell() % _ALIGN))
+
+
+class _SortedIds:
+    """ID коллекции в порядке возрастания (для bisect) без копирования"""
+    
+    __slots__ = ('ids', 'by_id')
+    
+    def __init__(self, ids: Sequence[int], by_id: Sequence[int]):
+        self.ids = ids
+        self.by_id = by_id
+    
+    def __len__(self) -> int:
+        return len(self.by_id)
+    
+    def __getitem__(self, i: int) -> int:
+        return self.ids[self.by_id[i]]
+
+
+class _Section:
+    """Индекс одной коллекции"""
+    
+    __slots__ = ('count', 'ids', 'offsets', 'lengths', 'by_id', 'sorted_ids')
+    
+    def __init__(self, ids: Sequence[int], offsets: Sequence[int],
+                 lengths: Sequence[int], by_id: Sequence[int]):
+        self.count = len(ids)
+        self.ids = ids
+        self.offsets = offsets
+        self.lengths = lengths
+        self.by_id = by_id
+        self.sorted_ids = _SortedIds(ids, by_id)
+    
+    def position(self, key: int) -> Optional[int]:
+        """Позиция записи с ID или None"""
+        i = bisect_left(self.sorted_ids, key)
+        if i < len(self.by_id) and self.sorted_ids[i] == key:
+            return self.by_id[i]
+        return None
+
+
+class LazyRecords(Sequence):
+    """Коллекция записей, материализуемых при обращении
+    
+    Поддерживает ``len``, обращение по позиции и итерацию в исходном
+    порядке записей базы.
+    """
+    
+    def __init__(self, db: 'LazyDatabase', kind: str):
+        self._db = db
+        self._kind = kind
+    
+    def __len__(self) -> int:
+        return self._db._sections[self._kind].count
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._db._materialize(self._kind, index)
+    
+    def __iter__(self) -> Iterator[Any]:
+        materialize = self._db._materialize
+        for position in range(len(self)):
+            yield materialize(self._kind, position)
+
+
+class LazyDatabase:
+    """База, читающая записи с диска по требованию
+    
+    При открытии читаются только заголовок и индекс смещений; массивы
+    индекса - представления memoryview над mmap файла, без копирования
+    (на big-endian платформах и для файлов версии 1 они копируются в
+    array; файлы версии 1 записаны в порядке байтов платформы). Объекты
+    User, Product и Order создаются при первом обращении (``get_user``,
+    итерация по ``users`` и т.д.). Без ``cache_size`` созданные объекты
+    хранятся всё время работы, и повторные обращения возвращают тот же
+    объект. С ``cache_size`` хранится не больше стольких объектов (LRU),
+    вытесненная запись при следующем обращении создаётся заново.
+    
+    Изменения объектов в файл не возвращаются: база только для чтения,
+    для сохранения её можно собрать через ``to_database()``.
+    """
+    
+    def __init__(self, filename: str, directory: str = 'data',
+                 cache_size: Optional[int] = None):
+        """
+        Args:
+            filename: Название файла, записанного ``save_lazy``
+            directory: Директория
+            cache_size: Наибольшее число живых объектов (None - без ограничения)
+        
+        Raises:
+            pickle.UnpicklingError: Файл не в формате ленивой базы
+        """
+        file_path = os.path.join(directory, filename)
+        self._file = open(file_path, 'rb')
+        try:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise pickle.UnpicklingError(f"{file_path}: файл слишком короткий")
+            magic, version, index_offset = _HEADER.unpack(header)
+            if magic != LAZY_MAGIC:
+                raise pickle.UnpicklingError(f"{file_path}: не файл ленивой базы")
+            if version > LAZY_VERSION:
+                raise pickle.UnpicklingError(f"{file_path}: неподдерживаемая версия {version}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._views: List[memoryview] = []
+            self._sections: Dict[str, _Section] = {}
+            self._read_index(file_path, version, index_offset)
+        except BaseException:
+            self._release()
+            raise
+        self._emails: Optional[Dict[str, int]] = None
+        
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[str, int], Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.users = LazyRecords(self, 'users')
+        self.products = LazyRecords(self, 'products')
+        self.orders = LazyRecords(self, 'orders')
+    
+    def _read_index(self, file_path: str, version: int, index_offset: int) -> None:
+        """Разобрать индекс коллекций и положение словаря email"""
+        size = len(self._map)
+        zero_copy = _ZERO_COPY and version >= 2
+        base = memoryview(self._map)
+        self._views.append(base)
+        pos = index_offset
+        try:
+            for kind in _KINDS:
+                (count,) = _COUNT.unpack_from(self._map, pos)
+                pos += _COUNT.size
+                columns = []
+                for typecode in _COLUMNS:
+                    end = pos + count * array(typecode).itemsize
+                    if end > size:
+                        raise pickle.UnpicklingError(f"{file_path}: индекс {kind} обрезан")
+                    if zero_copy:
+                        column = base[pos:end].cast(typecode)
+                        self._views.append(column)
+                    else:
+                        column = array(typecode, base[pos:end].tobytes())
+                        if version >= 2:
+                            column.byteswap()
+                    columns.append(column)
+                    pos = end
+                    if version >= 2:
+                        pos += -pos % _ALIGN
+                self._sections[kind] = _Section(*columns)
+            (self._emails_length,) = _COUNT.unpack_from(self._map, pos)
+        except struct.error as e:
+            raise pickle.UnpicklingError(f"{file_path}: индекс повреждён: {e}") from e
+        self._emails_offset = pos + _COUNT.size
+        if self._emails_offset + self._emails_length > size:
+            raise pickle.UnpicklingError(f"{file_path}: словарь email обрезан")
+    
+    def _release(self) -> None:
+        """Освободить представления индекса, mmap и файл"""
+        for view in reversed(getattr(self, '_views', ())):
+            view.release()
+        self._views = []
+        mapping = getattr(self, '_map', None)
+        if mapping is not None:
+            mapping.close()
+        self._file.close()
+    
+    # --- Материализация -------------------------------------------------
+    
+    def _materialize(self, kind: str, position: int) -> Any:
+        key = (kind, position)
+        cache = self._cache
+        record = cache.get(key)
+        if record is not None:
+            self.hits += 1
+            if self.cache_size is not None:
+                cache.move_to_end(key)
+            return record
+        
+        self.misses += 1
+        section = self._sections[kind]
+        offset = section.offsets[position]
+        record = pickle.loads(self._map[offset:offset + section.lengths[position]])
+        if kind == 'orders':
+            record = self._order_from_row(record)
+        cache[key] = record
+        if self.cache_size is not None and len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return record
+    
+    def _order_from_row(self, row: tuple) -> Order:
+        order_id, user_ref, product_refs, total, created_us, status = row
+        user = self.get_user(user_ref) if isinstance(user_ref, int) else user_ref
+        products = [self.get_product(ref) if isinstance(ref, int) else ref
+                    for ref in product_refs]
+        order = Order(order_id, user, products, total)
+        order._created_us = created_us
+        order.status = status
+        return order
+    
+    def _get(self, kind: str, key: int) -> Any:
+        position = self._sections[kind].position(key)
+        return None if position is None else self._materialize(kind, position)
+    
+    # --- Поиск ----------------------------------------------------------
+    
+    def get_user(self, user_id: int) -> Optional[User]:
+        """Пользователь по ID (O(log n) по индексу, без чтения остальных записей)"""
+        return self._get('users', user_id)
+    
+    def get_product(self, product_id: int) -> Optional[Product]:
+        """Продукт по ID"""
+        return self._get('products', product_id)
+    
+    def get_order(self, order_id: int) -> Optional[Order]:
+        """Заказ по ID (пользователь и продукты материализуются вместе с ним)"""
+        return self._get('orders', order_id)
+    
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """Пользователь по email (индекс email читается при первом вызове)"""
+        if self._emails is None:
+            start = self._emails_offset
+            self._emails = pickle.loads(self._map[start:start + self._emails_length])
+        user_id = self._emails.get(email)
+        return None if user_id is None else self.get_user(user_id)
+    
+    @property
+    def live_objects(self) -> int:
+        """Количество материализованных объектов, удерживаемых базой"""
+        return len(self._cache)
+    
+    def to_database(self) -> Database:
+        """Материализовать все записи в обычную Database"""
+        db = Database()
+        db.add_users(self.users)
+        db.add_products(self.products)
+        db.add_orders(db.relink_order(order) for order in self.orders)
+        return db
+    
+    # --- Жизненный цикл -------------------------------------------------
+    
+    def close(self) -> None:
+        """Закрыть файл (материализованные объекты остаются рабочими)"""
+        if not self._file.closed:
+            self._release()
+    
+    def __enter__(self) -> 'LazyDatabase':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __repr__(self) -> str:
+        return (f"LazyDatabase(users={len(self.users)}, products={len(self.products)}, "
+                f"orders={len(self.orders)}, live={self.live_objects})")
@@ -167,7 +167,10 @@ def demo_delete_file():
     print("\n🗑 Удаление файла...")
     
     filename = input("Введите название файла для удаления: ")
-    delete_file(filename)
+    if delete_file(filename):
+        print(f"✓ Файл '{filename}' удален")
+    else:
+        print(f"✗ Файл '{filename}' не найден")
 
 
 def main():
@@ -0,0 +1,213 @@
+"""
+Метрики операций ввода-вывода и сериализации
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+# Верхние границы корзин гистограммы задержек, сек
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class MetricEvent(NamedTuple):
+    """Одно выполнение операции, передаётся в приёмники
+    
+    Attributes:
+        op: Название операции ('write_binary', 'pickle.serialize', ...)
+        elapsed: Длительность, сек
+        nbytes: Объём данных (байты; для текстовых операций - символы)
+        error: Исключение, если операция завершилась ошибкой
+    """
+    op: str
+    elapsed: float
+    nbytes: int
+    error: Optional[BaseException] = None
+
+
+class OperationStats:
+    """Накопленные счётчики одной операции"""
+    
+    __slots__ = ('calls', 'errors', 'bytes', 'latency_sum', 'buckets')
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latency_sum = 0.0
+        # Последняя корзина - всё, что дольше LATENCY_BUCKETS[-1]
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'latency_sum': self.latency_sum,
+            'buckets': list(self.buckets),
+        }
+    
+    def __repr__(self) -> str:
+        return f"OperationStats(calls={self.calls}, errors={self.errors}, bytes={self.bytes})"
+
+
+class LoggingSink:
+    """Приёмник, пишущий каждую операцию в logging"""
+    
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger('file_io')
+        self.level = level
+    
+    def emit(self, event: MetricEvent) -> None:
+        if event.error is not None:
+            self.logger.warning("✗ %s: %s (%.3f мс)", event.op, event.error, event.elapsed * 1000)
+        elif self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "✓ %s: %d байт за %.3f мс",
+                            event.op, event.nbytes, event.elapsed * 1000)
+
+
+class InMemorySink:
+    """Приёмник, хранящий последние события в памяти (для тестов и отладки)"""
+    
+    def __init__(self, maxlen: Optional[int] = 10000):
+        self.events: Deque[MetricEvent] = deque(maxlen=maxlen)
+    
+    def emit(self, event: MetricEvent) -> None:
+        self.events.append(event)
+    
+    def clear(self) -> None:
+        self.events.clear()
+
+
+class MetricsRegistry:
+    """Реестр счётчиков операций
+    
+    Пока реестр выключен, ``clock()`` возвращает 0.0, а ``observe()``
+    сразу выходит: цена инструментирования - два вызова функции без
+    обращения к часам, блокировкам и приёмникам.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.sinks: List = []
+        self._stats: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+    
+    def clock(self) -> float:
+        """Время начала операции (0.0, если метрики выключены)"""
+        if not self.enabled:
+            return 0.0
+        return time.perf_counter()
+    
+    def observe(self, op: str, started: float, nbytes: int = 0,
+                error: Optional[BaseException] = None) -> None:
+        """Учесть завершённую операцию
+        
+        Args:
+            op: Название операции
+            started: Значение ``clock()`` в начале операции
+            nbytes: Объём данных
+            error: Исключение, если операция завершилась ошибкой
+        """
+        if not started:
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats.get(op)
+            if stats is None:
+                stats = self._stats[op] = OperationStats()
+            stats.calls += 1
+            stats.bytes += nbytes
+            stats.latency_sum += elapsed
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            if error is not None:
+                stats.errors += 1
+        if self.sinks:
+            event = MetricEvent(op, elapsed, nbytes, error)
+            for sink in self.sinks:
+                sink.emit(event)
+    
+    def stats(self, op: str) -> Optional[OperationStats]:
+        """Счётчики одной операции или None"""
+        return self._stats.get(op)
+    
+    def snapshot(self) -> Dict[str, dict]:
+        """Копия всех счётчиков в виде словарей"""
+        with self._lock:
+            return {op: stats.as_dict() for op, stats in self._stats.items()}
+    
+    def reset(self) -> None:
+        """Обнулить все счётчики"""
+        with self._lock:
+            self._stats.clear()
+    
+    def to_prometheus(self, prefix: str = 'file_io') -> str:
+        """Выгрузить счётчики в текстовом формате Prometheus
+        
+        Args:
+            prefix: Префикс имён метрик
+        
+        Returns:
+            Текст в формате exposition format 0.0.4
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, kind, key in (('calls_total', 'counter', 'calls'),
+                                ('errors_total', 'counter', 'errors'),
+                                ('bytes_total', 'counter', 'bytes')):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for op, stats in sorted(snapshot.items()):
+                lines.append(f'{prefix}_{name}{{op="{op}"}} {stats[key]}')
+        
+        metric = f"{prefix}_latency_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for op, stats in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats['buckets']):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{op="{op}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{op="{op}",le="+Inf"}} {stats["calls"]}')
+            lines.append(f'{metric}_sum{{op="{op}"}} {stats["latency_sum"]}')
+            lines.append(f'{metric}_count{{op="{op}"}} {stats["calls"]}')
+        return '\n'.join(lines) + '\n'
+
+
+# Реестр по умолчанию, через который инструментированы file_operations и serialization
+REGISTRY = MetricsRegistry()
+clock = REGISTRY.clock
+observe = REGISTRY.observe
+
+
+def enable(*sinks) -> MetricsRegistry:
+    """Включить сбор метрик и (необязательно) подключить приёмники
+    
+    Args:
+        *sinks: Объекты с методом ``emit(event)``
+    
+    Returns:
+        Реестр по умолчанию
+    """
+    REGISTRY.sinks.extend(sinks)
+    REGISTRY.enabled = True
+    return REGISTRY
+
+
+def disable() -> None:
+    """Выключить сбор метрик и отключить приёмники"""
+    REGISTRY.enabled = False
+    REGISTRY.sinks.clear()
+
+
+def dump_prometheus(path: str, prefix: str = 'file_io') -> None:
+    """Записать счётчики в файл в текстовом формате Prometheus
+    
+    Подходит для node_exporter textfile collector: файл пишется во
+    временный и атомарно подменяется.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(REGISTRY.to_prometheus(prefix))
+    os.replace(tmp_path, path)
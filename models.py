@@ -1,18 +1,119 @@
 """
 Модели данных для приложения
 """
+import pickle
+import time
 from datetime import datetime
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from columnar import ProductTable
+
+
+def _now_us() -> int:
+    """Текущее время в микросекундах от эпохи Unix"""
+    return time.time_ns() // 1000
+
+
+def _datetime_to_us(value: datetime) -> int:
+    """Перевести datetime в микросекунды от эпохи Unix"""
+    return round(value.timestamp() * 1_000_000)
+
+
+def _us_to_datetime(value: int) -> datetime:
+    """Перевести микросекунды от эпохи Unix в локальный datetime"""
+    return datetime.fromtimestamp(value / 1_000_000)
+
+
+def _restore_slots(obj: object, state: Any) -> None:
+    """Восстановить состояние объекта со слотами
+    
+    Принимает как состояние ``(None, {слот: значение})`` от объектов со
+    ``__slots__``, так и словарь ``__dict__`` из старых pickle-файлов,
+    где ``created_at`` хранился как ``datetime``.
+    """
+    if isinstance(state, tuple):
+        state = state[1]
+    for key, value in state.items():
+        setattr(obj, key, value)
+
+
+# Версия компактного pickle-состояния моделей (см. __reduce__)
+PICKLE_STATE_VERSION = 1
+
+_new = object.__new__
+
+
+def _check_state_version(cls_name: str, version: int) -> None:
+    if version > PICKLE_STATE_VERSION:
+        raise pickle.UnpicklingError(
+            f"{cls_name}: версия состояния {version} новее поддерживаемой {PICKLE_STATE_VERSION}")
+
+
+def _restore_user(version: int, user_id: int, name: str, email: str, created_us: int) -> 'User':
+    """Восстановить User из компактного pickle-состояния"""
+    _check_state_version('User', version)
+    user = _new(User)
+    user.user_id = user_id
+    user.name = name
+    user.email = email
+    user._created_us = created_us
+    return user
+
+
+def _restore_product(version: int, product_id: int, name: str, price: float, stock: int) -> 'Product':
+    """Восстановить Product из компактного pickle-состояния"""
+    _check_state_version('Product', version)
+    product = _new(Product)
+    product.product_id = product_id
+    product.name = name
+    product.price = price
+    product.stock = stock
+    return product
+
+
+def _restore_order(version: int, order_id: int, user: 'User', products: List['Product'],
+                   total: float, created_us: int, status: str) -> 'Order':
+    """Восстановить Order из компактного pickle-состояния"""
+    _check_state_version('Order', version)
+    order = _new(Order)
+    order.order_id = order_id
+    order.user = user
+    order.products = products
+    order.total = total
+    order._created_us = created_us
+    order.status = status
+    order._owner = None
+    return order
 
 
 class User:
     """Класс пользователя"""
     
+    __slots__ = ('user_id', 'name', 'email', '_created_us')
+    
     def __init__(self, user_id: int, name: str, email: str):
         self.user_id = user_id
         self.name = name
         self.email = email
-        self.created_at = datetime.now()
+        self._created_us = _now_us()
+    
+    @property
+    def created_at(self) -> datetime:
+        """Время создания (хранится как целое число микросекунд)"""
+        return _us_to_datetime(self._created_us)
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created_us = _datetime_to_us(value)
+    
+    def __reduce__(self) -> tuple:
+        # Позиционное состояние без имён атрибутов, время - целое число микросекунд
+        return _restore_user, (PICKLE_STATE_VERSION, self.user_id, self.name,
+                               self.email, self._created_us)
+    
+    # Старые pickle-файлы (словарь или слоты) загружаются через __setstate__
+    __setstate__ = _restore_slots
     
     def __repr__(self) -> str:
         return f"User(id={self.user_id}, name='{self.name}', email='{self.email}')"
@@ -26,12 +127,20 @@ class User:
 class Product:
     """Класс продукта"""
     
+    __slots__ = ('product_id', 'name', 'price', 'stock')
+    
     def __init__(self, product_id: int, name: str, price: float, stock: int):
         self.product_id = product_id
         self.name = name
         self.price = price
         self.stock = stock
     
+    def __reduce__(self) -> tuple:
+        return _restore_product, (PICKLE_STATE_VERSION, self.product_id, self.name,
+                                  self.price, self.stock)
+    
+    __setstate__ = _restore_slots
+    
     def __repr__(self) -> str:
         return f"Product(id={self.product_id}, name='{self.name}', price={self.price}$, stock={self.stock})"
     
@@ -46,13 +155,33 @@ class Product:
 class Order:
     """Класс заказа"""
     
+    # _owner - база, которой сообщается об изменении статуса (в pickle не попадает)
+    __slots__ = ('order_id', 'user', 'products', 'total', '_created_us', 'status', '_owner')
+    
     def __init__(self, order_id: int, user: User, products: List[Product], total: float):
         self.order_id = order_id
         self.user = user
         self.products = products
         self.total = total
-        self.created_at = datetime.now()
+        self._created_us = _now_us()
         self.status = "pending"
+        self._owner: Optional['Database'] = None
+    
+    @property
+    def created_at(self) -> datetime:
+        """Время создания (хранится как целое число микросекунд)"""
+        return _us_to_datetime(self._created_us)
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created_us = _datetime_to_us(value)
+    
+    def __reduce__(self) -> tuple:
+        # _owner не сохраняется: база связывает заказы с собой при загрузке
+        return _restore_order, (PICKLE_STATE_VERSION, self.order_id, self.user, self.products,
+                                self.total, self._created_us, self.status)
+    
+    __setstate__ = _restore_slots
     
     def __repr__(self) -> str:
         product_names = ', '.join([p.name for p in self.products])
@@ -66,48 +195,391 @@ class Order:
     def complete(self):
         """Completed the order"""
         self.status = "completed"
+        owner = getattr(self, '_owner', None)
+        if owner is not None:
+            owner.mark_dirty(self)
     
     def cancel(self):
         """Cancel the order"""
         self.status = "cancelled"
+        owner = getattr(self, '_owner', None)
+        if owner is not None:
+            owner.mark_dirty(self)
+
+
+class IngestResult(NamedTuple):
+    """Итог пакетной загрузки записей в Database
+    
+    Attributes:
+        inserted: Сколько записей добавлено
+        skipped: Сколько точных дубликатов пропущено (ID уже занят равной записью)
+        conflicts: Сколько записей отклонено из-за конфликта (ID занят другой
+            записью или email уже принадлежит другому пользователю)
+    """
+    inserted: int
+    skipped: int
+    conflicts: int
+
+
+class ApplyResult(NamedTuple):
+    """Итог выгрузки колоночной таблицы в Database
+    
+    Attributes:
+        inserted: Сколько записей добавлено
+        updated: Сколько существующих записей обновлено на месте
+    """
+    inserted: int
+    updated: int
+
+
+class ChangeSet(NamedTuple):
+    """Изменения Database с момента последнего ``clear_changes``
+    
+    Attributes:
+        new: Добавленные записи: {'users' | 'products' | 'orders': [записи]}
+        dirty: Изменённые ранее существовавшие записи в том же виде
+    """
+    new: Dict[str, List[Any]]
+    dirty: Dict[str, List[Any]]
+    
+    @property
+    def size(self) -> int:
+        """Общее количество новых и изменённых записей"""
+        return sum(map(len, self.new.values())) + sum(map(len, self.dirty.values()))
 
 
 class Database:
-    """Класс для работы с базой данных"""
+    """Класс для работы с базой данных
+    
+    Списки ``users``, ``products`` и ``orders`` хранят записи в порядке
+    добавления, а словари-индексы по первичному ключу (и уникальный индекс
+    по ``User.email``) дают вставку и поиск за O(1). Добавлять записи
+    следует через методы ``add_*``, иначе индексы разойдутся со списками
+    (см. ``rebuild_indexes``).
+    
+    База отслеживает добавленные и изменённые записи (``changes()``):
+    заказы сами сообщают о ``complete()``/``cancel()``, прочие изменения
+    объектов на месте нужно отметить через ``mark_dirty``.
+    """
     
     def __init__(self):
         self.users: List[User] = []
         self.products: List[Product] = []
         self.orders: List[Order] = []
+        self._init_indexes()
+        self.clear_changes()
+    
+    def _init_indexes(self) -> None:
+        """Создать пустые индексы"""
+        self._users_by_id: Dict[int, User] = {}
+        self._users_by_email: Dict[str, User] = {}
+        self._products_by_id: Dict[int, Product] = {}
+        self._orders_by_id: Dict[int, Order] = {}
+    
+    def rebuild_indexes(self) -> None:
+        """Перестроить индексы по текущему содержимому списков
+        
+        Для дубликатов в списках побеждает первая запись, как и при
+        последовательном ``add_*``.
+        """
+        self._init_indexes()
+        users_by_id = self._users_by_id
+        users_by_email = self._users_by_email
+        for user in self.users:
+            users_by_id.setdefault(user.user_id, user)
+            users_by_email.setdefault(user.email, user)
+        products_by_id = self._products_by_id
+        for product in self.products:
+            products_by_id.setdefault(product.product_id, product)
+        orders_by_id = self._orders_by_id
+        for order in self.orders:
+            orders_by_id.setdefault(order.order_id, order)
+            order._owner = self
+    
+    def clear_changes(self) -> None:
+        """Забыть накопленные изменения (например, после сохранения)"""
+        self._new: Dict[str, Dict[Any, Any]] = {'users': {}, 'products': {}, 'orders': {}}
+        self._dirty: Dict[str, Dict[Any, Any]] = {'users': {}, 'products': {}, 'orders': {}}
+    
+    def mark_dirty(self, record: Any) -> None:
+        """Отметить запись как изменённую
+        
+        Args:
+            record: User, Product или Order этой базы
+        """
+        if isinstance(record, User):
+            kind, key = 'users', record.user_id
+        elif isinstance(record, Product):
+            kind, key = 'products', record.product_id
+        elif isinstance(record, Order):
+            kind, key = 'orders', record.order_id
+        else:
+            raise TypeError(f"Неизвестный тип записи: {type(record).__name__}")
+        if key not in self._new[kind]:
+            self._dirty[kind][key] = record
+    
+    def changes(self) -> ChangeSet:
+        """Новые и изменённые записи с момента ``clear_changes``"""
+        return ChangeSet(
+            {kind: list(records.values()) for kind, records in self._new.items()},
+            {kind: list(records.values()) for kind, records in self._dirty.items()},
+        )
+    
+    @property
+    def has_changes(self) -> bool:
+        """Есть ли несохранённые изменения"""
+        return any(self._new.values()) or any(self._dirty.values())
     
     def add_user(self, user: User) -> None:
-        """Добавить пользователя"""
-        if not any(u.user_id == user.user_id for u in self.users):
-            self.users.append(user)
+        """Добавить пользователя
+        
+        Пользователь с уже занятым ID или email не добавляется.
+        """
+        if user.user_id in self._users_by_id or user.email in self._users_by_email:
+            return
+        self._users_by_id[user.user_id] = user
+        self._users_by_email[user.email] = user
+        self.users.append(user)
+        self._new['users'][user.user_id] = user
     
     def add_product(self, product: Product) -> None:
         """Добавить продукт"""
-        if not any(p.product_id == product.product_id for p in self.products):
-            self.products.append(product)
+        if product.product_id in self._products_by_id:
+            return
+        self._products_by_id[product.product_id] = product
+        self.products.append(product)
+        self._new['products'][product.product_id] = product
     
     def add_order(self, order: Order) -> None:
         """Добавить заказ"""
-        if not any(o.order_id == order.order_id for o in self.orders):
-            self.orders.append(order)
+        if order.order_id in self._orders_by_id:
+            return
+        self._orders_by_id[order.order_id] = order
+        self.orders.append(order)
+        self._new['orders'][order.order_id] = order
+        order._owner = self
+    
+    def add_users(self, users: Iterable[User]) -> IngestResult:
+        """Добавить пользователей пакетом
+        
+        Принимает любой итерируемый объект (в том числе генератор) и
+        проверяет дубликаты по индексам за один проход без промежуточных
+        списков.
+        
+        Args:
+            users: Пользователи для добавления
+        
+        Returns:
+            Количество добавленных, пропущенных и конфликтных записей
+        """
+        by_id = self._users_by_id
+        by_email = self._users_by_email
+        append = self.users.append
+        new = self._new['users']
+        inserted = skipped = conflicts = 0
+        for user in users:
+            user_id = user.user_id
+            existing = by_id.get(user_id)
+            if existing is not None:
+                if existing == user and existing.email == user.email:
+                    skipped += 1
+                else:
+                    conflicts += 1
+                continue
+            email = user.email
+            if email in by_email:
+                conflicts += 1
+                continue
+            by_id[user_id] = user
+            by_email[email] = user
+            append(user)
+            new[user_id] = user
+            inserted += 1
+        return IngestResult(inserted, skipped, conflicts)
+    
+    def add_products(self, products: Iterable[Product]) -> IngestResult:
+        """Добавить продукты пакетом
+        
+        Args:
+            products: Продукты для добавления
+        
+        Returns:
+            Количество добавленных, пропущенных и конфликтных записей
+        """
+        by_id = self._products_by_id
+        append = self.products.append
+        new = self._new['products']
+        inserted = skipped = conflicts = 0
+        for product in products:
+            product_id = product.product_id
+            existing = by_id.get(product_id)
+            if existing is not None:
+                if existing == product:
+                    skipped += 1
+                else:
+                    conflicts += 1
+                continue
+            by_id[product_id] = product
+            append(product)
+            new[product_id] = product
+            inserted += 1
+        return IngestResult(inserted, skipped, conflicts)
+    
+    def add_orders(self, orders: Iterable[Order]) -> IngestResult:
+        """Добавить заказы пакетом
+        
+        Args:
+            orders: Заказы для добавления
+        
+        Returns:
+            Количество добавленных, пропущенных и конфликтных записей
+        """
+        by_id = self._orders_by_id
+        append = self.orders.append
+        new = self._new['orders']
+        inserted = skipped = conflicts = 0
+        for order in orders:
+            order_id = order.order_id
+            existing = by_id.get(order_id)
+            if existing is not None:
+                if existing == order:
+                    skipped += 1
+                else:
+                    conflicts += 1
+                continue
+            by_id[order_id] = order
+            append(order)
+            new[order_id] = order
+            order._owner = self
+            inserted += 1
+        return IngestResult(inserted, skipped, conflicts)
+    
+    def order_row(self, order: Order) -> tuple:
+        """Заказ без копий пользователя и продуктов из базы
+        
+        Пользователь и продукты, которые есть в индексах базы, заменяются
+        своими ID; остальные (не добавленные в базу) сохраняются целиком.
+        Обратное преобразование - ``order_from_row``.
+        
+        Returns:
+            (order_id, пользователь или ID, [продукты или ID], total,
+            created_us, status)
+        """
+        user = order.user
+        user_ref = user.user_id if self._users_by_id.get(user.user_id) is user else user
+        products_by_id = self._products_by_id
+        product_refs = [
+            product.product_id if products_by_id.get(product.product_id) is product else product
+            for product in order.products
+        ]
+        return (order.order_id, user_ref, product_refs, order.total, order._created_us, order.status)
+    
+    def order_from_row(self, row: tuple) -> Order:
+        """Собрать заказ из ``order_row``, связав ID с записями этой базы
+        
+        Raises:
+            KeyError: Пользователя или продукта с ID нет в базе
+        """
+        order_id, user_ref, product_refs, total, created_us, status = row
+        user = self._users_by_id[user_ref] if isinstance(user_ref, int) else user_ref
+        products_by_id = self._products_by_id
+        products = [products_by_id[ref] if isinstance(ref, int) else ref
+                    for ref in product_refs]
+        order = Order(order_id, user, products, total)
+        order._created_us = created_us
+        order.status = status
+        return order
+    
+    def relink_order(self, order: Order) -> Order:
+        """Связать заказ с записями этой базы
+        
+        Заказ, загруженный отдельно от базы (из журнала, части файла и т.п.),
+        ссылается на копии пользователя и продуктов. Метод заменяет их на
+        объекты из индексов, если они там есть.
+        
+        Args:
+            order: Заказ
+        
+        Returns:
+            Тот же заказ
+        """
+        user = self._users_by_id.get(order.user.user_id)
+        if user is not None:
+            order.user = user
+        products_by_id = self._products_by_id
+        order.products = [
+            products_by_id.get(product.product_id, product)
+            for product in order.products
+        ]
+        return order
     
-    def get_user(self, user_id: int) -> User:
+    def to_product_table(self) -> 'ProductTable':
+        """Построить колоночную таблицу по текущим продуктам
+        
+        Returns:
+            ProductTable с ID, ценами и остатками в array-колонках
+        """
+        from columnar import ProductTable
+        return ProductTable.from_products(self.products)
+    
+    def apply_product_table(self, table: 'ProductTable') -> ApplyResult:
+        """Выгрузить колоночную таблицу обратно в объекты Product
+        
+        Цены, названия и остатки существующих продуктов обновляются на
+        месте (ссылки из заказов остаются валидными), новые продукты
+        добавляются. Продукты, поля которых не изменились, не трогаются и
+        не помечаются изменёнными.
+        
+        Args:
+            table: Колоночная таблица продуктов
+        
+        Returns:
+            Число добавленных и фактически изменённых продуктов
+        """
+        by_id = self._products_by_id
+        inserted = updated = 0
+        for product_id, name, price, stock in zip(table.ids, table.names, table.prices, table.stock):
+            product = by_id.get(product_id)
+            if product is None:
+                product = Product(product_id, name, price, stock)
+                by_id[product_id] = product
+                self.products.append(product)
+                self._new['products'][product_id] = product
+                inserted += 1
+            elif product.name != name or product.price != price or product.stock != stock:
+                product.name = name
+                product.price = price
+                product.stock = stock
+                self.mark_dirty(product)
+                updated += 1
+        return ApplyResult(inserted, updated)
+    
+    def get_user(self, user_id: int) -> Optional[User]:
         """Получить пользователя по ID"""
-        for user in self.users:
-            if user.user_id == user_id:
-                return user
-        return None
+        return self._users_by_id.get(user_id)
+    
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """Получить пользователя по email"""
+        return self._users_by_email.get(email)
     
-    def get_product(self, product_id: int) -> Product:
+    def get_product(self, product_id: int) -> Optional[Product]:
         """Получить продукт по ID"""
-        for product in self.products:
-            if product.product_id == product_id:
-                return product
-        return None
+        return self._products_by_id.get(product_id)
+    
+    def get_order(self, order_id: int) -> Optional[Order]:
+        """Получить заказ по ID"""
+        return self._orders_by_id.get(order_id)
+    
+    def __getstate__(self) -> dict:
+        # Индексы не сохраняются: они восстанавливаются из списков при загрузке
+        return {'users': self.users, 'products': self.products, 'orders': self.orders}
+    
+    def __setstate__(self, state: dict) -> None:
+        self.users = state['users']
+        self.products = state['products']
+        self.orders = state['orders']
+        self.rebuild_indexes()
+        self.clear_changes()
     
     def __repr__(self) -> str:
         return f"Database(users={len(self.users)}, products={len(self.products)}, orders={len(self.orders)})"
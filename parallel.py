@@ -0,0 +1,240 @@
+"""
+Параллельное сохранение и загрузка Database по частям
+"""
+import json
+import multiprocessing
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from compression import decompress
+from file_operations import read_binary
+from models import Database, Order
+from serialization import PickleSerializer
+
+MANIFEST_NAME = 'manifest.json'
+# Версия 2: части заказов хранят строки ``Database.order_row`` вместо Order
+MANIFEST_VERSION = 2
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Коллекции Database в порядке загрузки: заказы ссылаются на пользователей и продукты
+_KINDS = ('users', 'products', 'orders')
+
+# База, унаследованная процессами пула при fork (см. save_parallel)
+_SOURCE: Optional[Database] = None
+
+
+def _part_name(kind: str, generation: int, index: int) -> str:
+    return f"{kind}-part-g{generation:05d}-{index:05d}.pkl"
+
+
+# Имена частей, которые пишет save_parallel (другие файлы директории не трогаются)
+_PART_PATTERN = re.compile(r'(users|products|orders)-part-g\d{5}-\d{5}\.pkl')
+
+
+def _fork_context():
+    """Контекст fork, если платформа его поддерживает"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def _slice_records(db: Database, kind: str, start: int, stop: int) -> list:
+    """Записи части; заказы - строками с ID пользователя и продуктов"""
+    records = getattr(db, kind)[start:stop]
+    if kind == 'orders':
+        records = [db.order_row(order) for order in records]
+    return records
+
+
+def _save_slice(kind: str, start: int, stop: int, filename: str, directory: str,
+                compression: Optional[str], level: Optional[int]) -> None:
+    """Сохранить срез коллекции унаследованной базы (выполняется в процессе пула)"""
+    records = _slice_records(_SOURCE, kind, start, stop)
+    PickleSerializer.serialize(records, filename, directory, compression, level)
+
+
+def _save_records(records: list, filename: str, directory: str,
+                  compression: Optional[str], level: Optional[int]) -> None:
+    """Сохранить переданные записи (без fork записи приходят через pickle)"""
+    PickleSerializer.serialize(records, filename, directory, compression, level)
+
+
+def _read_part(filename: str, directory: str) -> bytes:
+    """Прочитать и распаковать часть (выполняется в процессе пула)"""
+    return decompress(read_binary(filename, directory))
+
+
+def _fsync_file(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def save_parallel(db: Database, directory: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  workers: Optional[int] = None, compression: Optional[str] = None,
+                  level: Optional[int] = None) -> Dict[str, Any]:
+    """Сохранить базу частями в несколько процессов
+    
+    Пользователи, продукты и заказы режутся на части по ``chunk_size``
+    записей, каждая часть сериализуется отдельным процессом в свой файл.
+    Там, где доступен fork, процессы наследуют базу и получают только
+    границы среза, поэтому сериализация и сжатие масштабируются по ядрам.
+    Заказы пишутся строками ``Database.order_row``: пользователь и
+    продукты из базы заменяются своими ID и не копируются в каждую часть.
+    Части каждого сохранения получают новый номер поколения в имени
+    (``users-part-g00002-00000.pkl``) и не перезаписывают части предыдущего.
+    После записи и сброса на диск всех частей манифест атомарно
+    переключается на новое поколение, и только затем удаляются старые
+    части: при сбое посреди сохранения манифест указывает на предыдущую
+    целостную версию.
+    
+    Args:
+        db: База данных
+        directory: Директория для частей и манифеста
+        chunk_size: Записей в одной части
+        workers: Количество процессов (по умолчанию - число ядер;
+            1 - без пула, в текущем процессе)
+        compression: Кодек сжатия частей
+        level: Уровень сжатия
+    
+    Returns:
+        Записанный манифест
+    """
+    global _SOURCE
+    if chunk_size < 1:
+        raise ValueError("chunk_size должен быть не меньше 1")
+    os.makedirs(directory, exist_ok=True)
+    try:
+        previous = read_manifest(directory)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    generation = previous.get('generation', 0) + 1
+    
+    parts: List[Dict[str, Any]] = []
+    jobs: List[Tuple[str, int, int, str]] = []
+    for kind in _KINDS:
+        total = len(getattr(db, kind))
+        for index, start in enumerate(range(0, total, chunk_size)):
+            stop = min(start + chunk_size, total)
+            filename = _part_name(kind, generation, index)
+            parts.append({'kind': kind, 'file': filename, 'count': stop - start})
+            jobs.append((kind, start, stop, filename))
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        for kind, start, stop, filename in jobs:
+            _save_records(_slice_records(db, kind, start, stop), filename, directory,
+                          compression, level)
+    else:
+        context = _fork_context()
+        _SOURCE = db
+        try:
+            with ProcessPoolExecutor(min(workers, len(jobs)), mp_context=context) as pool:
+                if context is not None:
+                    futures = [pool.submit(_save_slice, kind, start, stop, filename,
+                                           directory, compression, level)
+                               for kind, start, stop, filename in jobs]
+                else:
+                    futures = [pool.submit(_save_records, _slice_records(db, kind, start, stop),
+                                           filename, directory, compression, level)
+                               for kind, start, stop, filename in jobs]
+                for future in futures:
+                    future.result()
+        finally:
+            _SOURCE = None
+    
+    for kind, start, stop, filename in jobs:
+        _fsync_file(os.path.join(directory, filename))
+    
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generation': generation,
+        'chunk_size': chunk_size,
+        'compression': compression,
+        'parts': parts,
+    }
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(manifest_path + '.tmp', manifest_path)
+    
+    # Части предыдущего манифеста и незавершённых сохранений
+    current = {part['file'] for part in parts}
+    stale = {part['file'] for part in previous.get('parts', ())}
+    stale.update(name for name in os.listdir(directory) if _PART_PATTERN.fullmatch(name))
+    for name in stale - current:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    """Прочитать манифест частей
+    
+    Raises:
+        FileNotFoundError: Манифеста нет
+        ValueError: Неподдерживаемая версия манифеста
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') not in (1, MANIFEST_VERSION):
+        raise ValueError(f"Неподдерживаемая версия манифеста: {manifest.get('version')}")
+    return manifest
+
+
+def load_parallel(directory: str, workers: Optional[int] = None) -> Database:
+    """Загрузить базу, сохранённую ``save_parallel``
+    
+    Процессы пула только читают и распаковывают части и возвращают
+    байты; ``pickle.loads`` выполняется в текущем процессе, так как
+    готовые объекты пришлось бы заново сериализовать для передачи между
+    процессами. Поэтому пул ускоряет лишь чтение и распаковку сжатых
+    частей, а десериализация остаётся последовательной. Части сливаются
+    пакетной вставкой в порядке манифеста, заказы связываются с
+    загруженными пользователями и продуктами.
+    
+    Args:
+        directory: Директория с частями и манифестом
+        workers: Количество процессов (1 - без пула; по умолчанию - число
+            ядер для сжатых частей и 1 для несжатых)
+    
+    Returns:
+        Собранная база с построенными индексами
+    """
+    manifest = read_manifest(directory)
+    parts = manifest['parts']
+    if workers is None:
+        workers = (os.cpu_count() or 1) if manifest.get('compression') else 1
+    
+    if workers == 1 or len(parts) <= 1:
+        payloads = (_read_part(part['file'], directory) for part in parts)
+        return _merge(parts, payloads)
+    with ProcessPoolExecutor(min(workers, len(parts)), mp_context=_fork_context()) as pool:
+        futures = [pool.submit(_read_part, part['file'], directory) for part in parts]
+        return _merge(parts, (future.result() for future in futures))
+
+
+def _merge(parts: List[Dict[str, Any]], payloads) -> Database:
+    """Десериализовать части и собрать из них базу в порядке манифеста"""
+    db = Database()
+    add = {'users': db.add_users, 'products': db.add_products, 'orders': db.add_orders}
+    for part, payload in zip(parts, payloads):
+        records = pickle.loads(payload)
+        if len(records) != part['count']:
+            raise pickle.UnpicklingError(
+                f"Часть {part['file']}: ожидалось {part['count']} записей, найдено {len(records)}")
+        if part['kind'] == 'orders':
+            # Части версии 1 хранят заказы целиком
+            records = [db.relink_order(order) if isinstance(order, Order)
+                       else db.order_from_row(order) for order in records]
+        add[part['kind']](records)
+    return db
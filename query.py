@@ -0,0 +1,282 @@
+"""
+Запросы к Database: фильтрация, проекция, группировка и top-k с учётом индексов
+"""
+import heapq
+import operator
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Операторы сравнения в where(field, op, value)
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+    'contains': lambda value, item: item in value,
+}
+
+# Индексы, доступные через get_*-методы базы: коллекция -> {поле: метод}
+_INDEXES: Dict[str, Dict[str, str]] = {
+    'users': {'user_id': 'get_user', 'email': 'get_user_by_email'},
+    'products': {'product_id': 'get_product'},
+    'orders': {'order_id': 'get_order'},
+}
+
+ACCESS_INDEX = 'index'
+ACCESS_SCAN = 'scan'
+
+
+def _count(values: Iterable[Any]) -> int:
+    return sum(1 for _ in values)
+
+
+def _avg(values: Iterable[Any]) -> Optional[float]:
+    total = count = 0
+    for value in values:
+        total += value
+        count += 1
+    return total / count if count else None
+
+
+# Агрегатные функции aggregate(name=(функция, поле))
+_AGGREGATES: Dict[str, Callable[[Iterable[Any]], Any]] = {
+    'count': _count,
+    'sum': sum,
+    'min': lambda values: min(values, default=None),
+    'max': lambda values: max(values, default=None),
+    'avg': _avg,
+}
+
+
+class Predicate(NamedTuple):
+    """Условие фильтра
+    
+    Attributes:
+        field: Путь к атрибуту (``'user.user_id'``) или None для функции
+        op: Оператор из ``'==', '!=', '<', '<=', '>', '>=', 'in', 'contains'``
+            или ``'func'``
+        value: Значение для сравнения или функция record -> bool
+    """
+    field: Optional[str]
+    op: str
+    value: Any
+    
+    def __str__(self) -> str:
+        if self.op == 'func':
+            return getattr(self.value, '__name__', repr(self.value))
+        return f"{self.field} {self.op} {self.value!r}"
+
+
+class QueryPlan(NamedTuple):
+    """План выполнения запроса
+    
+    Attributes:
+        kind: Коллекция ('users', 'products', 'orders')
+        access: 'index' - выборка по ключам через индекс, 'scan' - полный обход
+        index: Поле индекса (для 'index')
+        keys: Ключи выборки по индексу
+        filters: Условия, проверяемые для каждой выбранной записи
+    """
+    kind: str
+    access: str
+    index: Optional[str]
+    keys: Tuple[Any, ...]
+    filters: Tuple[Predicate, ...]
+
+
+class Query:
+    """Запрос к коллекции базы
+    
+    Источник - Database или любая база с коллекциями ``users``/``products``/
+    ``orders`` и методами ``get_user``, ``get_user_by_email``, ``get_product``,
+    ``get_order`` (например, LazyDatabase). Методы-построители (``where``,
+    ``group_by``) возвращают новый запрос, исходный не меняется; записи
+    читаются только при вызове завершающих методов (``all``, ``select``,
+    ``aggregate``, ``top`` и т.д.).
+    
+    Условие ``==`` или ``in`` по первичному ключу коллекции (или по email
+    пользователя) выполняется через индекс базы, остальные условия
+    проверяются для выбранных записей. Без такого условия запрос обходит
+    коллекцию целиком. Выбранный путь показывает ``explain()``::
+    
+        revenue = (Query(db, 'orders')
+                   .where('status', '==', 'completed')
+                   .group_by('user.user_id')
+                   .aggregate(revenue=('sum', 'total'), orders=('count', None)))
+    """
+    
+    def __init__(self, db: Any, kind: str):
+        """
+        Args:
+            db: База данных
+            kind: 'users', 'products' или 'orders'
+        """
+        if kind not in _INDEXES:
+            raise ValueError(f"Неизвестная коллекция: {kind}")
+        self.db = db
+        self.kind = kind
+        self._predicates: Tuple[Predicate, ...] = ()
+        self._group_by: Tuple[str, ...] = ()
+    
+    def _copy(self, **changes) -> 'Query':
+        query = Query.__new__(Query)
+        query.__dict__.update(self.__dict__)
+        query.__dict__.update(changes)
+        return query
+    
+    # --- Построение --------------------------------------------------------
+    
+    def where(self, field: Union[str, Callable[[Any], bool]], op: str = '==',
+              value: Any = None) -> 'Query':
+        """Добавить условие (условия объединяются через И)
+        
+        Args:
+            field: Путь к атрибуту через точку или функция record -> bool
+            op: Оператор сравнения
+            value: Значение (для 'in' - коллекция значений)
+        
+        Returns:
+            Новый запрос
+        """
+        if callable(field):
+            predicate = Predicate(None, 'func', field)
+        elif op not in _OPERATORS:
+            raise ValueError(f"Неизвестный оператор: {op}")
+        else:
+            predicate = Predicate(field, op, value)
+        return self._copy(_predicates=self._predicates + (predicate,))
+    
+    def group_by(self, *fields: str) -> 'Query':
+        """Группировать записи по полям для ``aggregate``
+        
+        Returns:
+            Новый запрос
+        """
+        return self._copy(_group_by=fields)
+    
+    # --- План --------------------------------------------------------------
+    
+    def plan(self) -> QueryPlan:
+        """Выбрать путь выполнения: первый подходящий индекс или обход"""
+        indexes = _INDEXES[self.kind]
+        for position, predicate in enumerate(self._predicates):
+            if predicate.field in indexes and predicate.op in ('==', 'in'):
+                keys = (predicate.value,) if predicate.op == '==' else tuple(dict.fromkeys(predicate.value))
+                filters = self._predicates[:position] + self._predicates[position + 1:]
+                return QueryPlan(self.kind, ACCESS_INDEX, predicate.field, keys, filters)
+        return QueryPlan(self.kind, ACCESS_SCAN, None, (), self._predicates)
+    
+    def explain(self) -> str:
+        """Описание плана выполнения в текстовом виде"""
+        plan = self.plan()
+        if plan.access == ACCESS_INDEX:
+            lines = [f"IndexLookup {plan.kind}.{plan.index} keys={len(plan.keys)}"]
+        else:
+            lines = [f"Scan {plan.kind} ({len(getattr(self.db, plan.kind))} records)"]
+        for predicate in plan.filters:
+            lines.append(f"  Filter {predicate}")
+        if self._group_by:
+            lines.append(f"  GroupBy {', '.join(self._group_by)}")
+        return '\n'.join(lines)
+    
+    # --- Выполнение --------------------------------------------------------
+    
+    def __iter__(self) -> Iterator[Any]:
+        """Записи, удовлетворяющие условиям (читаются по одной)"""
+        plan = self.plan()
+        if plan.access == ACCESS_INDEX:
+            lookup = getattr(self.db, _INDEXES[plan.kind][plan.index])
+            records: Iterable[Any] = (record for record in map(lookup, plan.keys)
+                                      if record is not None)
+        else:
+            records = getattr(self.db, plan.kind)
+        checks = [self._check(predicate) for predicate in plan.filters]
+        if not checks:
+            return iter(records)
+        return (record for record in records if all(check(record) for check in checks))
+    
+    @staticmethod
+    def _check(predicate: Predicate) -> Callable[[Any], bool]:
+        if predicate.op == 'func':
+            return predicate.value
+        getter = operator.attrgetter(predicate.field)
+        compare = _OPERATORS[predicate.op]
+        value = predicate.value
+        return lambda record: compare(getter(record), value)
+    
+    def all(self) -> List[Any]:
+        """Все подходящие записи"""
+        return list(self)
+    
+    def first(self) -> Optional[Any]:
+        """Первая подходящая запись или None"""
+        return next(iter(self), None)
+    
+    def count(self) -> int:
+        """Количество подходящих записей"""
+        return _count(self)
+    
+    def select(self, *fields: str) -> List[Tuple[Any, ...]]:
+        """Проекция: кортежи значений полей подходящих записей
+        
+        Args:
+            fields: Пути к атрибутам через точку
+        """
+        getters = [operator.attrgetter(field) for field in fields]
+        return [tuple(getter(record) for getter in getters) for record in self]
+    
+    def top(self, k: int, field: str, largest: bool = True) -> List[Any]:
+        """k записей с наибольшим (или наименьшим) значением поля
+        
+        Выполняется через кучу за O(n log k), без сортировки всех записей.
+        
+        Args:
+            k: Количество записей
+            field: Путь к атрибуту через точку
+            largest: False - наименьшие значения
+        """
+        pick = heapq.nlargest if largest else heapq.nsmallest
+        return pick(k, self, key=operator.attrgetter(field))
+    
+    def aggregate(self, **aggregates: Tuple[str, Optional[str]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Агрегаты по подходящим записям
+        
+        Args:
+            aggregates: Имя результата -> (функция, поле); функции 'count',
+                'sum', 'min', 'max', 'avg'; для 'count' поле может быть None
+        
+        Returns:
+            Словарь агрегатов или, после ``group_by``, список словарей
+            (поля группировки и агрегаты) в порядке первого появления группы
+        """
+        specs = []
+        for name, (func, field) in aggregates.items():
+            if func not in _AGGREGATES:
+                raise ValueError(f"Неизвестная агрегатная функция: {func}")
+            if field is None and func != 'count':
+                raise ValueError(f"{name}: для '{func}' нужно поле")
+            specs.append((name, _AGGREGATES[func],
+                          operator.attrgetter(field) if field is not None else None))
+        
+        if not self._group_by:
+            records = list(self)
+            return {name: func(records if getter is None else map(getter, records))
+                    for name, func, getter in specs}
+        
+        key_getter = operator.attrgetter(*self._group_by)
+        groups: Dict[Any, List[Any]] = {}
+        for record in self:
+            groups.setdefault(key_getter(record), []).append(record)
+        results = []
+        for key, records in groups.items():
+            keys = key if len(self._group_by) > 1 else (key,)
+            row = dict(zip(self._group_by, keys))
+            for name, func, getter in specs:
+                row[name] = func(records if getter is None else map(getter, records))
+            results.append(row)
+        return results
+    
+    def __repr__(self) -> str:
+        return f"Query(kind='{self.kind}', filters={len(self._predicates)}, group_by={self._group_by})"
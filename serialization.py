@@ -1,41 +1,144 @@
 """
 Модуль для сериализации и десериализации объектов
 """
+import os
 import pickle
 import json
-from typing import Any, TypeVar
+import struct
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO, TypeVar, Union
 from pathlib import Path
 
+import metrics
+from cache import MISSING, LRUCache
+from compression import open_compressed
+from file_operations import read_binary_mmap
+from json_codec import ModelJSONCodec
+
 T = TypeVar('T')
 
+# Потоковый формат pickle: заголовок файла, затем кадры
+# <длина полезной нагрузки: uint32><флаги: uint8><pickle>
+STREAM_MAGIC = b'PKLS'
+STREAM_VERSION = 1
+_STREAM_HEADER = struct.Struct('<4sB')
+STREAM_HEADER_SIZE = _STREAM_HEADER.size
+_FRAME_HEADER = struct.Struct('<IB')
+_FRAME_RECORD = 0
+_FRAME_BATCH = 1
+
+
+def _observe_file(op: str, started: float, file_path: Path) -> None:
+    """Учесть операцию с размером файла (stat выполняется, только если метрики включены)"""
+    if started:
+        metrics.observe(op, started, os.path.getsize(file_path))
+
+
+# Режимы deserialize_cached
+CACHE_SHARED = 'shared'
+CACHE_COPY = 'copy'
+
+# Кэш десериализованных объектов для deserialize_cached (бюджет 0 - выключен)
+_object_cache = LRUCache(0)
+
+
+def configure_object_cache(max_bytes: int) -> LRUCache:
+    """Заменить кэш ``deserialize_cached`` новым с заданным бюджетом
+    
+    До первого вызова бюджет кэша нулевой: ``deserialize_cached`` каждый
+    раз читает файл. ``configure_object_cache(0)`` снова выключает кэш.
+    
+    Args:
+        max_bytes: Бюджет в байтах
+    
+    Returns:
+        Новый кэш
+    """
+    global _object_cache
+    _object_cache = LRUCache(max_bytes)
+    return _object_cache
+
+
+def object_cache() -> LRUCache:
+    """Текущий кэш ``deserialize_cached``"""
+    return _object_cache
+
+
+def _invalidate_cached(kind: str, file_path: Path) -> None:
+    """Сбросить записи кэша для файла после его перезаписи"""
+    path = os.path.abspath(file_path)
+    _object_cache.invalidate((kind, CACHE_SHARED, path))
+    _object_cache.invalidate((kind, CACHE_COPY, path))
+
+
+def _deserialize_cached(kind: str, file_path: Path, mode: str, load: Callable[[], Any],
+                        read_payload: Callable[[], Any], decode: Callable[[Any], Any]) -> Any:
+    """Общая часть deserialize_cached обоих сериализаторов
+    
+    Args:
+        kind: 'pickle' или 'json'
+        file_path: Путь к файлу
+        mode: CACHE_SHARED или CACHE_COPY
+        load: Полная десериализация файла (кэш выключен)
+        read_payload: Чтение распакованного содержимого файла
+        decode: Декодирование содержимого в новый объект
+    """
+    if mode not in (CACHE_SHARED, CACHE_COPY):
+        raise ValueError(f"Неизвестный режим кэша: {mode}")
+    if not _object_cache.max_bytes:
+        return load()
+    st = os.stat(file_path)
+    version = (st.st_mtime_ns, st.st_size)
+    key = (kind, mode, os.path.abspath(file_path))
+    cached = _object_cache.get(key, version)
+    if mode == CACHE_SHARED:
+        if cached is MISSING:
+            payload = read_payload()
+            cached = decode(payload)
+            # Длина распакованного содержимого - нижняя оценка объёма
+            # объекта без обхода его графа (размер сжатого файла занижает её)
+            _object_cache.put(key, version, cached, len(payload))
+        return cached
+    if cached is MISSING:
+        cached = read_payload()
+        _object_cache.put(key, version, cached, len(cached))
+    return decode(cached)
+
 
 class PickleSerializer:
     """сериалайзер для pickle"""
     
     @staticmethod
-    def serialize(obj: Any, filename: str, directory: str = 'data') -> None:
+    def serialize(obj: Any, filename: str, directory: str = 'data',
+                  compression: Optional[str] = None, level: Optional[int] = None) -> None:
         """Сериализовать объект в pickle файл
         
         Args:
             obj: Объект для сериализации
             filename: Название файла
             directory: Директория
+            compression: Кодек сжатия ('zlib', 'bz2', 'lzma', ...), None - без сжатия
+            level: Уровень сжатия (по умолчанию - уровень кодека)
         """
+        started = metrics.clock()
         Path(directory).mkdir(parents=True, exist_ok=True)
         file_path = Path(directory) / filename
         
         try:
-            with open(file_path, 'wb') as f:
+            with open_compressed(file_path, 'wb', compression, level) as f:
                 pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
-            print(f"✓ Объект сериализован в '{file_path}'")
         except Exception as e:
-            print(f"✗ Ошибка сериализации: {e}")
+            metrics.observe('pickle.serialize', started, error=e)
             raise
+        finally:
+            _invalidate_cached('pickle', file_path)
+        _observe_file('pickle.serialize', started, file_path)
     
     @staticmethod
     def deserialize(filename: str, directory: str = 'data') -> Any:
         """Десериализовать объект из pickle файла
         
+        Сжатый файл распознаётся и распаковывается автоматически.
+        
         Args:
             filename: Название файла
             directory: Директория
@@ -43,16 +146,47 @@ class PickleSerializer:
         Returns:
             Десериализованный объект
         """
+        started = metrics.clock()
         file_path = Path(directory) / filename
         
         try:
-            with open(file_path, 'rb') as f:
+            with open_compressed(file_path, 'rb') as f:
                 obj = pickle.load(f)
-            print(f"✓ Объект десериализован из '{file_path}'")
-            return obj
         except Exception as e:
-            print(f"✗ Ошибка десериализации: {e}")
+            metrics.observe('pickle.deserialize', started, error=e)
             raise
+        _observe_file('pickle.deserialize', started, file_path)
+        return obj
+    
+    @staticmethod
+    def deserialize_cached(filename: str, directory: str = 'data',
+                           mode: str = CACHE_SHARED) -> Any:
+        """Десериализовать pickle-файл через кэш
+        
+        Пока mtime и размер файла не изменились, файл не перечитывается
+        (кэш включается ``configure_object_cache``). В режиме ``'shared'`` все вызовы получают один и тот же объект -
+        изменять его нельзя. В режиме ``'copy'`` кэшируется распакованное
+        содержимое файла и каждый вызов получает новый объект: это дешевле
+        ``copy.deepcopy`` и не требует повторного чтения и распаковки.
+        
+        Args:
+            filename: Название файла
+            directory: Директория
+            mode: 'shared' или 'copy'
+        
+        Returns:
+            Десериализованный объект
+        """
+        file_path = Path(directory) / filename
+        
+        def read_payload() -> bytes:
+            with open_compressed(file_path, 'rb') as f:
+                return f.read()
+        
+        return _deserialize_cached(
+            'pickle', file_path, mode,
+            lambda: PickleSerializer.deserialize(filename, directory),
+            read_payload, pickle.loads)
     
     @staticmethod
     def serialize_to_bytes(obj: Any) -> bytes:
@@ -67,45 +201,228 @@ class PickleSerializer:
         return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
     
     @staticmethod
-    def deserialize_from_bytes(data: bytes) -> Any:
+    def deserialize_from_bytes(data: Union[bytes, bytearray, memoryview]) -> Any:
         """Десериализовать объект из байтов
         
         Args:
-            data: байты для десериализации
+            data: байты для десериализации (подойдёт любой bytes-like объект,
+                например memoryview из ``read_binary_mmap``, - без копирования)
         
         Returns:
             десериализованный объект
         """
         return pickle.loads(data)
+    
+    @staticmethod
+    def deserialize_mmap(filename: str, directory: str = 'data') -> Any:
+        """Десериализовать объект из pickle файла, отображённого в память
+        
+        В отличие от ``deserialize``, файл не копируется в буфер Python, а
+        pickle читается прямо из отображения.
+        
+        Args:
+            filename: Название файла
+            directory: Директория
+        
+        Returns:
+            Десериализованный объект
+        """
+        with read_binary_mmap(filename, directory) as view:
+            return PickleSerializer.deserialize_from_bytes(view)
+    
+    @staticmethod
+    def write_stream_header(f: BinaryIO) -> None:
+        """Записать заголовок потокового формата в начало файла"""
+        f.write(_STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION))
+    
+    @staticmethod
+    def read_stream_header(f: BinaryIO) -> int:
+        """Прочитать и проверить заголовок потокового формата
+        
+        Args:
+            f: Файл, открытый в режиме 'rb' и установленный на начало
+        
+        Returns:
+            Версия формата
+        """
+        name = getattr(f, 'name', 'поток')
+        header = f.read(_STREAM_HEADER.size)
+        if len(header) < _STREAM_HEADER.size:
+            raise pickle.UnpicklingError(f"'{name}' не является потоковым pickle-файлом")
+        magic, version = _STREAM_HEADER.unpack(header)
+        if magic != STREAM_MAGIC:
+            raise pickle.UnpicklingError(f"'{name}' не является потоковым pickle-файлом")
+        if version > STREAM_VERSION:
+            raise pickle.UnpicklingError(f"Неподдерживаемая версия потока: {version}")
+        return version
+    
+    @staticmethod
+    def dump_stream(objects: Iterable[Any], f: BinaryIO, batch_size: int = 1) -> int:
+        """Записать объекты в открытый файл кадрами потокового формата
+        
+        Каждый объект (или пачка из ``batch_size`` объектов) - отдельный
+        pickle-кадр с префиксом длины, поэтому в памяти одновременно
+        находится не больше одной пачки.
+        
+        Args:
+            objects: Итерируемый объект или генератор
+            f: Файл, открытый в режиме 'wb' или 'ab'
+            batch_size: Сколько объектов класть в один кадр
+        
+        Returns:
+            Количество записанных объектов
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть не меньше 1")
+        header = _FRAME_HEADER.pack
+        dumps = pickle.dumps
+        protocol = pickle.HIGHEST_PROTOCOL
+        write = f.write
+        count = 0
+        if batch_size == 1:
+            for obj in objects:
+                payload = dumps(obj, protocol=protocol)
+                write(header(len(payload), _FRAME_RECORD))
+                write(payload)
+                count += 1
+            return count
+        
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == batch_size:
+                payload = dumps(batch, protocol=protocol)
+                write(header(len(payload), _FRAME_BATCH))
+                write(payload)
+                count += len(batch)
+                batch = []
+        if batch:
+            payload = dumps(batch, protocol=protocol)
+            write(header(len(payload), _FRAME_BATCH))
+            write(payload)
+            count += len(batch)
+        return count
+    
+    @staticmethod
+    def load_stream(f: BinaryIO) -> Iterator[Any]:
+        """Лениво читать объекты из кадров потокового формата
+        
+        Args:
+            f: Файл, открытый в режиме 'rb' и установленный на первый кадр
+        
+        Yields:
+            Объекты по одному, в порядке записи
+        """
+        read = f.read
+        header_size = _FRAME_HEADER.size
+        unpack = _FRAME_HEADER.unpack
+        loads = pickle.loads
+        while True:
+            header = read(header_size)
+            if not header:
+                return
+            if len(header) < header_size:
+                raise pickle.UnpicklingError("Обрезанный заголовок кадра")
+            length, flags = unpack(header)
+            payload = read(length)
+            if len(payload) < length:
+                raise pickle.UnpicklingError("Обрезанный кадр")
+            if flags == _FRAME_BATCH:
+                yield from loads(payload)
+            else:
+                yield loads(payload)
+    
+    @staticmethod
+    def serialize_iter(objects: Iterable[Any], filename: str, directory: str = 'data',
+                       batch_size: int = 1, append: bool = False,
+                       compression: Optional[str] = None, level: Optional[int] = None) -> int:
+        """Сериализовать поток объектов в файл потокового формата
+        
+        Args:
+            objects: Итерируемый объект или генератор
+            filename: Название файла
+            directory: Директория
+            batch_size: Сколько объектов класть в один кадр
+            append: Дописать кадры в конец существующего файла
+            compression: Кодек потокового сжатия, None - без сжатия
+            level: Уровень сжатия
+        
+        Returns:
+            Количество записанных объектов
+        """
+        if append and compression is not None:
+            raise ValueError("Дозапись в сжатый поток не поддерживается")
+        started = metrics.clock()
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        file_path = Path(directory) / filename
+        append = append and file_path.exists() and file_path.stat().st_size > 0
+        
+        try:
+            with open_compressed(file_path, 'ab' if append else 'wb', compression, level) as f:
+                if not append:
+                    PickleSerializer.write_stream_header(f)
+                count = PickleSerializer.dump_stream(objects, f, batch_size)
+        except Exception as e:
+            metrics.observe('pickle.serialize_iter', started, error=e)
+            raise
+        _observe_file('pickle.serialize_iter', started, file_path)
+        return count
+    
+    @staticmethod
+    def deserialize_iter(filename: str, directory: str = 'data') -> Iterator[Any]:
+        """Лениво десериализовать объекты из файла потокового формата
+        
+        Сжатый поток распознаётся и распаковывается автоматически.
+        
+        Args:
+            filename: Название файла
+            directory: Директория
+        
+        Yields:
+            Объекты по одному, в порядке записи
+        """
+        file_path = Path(directory) / filename
+        
+        with open_compressed(file_path, 'rb') as f:
+            PickleSerializer.read_stream_header(f)
+            yield from PickleSerializer.load_stream(f)
 
 
 class JSONSerializer:
     """сериалайзер для JSON"""
     
     @staticmethod
-    def serialize(obj: Any, filename: str, directory: str = 'data') -> None:
+    def serialize(obj: Any, filename: str, directory: str = 'data',
+                  compression: Optional[str] = None, level: Optional[int] = None) -> None:
         """Сериализовать объект в JSON файл
         
         Args:
             obj: Объект для сериализации
             filename: Название файла
             directory: Директория
+            compression: Кодек сжатия ('zlib', 'bz2', 'lzma', ...), None - без сжатия
+            level: Уровень сжатия (по умолчанию - уровень кодека)
         """
+        started = metrics.clock()
         Path(directory).mkdir(parents=True, exist_ok=True)
         file_path = Path(directory) / filename
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open_compressed(file_path, 'w', compression, level, encoding='utf-8') as f:
                 json.dump(obj, f, indent=2, ensure_ascii=False, default=str)
-            print(f"✓ Объект сериализован в '{file_path}'")
         except Exception as e:
-            print(f"✗ Ошибка сериализации: {e}")
+            metrics.observe('json.serialize', started, error=e)
             raise
+        finally:
+            _invalidate_cached('json', file_path)
+        _observe_file('json.serialize', started, file_path)
     
     @staticmethod
     def deserialize(filename: str, directory: str = 'data') -> Any:
         """Десериализовать объект из JSON файла
         
+        Сжатый файл распознаётся и распаковывается автоматически.
+        
         Args:
             filename: Название файла
             directory: Директория
@@ -113,13 +430,185 @@ class JSONSerializer:
         Returns:
             десериализованный объект
         """
+        started = metrics.clock()
         file_path = Path(directory) / filename
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open_compressed(file_path, 'r', encoding='utf-8') as f:
                 obj = json.load(f)
-            print(f"✓ Объект десериализован из '{file_path}'")
-            return obj
         except Exception as e:
-            print(f"✗ Ошибка десериализации: {e}")
+            metrics.observe('json.deserialize', started, error=e)
             raise
+        _observe_file('json.deserialize', started, file_path)
+        return obj
+    
+    @staticmethod
+    def deserialize_cached(filename: str, directory: str = 'data',
+                           mode: str = CACHE_SHARED) -> Any:
+        """Десериализовать JSON-файл через кэш
+        
+        См. ``PickleSerializer.deserialize_cached``; в режиме ``'copy'``
+        кэшируется текст файла.
+        
+        Args:
+            filename: Название файла
+            directory: Директория
+            mode: 'shared' или 'copy'
+        
+        Returns:
+            Десериализованный объект
+        """
+        file_path = Path(directory) / filename
+        
+        def read_payload() -> str:
+            with open_compressed(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        
+        return _deserialize_cached(
+            'json', file_path, mode,
+            lambda: JSONSerializer.deserialize(filename, directory),
+            read_payload, json.loads)
+    
+    @staticmethod
+    def serialize_model(obj: Any, filename: str, directory: str = 'data',
+                        compression: Optional[str] = None, level: Optional[int] = None,
+                        timestamps: str = 'epoch') -> None:
+        """Сериализовать модели (User, Product, Order, Database) в компактный JSON
+        
+        В отличие от ``serialize``, модели записываются в формате
+        ``json_codec`` и восстанавливаются ``deserialize_model`` объектами.
+        
+        Args:
+            obj: Объект (модели могут быть вложены в списки и словари)
+            filename: Название файла
+            directory: Директория
+            compression: Кодек сжатия, None - без сжатия
+            level: Уровень сжатия
+            timestamps: 'epoch' (микросекунды) или 'iso' (ISO 8601, UTC)
+        """
+        started = metrics.clock()
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        file_path = Path(directory) / filename
+        
+        try:
+            data = ModelJSONCodec(timestamps).encode(obj)
+            with open_compressed(file_path, 'wb', compression, level) as f:
+                f.write(data)
+        except Exception as e:
+            metrics.observe('json.serialize_model', started, error=e)
+            raise
+        finally:
+            _invalidate_cached('json', file_path)
+        _observe_file('json.serialize_model', started, file_path)
+    
+    @staticmethod
+    def deserialize_model(filename: str, directory: str = 'data') -> Any:
+        """Десериализовать JSON, записанный ``serialize_model``
+        
+        Args:
+            filename: Название файла
+            directory: Директория
+        
+        Returns:
+            Объект с восстановленными моделями
+        """
+        started = metrics.clock()
+        file_path = Path(directory) / filename
+        
+        try:
+            with open_compressed(file_path, 'rb') as f:
+                obj = ModelJSONCodec().decode(f.read())
+        except Exception as e:
+            metrics.observe('json.deserialize_model', started, error=e)
+            raise
+        _observe_file('json.deserialize_model', started, file_path)
+        return obj
+    
+    @staticmethod
+    def dump_lines(objects: Iterable[Any], f: TextIO) -> int:
+        """Записать объекты в открытый файл в формате JSON Lines
+        
+        Args:
+            objects: Итерируемый объект или генератор
+            f: Текстовый файл, открытый на запись или дозапись
+        
+        Returns:
+            Количество записанных строк
+        """
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str).encode
+        write = f.write
+        count = 0
+        for obj in objects:
+            write(encode(obj))
+            write('\n')
+            count += 1
+        return count
+    
+    @staticmethod
+    def load_lines(f: TextIO) -> Iterator[Any]:
+        """Лениво читать объекты из открытого файла JSON Lines
+        
+        Args:
+            f: Текстовый файл, открытый на чтение
+        
+        Yields:
+            Объекты по одному на строку (пустые строки пропускаются)
+        """
+        decode = json.JSONDecoder().decode
+        for line in f:
+            if line.strip():
+                yield decode(line)
+    
+    @staticmethod
+    def serialize_lines(objects: Iterable[Any], filename: str, directory: str = 'data',
+                        append: bool = False, compression: Optional[str] = None,
+                        level: Optional[int] = None) -> int:
+        """Сериализовать поток объектов в файл JSON Lines
+        
+        Каждый объект пишется компактно в отдельную строку, поэтому файл
+        можно дописывать и читать по мере записи (например, через tail).
+        
+        Args:
+            objects: Итерируемый объект или генератор
+            filename: Название файла
+            directory: Директория
+            append: Дописать строки в конец существующего файла
+            compression: Кодек потокового сжатия, None - без сжатия
+            level: Уровень сжатия
+        
+        Returns:
+            Количество записанных объектов
+        """
+        if append and compression is not None:
+            raise ValueError("Дозапись в сжатый поток не поддерживается")
+        started = metrics.clock()
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        file_path = Path(directory) / filename
+        
+        try:
+            with open_compressed(file_path, 'a' if append else 'w', compression, level,
+                                 encoding='utf-8') as f:
+                count = JSONSerializer.dump_lines(objects, f)
+        except Exception as e:
+            metrics.observe('json.serialize_lines', started, error=e)
+            raise
+        _observe_file('json.serialize_lines', started, file_path)
+        return count
+    
+    @staticmethod
+    def deserialize_lines(filename: str, directory: str = 'data') -> Iterator[Any]:
+        """Лениво десериализовать объекты из файла JSON Lines
+        
+        Сжатый файл распознаётся и распаковывается автоматически.
+        
+        Args:
+            filename: Название файла
+            directory: Директория
+        
+        Yields:
+            Объекты по одному, в порядке строк
+        """
+        file_path = Path(directory) / filename
+        
+        with open_compressed(file_path, 'r', encoding='utf-8') as f:
+            yield from JSONSerializer.load_lines(f)
@@ -0,0 +1,388 @@
+"""
+Шардированное хранение Database с ленивой загрузкой шардов
+"""
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from models import Database, Order, Product, User
+from serialization import PickleSerializer
+
+MANIFEST_NAME = 'shards.json'
+MANIFEST_VERSION = 1
+
+PARTITION_HASH = 'hash'
+PARTITION_RANGE = 'range'
+
+# Коллекции и атрибут-ключ их записей
+_KEYS = {'users': 'user_id', 'products': 'product_id', 'orders': 'order_id'}
+
+
+class ShardedDatabase:
+    """Database, разбитая на шарды с загрузкой по требованию
+    
+    Пользователи, продукты и заказы хранятся в отдельных файлах-шардах
+    (``users-0003.pkl`` и т.д.), распределение по шардам - по хешу ключа
+    или по диапазонам ключей. Шард читается с диска только при первом
+    обращении к ключу из него, изменённые шарды записываются при ``save()``.
+    
+    Ограничения по сравнению с Database:
+    
+    - уникальность email проверяется только среди загруженных шардов
+      (по словарю email -> ID, который ведётся для загруженных шардов),
+      а ``get_user_by_email`` при промахе загружает все шарды пользователей;
+    - при разбиении по диапазонам ключи должны быть неотрицательными;
+    - загруженный заказ связывается с пользователем и продуктами только
+      если их шарды уже в памяти, иначе ссылается на их копии из файла;
+    - изменения записей «на месте» нужно отметить через ``mark_dirty``
+      (``complete_order`` и ``cancel_order`` делают это сами).
+    """
+    
+    def __init__(self, directory: str, shard_count: int = 16,
+                 partition: str = PARTITION_HASH, range_size: int = 10_000,
+                 compression: Optional[str] = None):
+        """
+        Если в директории уже есть манифест, параметры разбиения берутся
+        из него, а аргументы игнорируются.
+        
+        Args:
+            directory: Директория шардов и манифеста
+            shard_count: Количество шардов для разбиения по хешу
+            partition: 'hash' или 'range'
+            range_size: Ключей в одном шарде для разбиения по диапазонам
+            compression: Кодек сжатия файлов шардов
+        """
+        self.directory = directory
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError(f"Неподдерживаемая версия манифеста: {manifest.get('version')}")
+            partition = manifest['partition']
+            shard_count = manifest['shard_count']
+            range_size = manifest['range_size']
+            compression = manifest['compression']
+            counts = {kind: {int(shard): count for shard, count in shards.items()}
+                      for kind, shards in manifest['shards'].items()}
+        else:
+            counts = {kind: {} for kind in _KEYS}
+        if partition not in (PARTITION_HASH, PARTITION_RANGE):
+            raise ValueError(f"Неизвестный способ разбиения: {partition}")
+        if shard_count < 1 or range_size < 1:
+            raise ValueError("shard_count и range_size должны быть не меньше 1")
+        
+        self.partition = partition
+        self.shard_count = shard_count
+        self.range_size = range_size
+        self.compression = compression
+        # Шарды на диске: kind -> {номер шарда: количество записей}
+        self._stored: Dict[str, Dict[int, int]] = counts
+        # Загруженные шарды: kind -> {номер шарда: {ключ: запись}}
+        self._loaded: Dict[str, Dict[int, Dict[Any, Any]]] = {kind: {} for kind in _KEYS}
+        self._dirty: Set[Tuple[str, int]] = set()
+        # Email пользователей загруженных шардов: email -> ID и ID -> email
+        self._emails: Dict[str, int] = {}
+        self._email_of: Dict[int, str] = {}
+    
+    @classmethod
+    def from_database(cls, db: Database, directory: str, **kwargs) -> 'ShardedDatabase':
+        """Разбить обычную базу на шарды и сохранить
+        
+        Args:
+            db: База данных
+            directory: Директория шардов
+            **kwargs: Параметры разбиения (см. ``__init__``)
+        
+        Returns:
+            Шардированная база со всеми шардами в памяти
+        """
+        sharded = cls(directory, **kwargs)
+        for kind, key in _KEYS.items():
+            for record in getattr(db, kind):
+                shard = sharded.shard_of(getattr(record, key))
+                sharded._shard(kind, shard)[getattr(record, key)] = record
+                sharded._dirty.add((kind, shard))
+                if kind == 'users':
+                    sharded._index_email(record)
+        sharded.save()
+        return sharded
+    
+    # --- Разбиение и загрузка -------------------------------------------
+    
+    def shard_of(self, key: Any) -> int:
+        """Номер шарда для ключа
+        
+        Raises:
+            ValueError: Отрицательный ключ при разбиении по диапазонам
+        """
+        if self.partition == PARTITION_RANGE:
+            if key < 0:
+                raise ValueError(f"Ключ {key}: при разбиении по диапазонам ключи неотрицательны")
+            return key // self.range_size
+        if isinstance(key, int):
+            return key % self.shard_count
+        # hash() строк зависит от запуска, номер шарда должен быть стабильным
+        return zlib.crc32(str(key).encode('utf-8')) % self.shard_count
+    
+    def _filename(self, kind: str, shard: int) -> str:
+        return f"{kind}-{shard:04d}.pkl"
+    
+    def _shard(self, kind: str, shard: int) -> Dict[Any, Any]:
+        """Шард в памяти; при первом обращении читается с диска"""
+        loaded = self._loaded[kind]
+        records = loaded.get(shard)
+        if records is None:
+            records = {}
+            if shard in self._stored[kind]:
+                key = _KEYS[kind]
+                for record in PickleSerializer.deserialize(self._filename(kind, shard), self.directory):
+                    if kind == 'orders':
+                        self._relink(record)
+                    elif kind == 'users':
+                        self._index_email(record)
+                    records[getattr(record, key)] = record
+            loaded[shard] = records
+        return records
+    
+    def _index_email(self, user: User) -> None:
+        old = self._email_of.pop(user.user_id, None)
+        if old is not None and self._emails.get(old) == user.user_id:
+            del self._emails[old]
+        self._emails[user.email] = user.user_id
+        self._email_of[user.user_id] = user.email
+    
+    def _unindex_email(self, user_id: int) -> None:
+        email = self._email_of.pop(user_id, None)
+        if email is not None and self._emails.get(email) == user_id:
+            del self._emails[email]
+    
+    def _relink(self, order: Order) -> None:
+        """Связать заказ с записями из уже загруженных шардов"""
+        users = self._loaded['users'].get(self.shard_of(order.user.user_id))
+        if users is not None:
+            order.user = users.get(order.user.user_id, order.user)
+        products = self._loaded['products']
+        linked = []
+        for product in order.products:
+            shard = products.get(self.shard_of(product.product_id))
+            linked.append(product if shard is None else shard.get(product.product_id, product))
+        order.products = linked
+    
+    def _shards(self, kind: str, start: Any = None, stop: Any = None) -> List[int]:
+        """Номера шардов, которые могут содержать ключи из [start, stop)"""
+        shards = set(self._stored[kind]) | set(self._loaded[kind])
+        if self.partition == PARTITION_RANGE:
+            if start is not None:
+                shards = {s for s in shards if s >= start // self.range_size}
+            if stop is not None:
+                shards = {s for s in shards if s * self.range_size < stop}
+        return sorted(shards)
+    
+    def loaded_shards(self, kind: str) -> List[int]:
+        """Номера шардов коллекции, загруженных в память"""
+        return sorted(self._loaded[kind])
+    
+    def unload(self) -> int:
+        """Выгрузить из памяти все неизменённые шарды
+        
+        Returns:
+            Количество выгруженных шардов
+        """
+        unloaded = 0
+        for kind, loaded in self._loaded.items():
+            for shard in [s for s in loaded if (kind, s) not in self._dirty]:
+                records = loaded.pop(shard)
+                if kind == 'users':
+                    for user_id in records:
+                        self._unindex_email(user_id)
+                unloaded += 1
+        return unloaded
+    
+    # --- Поиск и обход ---------------------------------------------------
+    
+    def get_user(self, user_id: int) -> Optional[User]:
+        """Пользователь по ID (загружает один шард)"""
+        return self._shard('users', self.shard_of(user_id)).get(user_id)
+    
+    def get_product(self, product_id: int) -> Optional[Product]:
+        """Продукт по ID (загружает один шард)"""
+        return self._shard('products', self.shard_of(product_id)).get(product_id)
+    
+    def get_order(self, order_id: int) -> Optional[Order]:
+        """Заказ по ID (загружает один шард)"""
+        return self._shard('orders', self.shard_of(order_id)).get(order_id)
+    
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """Пользователь по email
+        
+        Среди загруженных шардов поиск идёт по словарю email -> ID, при
+        промахе загружаются остальные шарды пользователей.
+        """
+        user_id = self._emails.get(email)
+        if user_id is None:
+            for shard in self._shards('users'):
+                self._shard('users', shard)
+            user_id = self._emails.get(email)
+        user = None if user_id is None else self.get_user(user_id)
+        return user if user is not None and user.email == email else None
+    
+    def _iter(self, kind: str, start: Any, stop: Any) -> Iterator[Any]:
+        for shard in self._shards(kind, start, stop):
+            records = self._shard(kind, shard)
+            if start is None and stop is None:
+                yield from list(records.values())
+            else:
+                yield from [record for key, record in records.items()
+                            if (start is None or key >= start) and (stop is None or key < stop)]
+    
+    def iter_users(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[User]:
+        """Пользователи с ID из [start, stop)
+        
+        При разбиении по диапазонам загружаются только шарды, пересекающие
+        диапазон; при разбиении по хешу - все шарды.
+        """
+        return self._iter('users', start, stop)
+    
+    def iter_products(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[Product]:
+        """Продукты с ID из [start, stop) (см. ``iter_users``)"""
+        return self._iter('products', start, stop)
+    
+    def iter_orders(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[Order]:
+        """Заказы с ID из [start, stop) (см. ``iter_users``)"""
+        return self._iter('orders', start, stop)
+    
+    def count(self, kind: str) -> int:
+        """Количество записей коллекции ('users', 'products', 'orders') без загрузки шардов"""
+        loaded = self._loaded[kind]
+        total = sum(len(records) for records in loaded.values())
+        return total + sum(count for shard, count in self._stored[kind].items()
+                           if shard not in loaded)
+    
+    # --- Изменение ---------------------------------------------------------
+    
+    def _add(self, kind: str, key: Any, record: Any) -> bool:
+        shard = self.shard_of(key)
+        records = self._shard(kind, shard)
+        if key in records:
+            return False
+        records[key] = record
+        self._dirty.add((kind, shard))
+        return True
+    
+    def add_user(self, user: User) -> bool:
+        """Добавить пользователя
+        
+        Returns:
+            True, если пользователь добавлен (ID и email не заняты)
+        """
+        if user.email in self._emails:
+            return False
+        if not self._add('users', user.user_id, user):
+            return False
+        self._index_email(user)
+        return True
+    
+    def add_product(self, product: Product) -> bool:
+        """Добавить продукт (False, если ID занят)"""
+        return self._add('products', product.product_id, product)
+    
+    def add_order(self, order: Order) -> bool:
+        """Добавить заказ (False, если ID занят)"""
+        return self._add('orders', order.order_id, order)
+    
+    def mark_dirty(self, kind: str, key: Any) -> None:
+        """Отметить шард записи как изменённый
+        
+        Для пользователя заодно обновляется словарь email -> ID, поэтому
+        после смены email на месте нужно вызвать этот метод.
+        
+        Args:
+            kind: 'users', 'products' или 'orders'
+            key: ID записи
+        """
+        shard = self.shard_of(key)
+        records = self._shard(kind, shard)
+        self._dirty.add((kind, shard))
+        if kind == 'users' and key in records:
+            # Email мог измениться на месте
+            self._index_email(records[key])
+    
+    def complete_order(self, order_id: int) -> None:
+        """Завершить заказ и отметить его шард"""
+        self._order(order_id).complete()
+        self.mark_dirty('orders', order_id)
+    
+    def cancel_order(self, order_id: int) -> None:
+        """Отменить заказ и отметить его шард"""
+        self._order(order_id).cancel()
+        self.mark_dirty('orders', order_id)
+    
+    def _order(self, order_id: int) -> Order:
+        order = self.get_order(order_id)
+        if order is None:
+            raise KeyError(f"Заказ {order_id} не найден")
+        return order
+    
+    @property
+    def dirty(self) -> List[Tuple[str, int]]:
+        """Изменённые, ещё не сохранённые шарды"""
+        return sorted(self._dirty)
+    
+    # --- Сохранение --------------------------------------------------------
+    
+    def save(self) -> int:
+        """Записать изменённые шарды и манифест
+        
+        Каждый шард пишется во временный файл и атомарно подменяется,
+        манифест обновляется последним.
+        
+        Returns:
+            Количество записанных шардов
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        written = 0
+        for kind, shard in sorted(self._dirty):
+            records = list(self._loaded[kind][shard].values())
+            filename = self._filename(kind, shard)
+            PickleSerializer.serialize(records, filename + '.tmp', self.directory, self.compression)
+            os.replace(os.path.join(self.directory, filename + '.tmp'),
+                       os.path.join(self.directory, filename))
+            self._stored[kind][shard] = len(records)
+            written += 1
+        self._write_manifest()
+        self._dirty.clear()
+        return written
+    
+    def _write_manifest(self) -> None:
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'partition': self.partition,
+            'shard_count': self.shard_count,
+            'range_size': self.range_size,
+            'compression': self.compression,
+            'shards': {kind: {str(shard): count for shard, count in sorted(shards.items())}
+                       for kind, shards in self._stored.items()},
+        }
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+    
+    def to_database(self) -> Database:
+        """Загрузить все шарды в обычную Database
+        
+        Returns:
+            База с построенными индексами и связанными заказами
+        """
+        db = Database()
+        db.add_users(self.iter_users())
+        db.add_products(self.iter_products())
+        db.add_orders(db.relink_order(order) for order in self.iter_orders())
+        return db
+    
+    def __repr__(self) -> str:
+        loaded = sum(len(shards) for shards in self._loaded.values())
+        return (f"ShardedDatabase(partition={self.partition}, users={self.count('users')}, "
+                f"loaded_shards={loaded}, dirty={len(self._dirty)})")
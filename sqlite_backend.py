@@ -0,0 +1,490 @@
+"""
+Хранение Database в SQLite (стандартный модуль sqlite3)
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from models import (PICKLE_STATE_VERSION, Database, Order, Product, User,
+                    _restore_order, _restore_product, _restore_user)
+from serialization import PickleSerializer
+
+# Версия схемы хранится в PRAGMA user_version
+SCHEMA_VERSION = 1
+DEFAULT_BATCH_SIZE = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id    INTEGER PRIMARY KEY,
+    name       TEXT NOT NULL,
+    email      TEXT NOT NULL UNIQUE,
+    created_us INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY,
+    name       TEXT NOT NULL,
+    price      REAL NOT NULL,
+    stock      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id   INTEGER PRIMARY KEY,
+    user_id    INTEGER NOT NULL,
+    total      REAL NOT NULL,
+    created_us INTEGER NOT NULL,
+    status     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_lines (
+    order_id   INTEGER NOT NULL,
+    position   INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    PRIMARY KEY (order_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS orders_user ON orders (user_id);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+CREATE INDEX IF NOT EXISTS order_lines_product ON order_lines (product_id);
+"""
+
+# Запросы - константы: sqlite3 кэширует подготовленные выражения по тексту SQL
+_INSERT_USER = "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)"
+_INSERT_PRODUCT = "INSERT OR IGNORE INTO products VALUES (?, ?, ?, ?)"
+_INSERT_ORDER = "INSERT OR IGNORE INTO orders VALUES (?, ?, ?, ?, ?)"
+_INSERT_LINE = "INSERT OR IGNORE INTO order_lines VALUES (?, ?, ?)"
+_SELECT_USER = "SELECT user_id, name, email, created_us FROM users WHERE user_id = ?"
+_SELECT_USER_BY_EMAIL = "SELECT user_id, name, email, created_us FROM users WHERE email = ?"
+_SELECT_PRODUCT = "SELECT product_id, name, price, stock FROM products WHERE product_id = ?"
+_SELECT_ORDER = "SELECT order_id, user_id, total, created_us, status FROM orders WHERE order_id = ?"
+_SELECT_LINES = "SELECT product_id FROM order_lines WHERE order_id = ? ORDER BY position"
+
+# Предел числа параметров в одном запросе для старых сборок SQLite - 999
+_IN_CHUNK = 500
+
+_TABLES = {'users': 'users', 'products': 'products', 'orders': 'orders'}
+
+
+def _user_row(user: User) -> tuple:
+    return user.user_id, user.name, user.email, user._created_us
+
+
+def _product_row(product: Product) -> tuple:
+    return product.product_id, product.name, product.price, product.stock
+
+
+def _user(row: tuple) -> User:
+    return _restore_user(PICKLE_STATE_VERSION, *row)
+
+
+def _product(row: tuple) -> Product:
+    return _restore_product(PICKLE_STATE_VERSION, *row)
+
+
+class SQLiteDatabase:
+    """Database в файле SQLite
+    
+    Пользователи, продукты, заказы и строки заказов хранятся в таблицах
+    с индексами по первичным ключам, ``users.email``, ``orders.user_id``,
+    ``orders.status`` и ``order_lines.product_id``. В памяти держатся только
+    записи, которые вернули методы поиска и обхода: каждый вызов строит
+    новые объекты из строк таблиц.
+    
+    Пакетные ``add_*`` вставляют записи через ``executemany`` в одной
+    транзакции. Файл открывается в режиме WAL, так что чтение из других
+    соединений не блокируется записью.
+    
+    ``Order.complete()``/``cancel()`` у заказа, полученного из базы, сразу
+    сохраняют статус (через ``mark_dirty``). Прочие изменения объектов на
+    месте нужно сохранить явным вызовом ``mark_dirty``.
+    
+    Заказ, пользователь или продукт которого отсутствует в базе,
+    записывается, но при чтении вызывает ValueError.
+    """
+    
+    def __init__(self, filename: str = 'database.db', directory: str = 'data'):
+        """
+        Args:
+            filename: Название файла базы
+            directory: Директория
+        
+        Raises:
+            ValueError: Файл создан с другой версией схемы
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        # Транзакциями управляет сам класс (см. _transaction)
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        conn = self._conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            conn.close()
+            raise ValueError(f"Неподдерживаемая версия схемы: {version}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if version == 0:
+            conn.executescript(f"BEGIN;{_SCHEMA}PRAGMA user_version={SCHEMA_VERSION};COMMIT;")
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Выполнить блок в одной транзакции (откат при исключении)
+        
+        Вложенный блок становится частью внешней транзакции.
+        """
+        conn = self._conn
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    
+    # --- Миграция ----------------------------------------------------------
+    
+    @classmethod
+    def from_database(cls, db: Database, filename: str = 'database.db',
+                      directory: str = 'data') -> 'SQLiteDatabase':
+        """Записать Database в файл SQLite
+        
+        Args:
+            db: База в памяти
+            filename: Название файла SQLite
+            directory: Директория
+        
+        Returns:
+            Открытая SQLiteDatabase
+        """
+        sqlite_db = cls(filename, directory)
+        with sqlite_db._transaction():
+            sqlite_db.add_users(db.users)
+            sqlite_db.add_products(db.products)
+            sqlite_db.add_orders(db.orders)
+        return sqlite_db
+    
+    @classmethod
+    def from_pickle(cls, pickle_filename: str = 'database.pkl', directory: str = 'data',
+                    filename: str = 'database.db') -> 'SQLiteDatabase':
+        """Перенести базу из pickle-файла (например, ``data/database.pkl``) в SQLite
+        
+        Args:
+            pickle_filename: Название pickle-файла с Database
+            directory: Директория pickle-файла и файла SQLite
+            filename: Название файла SQLite
+        
+        Returns:
+            Открытая SQLiteDatabase
+        
+        Raises:
+            TypeError: В файле не Database
+        """
+        db = PickleSerializer.deserialize(pickle_filename, directory)
+        if not isinstance(db, Database):
+            raise TypeError(f"{pickle_filename}: ожидалась Database, получен {type(db).__name__}")
+        return cls.from_database(db, filename, directory)
+    
+    def to_database(self) -> Database:
+        """Загрузить все записи в обычную Database
+        
+        Returns:
+            База с построенными индексами и связанными заказами
+        """
+        db = Database()
+        db.add_users(self.iter_users())
+        db.add_products(self.iter_products())
+        db.add_orders(db.relink_order(order) for order in self.iter_orders())
+        db.clear_changes()
+        return db
+    
+    # --- Запись ------------------------------------------------------------
+    
+    def _insert_many(self, sql: str, rows: Iterable[tuple], batch_size: int) -> int:
+        conn = self._conn
+        rows = iter(rows)
+        before = conn.total_changes
+        with self._transaction():
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(sql, batch)
+        return conn.total_changes - before
+    
+    def add_users(self, users: Iterable[User], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Добавить пользователей пакетом в одной транзакции
+        
+        Пользователи с уже занятым ID или email пропускаются.
+        
+        Args:
+            users: Пользователи (любой итерируемый объект)
+            batch_size: Строк в одном вызове ``executemany``
+        
+        Returns:
+            Количество добавленных пользователей
+        """
+        return self._insert_many(_INSERT_USER, map(_user_row, users), batch_size)
+    
+    def add_products(self, products: Iterable[Product], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Добавить продукты пакетом (занятые ID пропускаются)
+        
+        Returns:
+            Количество добавленных продуктов
+        """
+        return self._insert_many(_INSERT_PRODUCT, map(_product_row, products), batch_size)
+    
+    def add_orders(self, orders: Iterable[Order], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Добавить заказы со строками пакетом (занятые ID пропускаются)
+        
+        Returns:
+            Количество добавленных заказов
+        """
+        conn = self._conn
+        orders = iter(orders)
+        inserted = 0
+        with self._transaction():
+            while True:
+                batch = list(islice(orders, batch_size))
+                if not batch:
+                    break
+                existing = self._existing_order_ids([order.order_id for order in batch])
+                new_orders = []
+                seen = set()
+                for order in batch:
+                    if order.order_id not in existing and order.order_id not in seen:
+                        seen.add(order.order_id)
+                        new_orders.append(order)
+                conn.executemany(_INSERT_ORDER, [
+                    (order.order_id, order.user.user_id, order.total, order._created_us, order.status)
+                    for order in new_orders])
+                conn.executemany(_INSERT_LINE, [
+                    (order.order_id, position, product.product_id)
+                    for order in new_orders
+                    for position, product in enumerate(order.products)])
+                inserted += len(new_orders)
+        return inserted
+    
+    def _existing_order_ids(self, order_ids: List[int]) -> set:
+        existing = set()
+        for start in range(0, len(order_ids), _IN_CHUNK):
+            chunk = order_ids[start:start + _IN_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            existing.update(row[0] for row in self._conn.execute(
+                f"SELECT order_id FROM orders WHERE order_id IN ({placeholders})", chunk))
+        return existing
+    
+    def add_user(self, user: User) -> bool:
+        """Добавить пользователя
+        
+        Returns:
+            True, если пользователь добавлен (ID и email не заняты)
+        """
+        return self.add_users((user,)) == 1
+    
+    def add_product(self, product: Product) -> bool:
+        """Добавить продукт (False, если ID занят)"""
+        return self.add_products((product,)) == 1
+    
+    def add_order(self, order: Order) -> bool:
+        """Добавить заказ (False, если ID занят)"""
+        return self.add_orders((order,)) == 1
+    
+    def mark_dirty(self, record: Any) -> None:
+        """Сохранить изменения записи, уже находящейся в базе
+        
+        Args:
+            record: User, Product или Order
+        
+        Raises:
+            TypeError: Неизвестный тип записи
+        """
+        with self._transaction() as conn:
+            if isinstance(record, User):
+                conn.execute("UPDATE users SET name = ?, email = ?, created_us = ? WHERE user_id = ?",
+                             (record.name, record.email, record._created_us, record.user_id))
+            elif isinstance(record, Product):
+                conn.execute("UPDATE products SET name = ?, price = ?, stock = ? WHERE product_id = ?",
+                             (record.name, record.price, record.stock, record.product_id))
+            elif isinstance(record, Order):
+                cursor = conn.execute(
+                    "UPDATE orders SET user_id = ?, total = ?, created_us = ?, status = ? WHERE order_id = ?",
+                    (record.user.user_id, record.total, record._created_us, record.status, record.order_id))
+                if cursor.rowcount:
+                    conn.execute("DELETE FROM order_lines WHERE order_id = ?", (record.order_id,))
+                    conn.executemany(_INSERT_LINE, [
+                        (record.order_id, position, product.product_id)
+                        for position, product in enumerate(record.products)])
+            else:
+                raise TypeError(f"Неизвестный тип записи: {type(record).__name__}")
+    
+    def _set_status(self, order_id: int, status: str) -> None:
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE orders SET status = ? WHERE order_id = ?", (status, order_id))
+        if not cursor.rowcount:
+            raise KeyError(f"Заказ {order_id} не найден")
+    
+    def complete_order(self, order_id: int) -> None:
+        """Завершить заказ, не загружая его"""
+        self._set_status(order_id, "completed")
+    
+    def cancel_order(self, order_id: int) -> None:
+        """Отменить заказ, не загружая его"""
+        self._set_status(order_id, "cancelled")
+    
+    # --- Поиск ---------------------------------------------------------------
+    
+    def get_user(self, user_id: int) -> Optional[User]:
+        """Пользователь по ID"""
+        row = self._conn.execute(_SELECT_USER, (user_id,)).fetchone()
+        return None if row is None else _user(row)
+    
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """Пользователь по email (по уникальному индексу)"""
+        row = self._conn.execute(_SELECT_USER_BY_EMAIL, (email,)).fetchone()
+        return None if row is None else _user(row)
+    
+    def get_product(self, product_id: int) -> Optional[Product]:
+        """Продукт по ID"""
+        row = self._conn.execute(_SELECT_PRODUCT, (product_id,)).fetchone()
+        return None if row is None else _product(row)
+    
+    def get_order(self, order_id: int) -> Optional[Order]:
+        """Заказ по ID вместе с пользователем и продуктами
+        
+        Raises:
+            ValueError: Пользователь или продукт заказа отсутствует в базе
+        """
+        row = self._conn.execute(_SELECT_ORDER, (order_id,)).fetchone()
+        if row is None:
+            return None
+        product_ids = [line[0] for line in self._conn.execute(_SELECT_LINES, (order_id,))]
+        users = self._fetch('users', [row[1]])
+        products = self._fetch('products', product_ids)
+        return self._order(row, product_ids, users, products)
+    
+    def _fetch(self, kind: str, ids: Iterable[int]) -> Dict[int, Any]:
+        """Записи по списку ID одним запросом на каждые _IN_CHUNK ключей"""
+        if kind == 'users':
+            sql, make = "SELECT user_id, name, email, created_us FROM users WHERE user_id IN ({})", _user
+        else:
+            sql, make = "SELECT product_id, name, price, stock FROM products WHERE product_id IN ({})", _product
+        ids = list(set(ids))
+        found = {}
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start:start + _IN_CHUNK]
+            for row in self._conn.execute(sql.format(','.join('?' * len(chunk))), chunk):
+                found[row[0]] = make(row)
+        return found
+    
+    def _order(self, row: tuple, product_ids: List[int],
+               users: Dict[int, User], products: Dict[int, Product]) -> Order:
+        order_id, user_id, total, created_us, status = row
+        user = users.get(user_id)
+        if user is None:
+            raise ValueError(f"Заказ {order_id}: пользователь {user_id} не найден")
+        order_products = []
+        for product_id in product_ids:
+            product = products.get(product_id)
+            if product is None:
+                raise ValueError(f"Заказ {order_id}: продукт {product_id} не найден")
+            order_products.append(product)
+        order = _restore_order(PICKLE_STATE_VERSION, order_id, user, order_products,
+                               total, created_us, status)
+        order._owner = self
+        return order
+    
+    # --- Обход ---------------------------------------------------------------
+    
+    def _iter_rows(self, sql: str, start: Optional[int], stop: Optional[int],
+                   key: str) -> Iterator[tuple]:
+        where, params = [], []
+        if start is not None:
+            where.append(f"{key} >= ?")
+            params.append(start)
+        if stop is not None:
+            where.append(f"{key} < ?")
+            params.append(stop)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        cursor = self._conn.execute(sql + f" ORDER BY {key}", params)
+        while True:
+            rows = cursor.fetchmany(_IN_CHUNK)
+            if not rows:
+                return
+            yield rows
+    
+    def iter_users(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[User]:
+        """Пользователи с ID из [start, stop) в порядке ID"""
+        for rows in self._iter_rows("SELECT user_id, name, email, created_us FROM users",
+                                    start, stop, 'user_id'):
+            yield from map(_user, rows)
+    
+    def iter_products(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[Product]:
+        """Продукты с ID из [start, stop) в порядке ID"""
+        for rows in self._iter_rows("SELECT product_id, name, price, stock FROM products",
+                                    start, stop, 'product_id'):
+            yield from map(_product, rows)
+    
+    def iter_orders(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[Order]:
+        """Заказы с ID из [start, stop) в порядке ID
+        
+        Заказы читаются страницами: строки заказов, пользователи и продукты
+        страницы загружаются несколькими запросами, а не по запросу на заказ.
+        Продукты кэшируются на время обхода, поэтому заказы с общим
+        продуктом ссылаются на один объект.
+        """
+        products: Dict[int, Product] = {}
+        for rows in self._iter_rows("SELECT order_id, user_id, total, created_us, status FROM orders",
+                                    start, stop, 'order_id'):
+            yield from self._orders_from_rows(rows, products)
+    
+    def _orders_from_rows(self, rows: List[tuple], products: Dict[int, Product]) -> List[Order]:
+        """Заказы из строк таблицы orders
+        
+        Строки заказов, пользователи и продукты загружаются пакетными
+        запросами, а не по запросу на заказ.
+        
+        Args:
+            rows: Строки (order_id, user_id, total, created_us, status)
+            products: Уже загруженные продукты; дополняется недостающими
+        """
+        lines: Dict[int, List[int]] = {row[0]: [] for row in rows}
+        order_ids = list(lines)
+        for chunk_start in range(0, len(order_ids), _IN_CHUNK):
+            chunk = order_ids[chunk_start:chunk_start + _IN_CHUNK]
+            for order_id, product_id in self._conn.execute(
+                    f"SELECT order_id, product_id FROM order_lines WHERE order_id IN "
+                    f"({','.join('?' * len(chunk))}) ORDER BY order_id, position", chunk):
+                lines[order_id].append(product_id)
+        users = self._fetch('users', (row[1] for row in rows))
+        missing = {product_id for ids in lines.values() for product_id in ids} - products.keys()
+        products.update(self._fetch('products', missing))
+        return [self._order(row, lines[row[0]], users, products) for row in rows]
+    
+    def orders_by_user(self, user_id: int) -> List[Order]:
+        """Заказы пользователя (по индексу orders.user_id)"""
+        rows = self._conn.execute(
+            "SELECT order_id, user_id, total, created_us, status FROM orders "
+            "WHERE user_id = ? ORDER BY order_id", (user_id,)).fetchall()
+        return self._orders_from_rows(rows, {})
+    
+    def count(self, kind: str) -> int:
+        """Количество записей коллекции ('users', 'products', 'orders')"""
+        table = _TABLES[kind]
+        return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    
+    # --- Жизненный цикл -----------------------------------------------------
+    
+    def close(self) -> None:
+        """Закрыть соединение"""
+        self._conn.close()
+    
+    def __enter__(self) -> 'SQLiteDatabase':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __repr__(self) -> str:
+        return (f"SQLiteDatabase('{self.path}', users={self.count('users')}, "
+                f"products={self.count('products')}, orders={self.count('orders')})")
@@ -0,0 +1,195 @@
+"""
+Тесты для архива объектов
+"""
+import pickle
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from archive import ObjectArchive, INDEX_VERSION
+from models import User, Product
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_archive"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+class TestObjectArchive:
+    """Тесты ObjectArchive"""
+    
+    def test_put_get(self, test_directory):
+        """Запись и чтение объектов по имени"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            archive.put("user", User(1, "Alice", "alice@example.com"))
+            archive["data"] = {"numbers": [1, 2, 3]}
+            
+            assert len(archive) == 2
+            assert "user" in archive
+            assert archive.get("user").email == "alice@example.com"
+            assert archive["data"] == {"numbers": [1, 2, 3]}
+            assert archive.get("missing") is None
+            with pytest.raises(KeyError):
+                archive["missing"]
+    
+    def test_reopen_uses_saved_index(self, test_directory):
+        """После закрытия архив открывается с теми же объектами"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            for i in range(50):
+                archive.put(f"product-{i}", Product(i, f"P{i}", float(i), i))
+        
+        assert os.path.exists(os.path.join(test_directory, "objects.arc.idx"))
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert len(archive) == 50
+            assert archive["product-42"].price == 42.0
+    
+    def test_overwrite_and_delete(self, test_directory):
+        """Перезапись и удаление оставляют мусор, который учитывается"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            archive.put("a", "first")
+            archive.put("a", "second")
+            archive.put("b", "value")
+            assert archive.delete("b") is True
+            assert archive.delete("b") is False
+            with pytest.raises(KeyError):
+                del archive["b"]
+            
+            assert archive["a"] == "second"
+            assert "b" not in archive
+            assert archive.garbage_bytes > 0
+        
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert list(archive) == ["a"]
+            assert archive["a"] == "second"
+    
+    def test_compact(self, test_directory):
+        """Сжатие удаляет мусор и сохраняет живые объекты"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            for i in range(20):
+                archive.put(f"key-{i}", "x" * 100)
+            for i in range(10):
+                archive.delete(f"key-{i}")
+            size = archive.size
+            
+            reclaimed = archive.compact()
+            
+            assert reclaimed > 0
+            assert archive.size == size - reclaimed
+            assert archive.garbage_bytes == 0
+            assert len(archive) == 10
+            assert archive["key-15"] == "x" * 100
+        
+        path = os.path.join(test_directory, "objects.arc")
+        assert os.path.getsize(path) == size - reclaimed
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert sorted(archive) == sorted(f"key-{i}" for i in range(10, 20))
+    
+    def test_items_in_file_order(self, test_directory):
+        """items() отдаёт объекты по одному в порядке записи"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            for name in ("c", "a", "b"):
+                archive.put(name, name.upper())
+            items = archive.items()
+            
+            assert next(items) == ("c", "C")
+            assert list(items) == [("a", "A"), ("b", "B")]
+    
+    def test_recovers_records_after_stale_index(self, test_directory):
+        """Записи, дописанные после сохранения индекса, находятся сканированием"""
+        archive = ObjectArchive("objects.arc", test_directory)
+        archive.put("saved", 1)
+        archive.flush()
+        archive.put("unsaved", 2)
+        archive.delete("saved")
+        # Имитация аварии: данные на диске, индекс не обновлён
+        archive._file.flush()
+        archive._file.close()
+        
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert list(archive) == ["unsaved"]
+            assert archive["unsaved"] == 2
+    
+    def test_truncated_tail_is_dropped(self, test_directory):
+        """Оборванная последняя запись отбрасывается"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            archive.put("whole", "ok")
+            archive.put("torn", "y" * 1000)
+        path = os.path.join(test_directory, "objects.arc")
+        os.remove(path + ".idx")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 10)
+        
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert list(archive) == ["whole"]
+            archive.put("next", 3)
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert archive["next"] == 3
+    
+    def test_crash_inside_compact(self, test_directory, monkeypatch):
+        """Индекс старого поколения не используется после прерванного compact"""
+        archive = ObjectArchive("objects.arc", test_directory)
+        for i in range(5):
+            archive.put(f"key-{i}", i)
+        archive.flush()
+        for i in range(5, 50):
+            archive.put(f"key-{i}", i)
+        for i in range(26):
+            archive.delete(f"key-{i}")
+        live = sorted(archive)
+        
+        def crash():
+            raise OSError("сбой до записи индекса")
+        
+        monkeypatch.setattr(archive, "_write_index", crash)
+        with pytest.raises(OSError):
+            archive.compact()
+        archive._file.close()
+        
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            assert sorted(archive) == live
+            assert [archive[name] for name in live] == [int(name[4:]) for name in live]
+    
+    def test_corrupt_index_rescanned(self, test_directory):
+        """Повреждённый или чужой файл индекса игнорируется"""
+        with ObjectArchive("objects.arc", test_directory) as archive:
+            archive.put("a", 1)
+            archive.put("b", [2])
+            generation = archive._generation
+        index_path = os.path.join(test_directory, "objects.arc.idx")
+        bad_indexes = [
+            pickle.dumps(["not", "a", "dict"]),
+            pickle.dumps({'version': INDEX_VERSION, 'generation': generation}),
+            pickle.dumps({'version': INDEX_VERSION, 'generation': generation,
+                          'valid_upto': 0, 'garbage': 0, 'entries': None}),
+            b"\x80\x05\x95garbage",
+            b"cnonexistent_module\nThing\n.",
+        ]
+        for data in bad_indexes:
+            with open(index_path, "wb") as f:
+                f.write(data)
+            with ObjectArchive("objects.arc", test_directory) as archive:
+                assert sorted(archive) == ["a", "b"]
+                assert archive["b"] == [2]
+    
+    def test_rejects_foreign_file(self, test_directory):
+        """Файл другого формата не открывается"""
+        with open(os.path.join(test_directory, "other.arc"), "wb") as f:
+            f.write(b"not an archive")
+        
+        with pytest.raises(pickle.UnpicklingError):
+            ObjectArchive("other.arc", test_directory)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,201 @@
+"""
+Тесты для асинхронного ввода-вывода
+"""
+import asyncio
+import pytest
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, '..')
+
+from async_io import AsyncFileIO
+from file_operations import write_binary, read_text
+from models import User
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_async"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+class TestAsyncFileOperations:
+    """Тесты одиночных асинхронных операций"""
+    
+    def test_write_read_binary(self, test_directory):
+        """Тест записи и чтения двоичного файла"""
+        async def scenario():
+            async with AsyncFileIO(max_workers=2) as aio:
+                await aio.write_binary("a.bin", b"\x00\x01\x02", test_directory)
+                return await aio.read_binary("a.bin", test_directory)
+        
+        assert asyncio.run(scenario()) == b"\x00\x01\x02"
+    
+    def test_write_read_text_and_delete(self, test_directory):
+        """Тест текстовых операций и удаления"""
+        async def scenario():
+            async with AsyncFileIO() as aio:
+                await aio.write_text("a.txt", "Привет", test_directory)
+                content = await aio.read_text("a.txt", test_directory)
+                deleted = await aio.delete_file("a.txt", test_directory)
+                return content, deleted
+        
+        assert asyncio.run(scenario()) == ("Привет", True)
+    
+    def test_serializers(self, test_directory):
+        """Тест асинхронной pickle- и JSON-сериализации"""
+        user = User(1, "Иван", "ivan@example.com")
+        
+        async def scenario():
+            async with AsyncFileIO() as aio:
+                await aio.serialize_pickle(user, "user.pkl", test_directory)
+                await aio.serialize_json({"id": 1}, "user.json", test_directory)
+                return (await aio.deserialize_pickle("user.pkl", test_directory),
+                        await aio.deserialize_json("user.json", test_directory))
+        
+        loaded, data = asyncio.run(scenario())
+        assert loaded.email == user.email
+        assert data == {"id": 1}
+    
+    def test_does_not_block_loop(self, test_directory):
+        """Блокирующий вызов выполняется вне цикла событий"""
+        ticks = []
+        
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+        
+        async def scenario():
+            async with AsyncFileIO() as aio:
+                await asyncio.gather(aio.run(time.sleep, 0.1), ticker())
+        
+        asyncio.run(scenario())
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.1
+    
+    def test_invalid_workers(self):
+        """Тест проверки размера пула"""
+        with pytest.raises(ValueError):
+            AsyncFileIO(max_workers=0)
+        with pytest.raises(ValueError):
+            AsyncFileIO(max_concurrency=0)
+    
+    def test_reuse_across_event_loops(self):
+        """Один экземпляр работает в нескольких циклах событий"""
+        aio = AsyncFileIO(max_workers=2, max_concurrency=1)
+        
+        async def scenario():
+            return await aio.gather((time.sleep, (0.01,)) for _ in range(3))
+        
+        try:
+            for _ in range(2):
+                assert asyncio.run(scenario()) == [None, None, None]
+        finally:
+            aio.close()
+
+
+class TestAsyncBatch:
+    """Тесты пакетных операций"""
+    
+    def test_write_many_read_many(self, test_directory):
+        """Тест пакетной записи и чтения с сохранением порядка"""
+        items = [(f"f{i}.bin", bytes([i]) * 100) for i in range(20)]
+        
+        async def scenario():
+            async with AsyncFileIO(max_workers=4) as aio:
+                await aio.write_many(items + [("note.txt", "текст")], test_directory)
+                return await aio.read_many([name for name, _ in items], test_directory)
+        
+        assert asyncio.run(scenario()) == [data for _, data in items]
+        assert read_text("note.txt", TEST_DIR) == "текст"
+    
+    def test_read_many_return_exceptions(self, test_directory):
+        """Отсутствующий файл возвращается исключением"""
+        write_binary("ok.bin", b"ok", test_directory)
+        
+        async def scenario():
+            async with AsyncFileIO() as aio:
+                return await aio.read_many(["ok.bin", "missing.bin"], test_directory,
+                                           return_exceptions=True)
+        
+        ok, missing = asyncio.run(scenario())
+        assert ok == b"ok"
+        assert isinstance(missing, FileNotFoundError)
+    
+    def test_deserialize_many(self, test_directory):
+        """Тест пакетной десериализации"""
+        async def scenario():
+            async with AsyncFileIO() as aio:
+                await asyncio.gather(*(aio.serialize_pickle(i, f"{i}.pkl", test_directory)
+                                       for i in range(5)))
+                return await aio.deserialize_many([f"{i}.pkl" for i in range(5)], test_directory)
+        
+        assert asyncio.run(scenario()) == list(range(5))
+    
+    def test_concurrency_limit(self):
+        """В пуле одновременно не больше max_concurrency вызовов"""
+        lock = threading.Lock()
+        active = [0, 0]
+        
+        def work():
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+        
+        async def scenario():
+            async with AsyncFileIO(max_workers=8, max_concurrency=2) as aio:
+                await aio.gather((work, ()) for _ in range(8))
+        
+        asyncio.run(scenario())
+        assert active[1] == 2
+    
+    def test_failure_cancels_pending(self):
+        """При ошибке ещё не начатые вызовы отменяются"""
+        started = []
+        
+        def work(i):
+            started.append(i)
+            if i == 0:
+                raise OSError("сбой")
+            time.sleep(0.02)
+        
+        async def scenario():
+            async with AsyncFileIO(max_workers=1) as aio:
+                await aio.gather((work, (i,)) for i in range(10))
+        
+        with pytest.raises(OSError):
+            asyncio.run(scenario())
+        assert len(started) < 10
+    
+    def test_cancel_batch(self):
+        """Отмена пакета снимает вызовы, ждущие на семафоре"""
+        started = []
+        
+        def work(i):
+            started.append(i)
+            time.sleep(0.05)
+        
+        async def scenario():
+            async with AsyncFileIO(max_workers=1) as aio:
+                task = asyncio.ensure_future(aio.gather((work, (i,)) for i in range(10)))
+                await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+        
+        asyncio.run(scenario())
+        assert len(started) < 10
@@ -0,0 +1,108 @@
+"""
+Тесты для набора замеров производительности
+"""
+import json
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from benchmark import (
+    parse_size, generate_database, run_benchmarks, compare_reports, format_report, main
+)
+from serialization import PickleSerializer
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_benchmark"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+class TestGenerator:
+    """Тесты для генератора данных"""
+    
+    def test_parse_size(self):
+        """Проверить разбор размеров с суффиксами"""
+        assert parse_size("1K") == 1000
+        assert parse_size("10m") == 10_000_000
+        assert parse_size("2.5K") == 2500
+        assert parse_size("123") == 123
+    
+    def test_sizes(self):
+        """Проверить размеры сгенерированной базы"""
+        db = generate_database(50, products=20, orders=30)
+        
+        assert len(db.users) == 50
+        assert len(db.products) == 20
+        assert len(db.orders) == 30
+        assert all(order.products for order in db.orders)
+    
+    def test_deterministic(self):
+        """Проверить детерминированность данных"""
+        first = generate_database(100, seed=7)
+        second = generate_database(100, seed=7)
+        other = generate_database(100, seed=8)
+        
+        dump = PickleSerializer.serialize_to_bytes
+        assert dump(first) == dump(second)
+        assert dump(first) != dump(other)
+
+
+class TestRunner:
+    """Тесты для запуска и сравнения замеров"""
+    
+    def test_run_benchmarks(self):
+        """Проверить структуру отчёта"""
+        report = run_benchmarks(200, [1000], repeat=1)
+        
+        results = report["results"]
+        for name in ("database.add_users", "database.get_user", "pickle.serialize",
+                     "pickle.deserialize", "json.serialize", "json.deserialize",
+                     "write_binary.1000", "read_binary.1000"):
+            assert results[name]["seconds"] > 0
+        assert results["pickle.serialize"]["bytes"] > 0
+        assert report["meta"]["users"] == 200
+        json.dumps(report)
+    
+    def test_compare_reports(self):
+        """Проверить поиск регрессий"""
+        baseline = {"results": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "gone": {"seconds": 1.0}}}
+        current = {"results": {"a": {"seconds": 1.05, "ops": 1, "bytes": 0},
+                               "b": {"seconds": 1.5, "ops": 1, "bytes": 0},
+                               "new": {"seconds": 1.0, "ops": 1, "bytes": 0}}}
+        
+        comparisons = {c.name: c for c in compare_reports(current, baseline, threshold=0.1)}
+        
+        assert set(comparisons) == {"a", "b"}
+        assert not comparisons["a"].regression
+        assert comparisons["b"].regression
+        assert comparisons["b"].change == pytest.approx(0.5)
+        assert "+50% !" in format_report(current, list(comparisons.values()))
+    
+    def test_main_output_and_baseline(self, test_directory, capsys):
+        """Проверить CLI: запись отчёта и сравнение с базовым"""
+        output = os.path.join(test_directory, "bench.json")
+        args = ["--scale", "100", "--sizes", "1K", "--repeat", "1"]
+        
+        assert main(args + ["--output", output]) == 0
+        with open(output, encoding="utf-8") as f:
+            report = json.load(f)
+        assert "pickle.serialize" in report["results"]
+        
+        # Порог 1000x: шум измерений не должен давать регрессий
+        assert main(args + ["--baseline", output, "--threshold", "1000"]) == 0
+        assert "pickle.serialize" in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
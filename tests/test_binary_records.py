@@ -0,0 +1,118 @@
+"""
+Тесты для файлов записей фиксированной длины
+"""
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from binary_records import RecordFile, UserRecordFile, ProductRecordFile
+from models import User, Product
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_records"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+class TestUserRecordFile:
+    """Тесты для UserRecordFile"""
+    
+    def test_append_and_read(self, test_directory):
+        """Проверить запись и чтение по номеру"""
+        user = User(7, "Анастасия", "anastasia@example.com")
+        with UserRecordFile("users.bin", test_directory) as records:
+            assert records.append(user) == 0
+            loaded = records.read(0)
+        
+        assert loaded == user
+        assert loaded.email == user.email
+        assert loaded.created_at == user.created_at
+    
+    def test_random_access(self, test_directory):
+        """Проверить произвольный доступ по смещению"""
+        with UserRecordFile("users.bin", test_directory) as records:
+            count = records.extend(User(i, f"User{i}", f"user{i}@example.com") for i in range(10000))
+            
+            assert count == 10000
+            assert len(records) == 10000
+            assert records[5000].name == "User5000"
+            assert records[-1].user_id == 9999
+            with pytest.raises(IndexError):
+                records.read(10000)
+        
+        size = os.path.getsize(os.path.join(test_directory, "users.bin"))
+        assert size == 12 + 10000 * UserRecordFile.record.size
+    
+    def test_update_in_place(self, test_directory):
+        """Проверить обновление одной записи на месте"""
+        with UserRecordFile("users.bin", test_directory) as records:
+            records.extend([User(1, "A", "a@example.com"), User(2, "B", "b@example.com")])
+            records[0] = User(1, "Новое имя", "new@example.com")
+        
+        with UserRecordFile("users.bin", test_directory) as records:
+            assert len(records) == 2
+            assert records[0].name == "Новое имя"
+            assert records[1].name == "B"
+    
+    def test_sequential_decode(self, test_directory):
+        """Проверить последовательный обход пачками"""
+        users = [User(i, f"U{i}", f"u{i}@example.com") for i in range(9000)]
+        with UserRecordFile("users.bin", test_directory) as records:
+            records.extend(users)
+            loaded = list(records)
+        
+        assert loaded == users
+    
+    def test_field_too_long(self, test_directory):
+        """Проверить отказ записывать слишком длинное поле"""
+        with UserRecordFile("users.bin", test_directory) as records:
+            with pytest.raises(ValueError):
+                records.append(User(1, "Я" * 40, "long@example.com"))
+            assert len(records) == 0
+
+
+class TestProductRecordFile:
+    """Тесты для ProductRecordFile"""
+    
+    def test_roundtrip(self, test_directory):
+        """Проверить запись и чтение продуктов"""
+        products = [Product(i, f"Товар {i}", i * 1.5, i) for i in range(100)]
+        with ProductRecordFile("products.bin", test_directory) as records:
+            records.extend(products)
+            assert records[42] == products[42]
+            assert records[42].stock == 42
+            assert list(records) == products
+    
+    def test_kind_mismatch(self, test_directory):
+        """Проверить защиту от открытия файла другого типа"""
+        with ProductRecordFile("products.bin", test_directory) as records:
+            records.append(Product(1, "A", 1.0, 1))
+        
+        with pytest.raises(ValueError):
+            UserRecordFile("products.bin", test_directory)
+    
+    def test_subclass_must_define_fields(self, test_directory):
+        """Подкласс без _to_fields/_from_fields не создаётся"""
+        class Incomplete(RecordFile):
+            kind = b'NONE'
+        
+        with pytest.raises(TypeError):
+            RecordFile("base.bin", test_directory)
+        with pytest.raises(TypeError):
+            Incomplete("none.bin", test_directory)
+        assert not os.path.exists(os.path.join(test_directory, "none.bin"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
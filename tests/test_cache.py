@@ -0,0 +1,61 @@
+"""
+Тесты для LRU-кэша с бюджетом в байтах
+"""
+import pytest
+import sys
+sys.path.insert(0, '..')
+
+from cache import LRUCache, MISSING
+
+
+class TestLRUCache:
+    """Тесты LRUCache"""
+    
+    def test_get_put(self):
+        """Тест попадания и промаха"""
+        cache = LRUCache(100)
+        assert cache.get("a", 1) is MISSING
+        cache.put("a", 1, None, 10)
+        assert cache.get("a", 1) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_version_mismatch_drops_entry(self):
+        """Запись другой версии - промах и удаляется"""
+        cache = LRUCache(100)
+        cache.put("a", (1, 10), "старое", 10)
+        assert cache.get("a", (2, 10)) is MISSING
+        assert "a" not in cache
+        assert cache.stats().bytes == 0
+    
+    def test_lru_eviction(self):
+        """Вытесняется давно не использованная запись"""
+        cache = LRUCache(30)
+        for key in "abc":
+            cache.put(key, 0, key, 10)
+        cache.get("a", 0)
+        cache.put("d", 0, "d", 10)
+        
+        assert "b" not in cache
+        assert all(key in cache for key in "acd")
+        assert cache.evictions == 1
+    
+    def test_oversized_and_replace(self):
+        """Запись больше бюджета не кэшируется, повторный put заменяет запись"""
+        cache = LRUCache(20)
+        assert not cache.put("a", 0, "x", 21)
+        cache.put("b", 0, "x", 15)
+        cache.put("b", 1, "y", 5)
+        assert cache.stats().bytes == 5
+        assert cache.get("b", 1) == "y"
+    
+    def test_invalidate_and_clear(self):
+        """Тест удаления записей"""
+        cache = LRUCache(100)
+        cache.put("a", 0, 1, 10)
+        assert cache.invalidate("a")
+        assert not cache.invalidate("a")
+        cache.put("b", 0, 1, 10)
+        cache.clear()
+        assert len(cache) == 0 and cache.stats().bytes == 0
+        with pytest.raises(ValueError):
+            LRUCache(-1)
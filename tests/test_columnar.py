@@ -0,0 +1,125 @@
+"""
+Тесты для колоночной таблицы продуктов
+"""
+import pytest
+import sys
+sys.path.insert(0, '..')
+
+import columnar
+from columnar import ProductTable
+from models import ApplyResult, Product, Database
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    """Прогнать тест с NumPy (если установлен) и на чистом array"""
+    if request.param == "numpy":
+        if columnar.np is None:
+            pytest.skip("NumPy не установлен")
+    else:
+        monkeypatch.setattr(columnar, "np", None)
+    return request.param
+
+
+@pytest.fixture
+def products():
+    """Набор продуктов для тестов"""
+    return [
+        Product(1, "Ручка", 10.0, 100),
+        Product(2, "Тетрадь", 45.5, 3),
+        Product(3, "Рюкзак", 1500.0, 0),
+        Product(4, "Калькулятор", 700.0, 12),
+        Product(5, "Линейка", 25.0, 40),
+    ]
+
+
+class TestProductTable:
+    """Тесты для ProductTable"""
+    
+    def test_from_and_to_products(self, products):
+        """Проверить построение и выгрузку таблицы"""
+        table = ProductTable.from_products(products + [Product(1, "Дубль", 1.0, 1)])
+        
+        assert len(table) == 5
+        assert table.to_products() == products
+        assert table.get(4).stock == 12
+        assert table.get(42) is None
+    
+    def test_aggregates(self, backend, products):
+        """Проверить суммы по колонкам"""
+        table = ProductTable.from_products(products)
+        
+        assert table.total_stock() == 155
+        assert table.total_stock_value() == pytest.approx(
+            sum(p.price * p.stock for p in products))
+    
+    def test_filter(self, backend, products):
+        """Проверить фильтрацию по цене и остатку"""
+        table = ProductTable.from_products(products)
+        
+        assert list(table.filter(min_price=20, max_price=700)) == [2, 4, 5]
+        assert list(table.filter(min_price=20, min_stock=10)) == [4, 5]
+        assert list(table.low_stock(10)) == [2, 3]
+        assert list(table.filter()) == [1, 2, 3, 4, 5]
+    
+    def test_group_by_price(self, backend, products):
+        """Проверить группировку по ценовым корзинам"""
+        table = ProductTable.from_products(products)
+        
+        groups = table.group_by_price(100)
+        
+        assert groups == {0.0: (3, 143), 700.0: (1, 12), 1500.0: (1, 0)}
+        with pytest.raises(ValueError):
+            table.group_by_price(0)
+    
+    def test_bulk_updates(self, backend, products):
+        """Проверить массовые изменения цен и остатков"""
+        table = ProductTable.from_products(products)
+        
+        table.scale_prices(2.0)
+        table.scale_prices(0.5, [3])
+        table.set_stock([1, 2], [5, 6])
+        table.add_stock([4], [-2])
+        
+        assert list(table.prices) == [20.0, 91.0, 1500.0, 1400.0, 50.0]
+        assert list(table.stock) == [5, 6, 0, 10, 40]
+        with pytest.raises(KeyError):
+            table.set_stock([99], [1])
+
+
+class TestDatabaseProductTable:
+    """Тесты для обмена Database <-> ProductTable"""
+    
+    def test_roundtrip(self, products):
+        """Проверить выгрузку изменений обратно в Database"""
+        db = Database()
+        db.add_products(products)
+        original = db.get_product(2)
+        
+        table = db.to_product_table()
+        table.set_stock([2], [99])
+        table.append(Product(6, "Ластик", 5.0, 7))
+        result = db.apply_product_table(table)
+        
+        assert result == ApplyResult(inserted=1, updated=1)
+        assert db.get_product(2) is original
+        assert original.stock == 99
+        assert db.get_product(6).name == "Ластик"
+    
+    def test_unchanged_rows_not_marked_dirty(self, products):
+        """Неизменённые продукты не попадают в изменения базы"""
+        db = Database()
+        db.add_products(products)
+        db.clear_changes()
+        
+        table = db.to_product_table()
+        assert db.apply_product_table(table) == ApplyResult(inserted=0, updated=0)
+        assert not db.has_changes
+        
+        table.scale_prices(2.0)
+        assert db.apply_product_table(table).updated == len(products)
+        assert len(db.changes().dirty['products']) == len(products)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
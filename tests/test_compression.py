@@ -0,0 +1,170 @@
+"""
+Тесты для кодеков сжатия
+"""
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from compression import (
+    available_codecs, detect_codec, open_compressed, compress, decompress,
+    benchmark_codecs, format_benchmark_table, get_codec
+)
+from serialization import PickleSerializer, JSONSerializer
+from models import User, Product, Database
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_compression"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+@pytest.fixture
+def database():
+    """База с повторяющимися данными, хорошо поддающимися сжатию"""
+    db = Database()
+    db.add_users(User(i, f"Пользователь {i}", f"user{i}@example.com") for i in range(500))
+    db.add_products(Product(i, f"Товар {i % 20}", 100.0 + i % 7, i % 50) for i in range(500))
+    return db
+
+
+CODECS = available_codecs()
+
+
+class TestCodecs:
+    """Тесты для функций сжатия"""
+    
+    def test_stdlib_codecs_available(self):
+        """Проверить наличие кодеков стандартной библиотеки"""
+        assert {"zlib", "bz2", "lzma"} <= set(CODECS)
+    
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_bytes_roundtrip_and_detection(self, codec):
+        """Проверить сжатие байтов и определение кодека"""
+        data = b"file-io-serialization " * 1000
+        
+        packed = compress(data, codec, level=1)
+        
+        assert len(packed) < len(data)
+        assert detect_codec(packed[:6]) == codec
+        assert decompress(packed) == data
+    
+    def test_detect_plain_data(self):
+        """Проверить, что несжатые данные не распознаются как сжатые"""
+        assert detect_codec(PickleSerializer.serialize_to_bytes({"a": 1})[:6]) is None
+        assert detect_codec(b'{"a": 1}') is None
+        assert detect_codec(b'PKLS\x01') is None
+        assert decompress(b"plain") == b"plain"
+    
+    def test_plain_text_not_detected_as_zlib(self, test_directory):
+        """Текст, похожий на заголовок zlib (b"80" = 0x3830 делится на 31), читается как есть"""
+        assert detect_codec(b"80") is None
+        assert decompress(b"8000") == b"8000"
+        
+        JSONSerializer.serialize(80, "number.json", test_directory)
+        assert JSONSerializer.deserialize("number.json", test_directory) == 80
+        JSONSerializer.serialize({"price": 8000}, "price.json", test_directory)
+        assert JSONSerializer.deserialize("price.json", test_directory) == {"price": 8000}
+    
+    def test_legacy_raw_zlib_with_explicit_codec(self, test_directory):
+        """Сырой zlib без сигнатуры читается с явным codec='zlib'"""
+        import zlib
+        path = os.path.join(test_directory, "legacy.z")
+        with open(path, "wb") as f:
+            f.write(zlib.compress(b"legacy data"))
+        
+        with open_compressed(path, "rb", codec="zlib") as f:
+            assert f.read() == b"legacy data"
+        assert decompress(zlib.compress(b"legacy data"), "zlib") == b"legacy data"
+    
+    def test_unknown_codec(self):
+        """Проверить ошибку для неизвестного кодека"""
+        with pytest.raises(ValueError):
+            get_codec("rar")
+    
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_streaming_file(self, test_directory, codec):
+        """Проверить потоковую запись и чтение файла"""
+        path = os.path.join(test_directory, "stream.bin")
+        with open_compressed(path, "wb", codec) as f:
+            for i in range(200):
+                f.write(b"chunk %d\n" % i)
+        
+        with open_compressed(path, "rb") as f:
+            lines = f.read().splitlines()
+        
+        assert len(lines) == 200
+        assert lines[-1] == b"chunk 199"
+
+
+class TestCompressedSerializers:
+    """Тесты для сжатия в сериализаторах"""
+    
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_pickle_roundtrip(self, test_directory, database, codec):
+        """Проверить сжатый pickle с автоопределением кодека"""
+        PickleSerializer.serialize(database, "db.pkl", test_directory)
+        PickleSerializer.serialize(database, "db.pkl.z", test_directory, compression=codec)
+        
+        loaded = PickleSerializer.deserialize("db.pkl.z", test_directory)
+        
+        assert loaded.get_user(499).name == "Пользователь 499"
+        assert len(loaded.products) == 500
+        assert (os.path.getsize(os.path.join(test_directory, "db.pkl.z"))
+                < os.path.getsize(os.path.join(test_directory, "db.pkl")))
+    
+    def test_pickle_stream(self, test_directory):
+        """Проверить сжатый потоковый pickle"""
+        PickleSerializer.serialize_iter(range(1000), "numbers.pkls", test_directory,
+                                        batch_size=100, compression="zlib")
+        
+        assert list(PickleSerializer.deserialize_iter("numbers.pkls", test_directory)) == list(range(1000))
+        with pytest.raises(ValueError):
+            PickleSerializer.serialize_iter([1], "numbers.pkls", test_directory,
+                                            append=True, compression="zlib")
+    
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_json_roundtrip(self, test_directory, codec):
+        """Проверить сжатый JSON с автоопределением кодека"""
+        data = {"товары": [{"id": i, "name": f"Товар {i}"} for i in range(100)]}
+        
+        JSONSerializer.serialize(data, "data.json.z", test_directory, compression=codec, level=1)
+        
+        assert JSONSerializer.deserialize("data.json.z", test_directory) == data
+    
+    def test_json_lines(self, test_directory):
+        """Проверить сжатый JSON Lines"""
+        rows = [{"id": i} for i in range(50)]
+        JSONSerializer.serialize_lines(rows, "rows.jsonl.xz", test_directory, compression="lzma")
+        
+        assert list(JSONSerializer.deserialize_lines("rows.jsonl.xz", test_directory)) == rows
+
+
+class TestCodecBenchmark:
+    """Тесты для замера кодеков"""
+    
+    def test_benchmark_table(self, database):
+        """Проверить таблицу размер/время по кодекам"""
+        results = benchmark_codecs(database, repeat=1)
+        table = format_benchmark_table(results)
+        print("\n" + table)
+        
+        assert [row.codec for row in results] == ["none"] + CODECS
+        assert results[0].ratio == 1.0
+        assert all(row.ratio > 1.0 for row in results[1:])
+        assert all(row.encode_s > 0 and row.decode_s > 0 for row in results)
+        assert "zlib" in table
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,172 @@
+"""
+Тесты для инкрементальных снимков
+"""
+import os
+import pickle
+import pytest
+import sys
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+from delta import SnapshotChain, apply_delta
+from models import Database, User, Product
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_delta"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+class TestSnapshotChain:
+    """Тесты SnapshotChain"""
+    
+    def test_delta_contains_only_changes(self, test_directory):
+        """Дельта после изменения 10 заказов намного меньше снимка"""
+        db = generate_database(1000)
+        chain = SnapshotChain(test_directory)
+        chain.save(db)
+        
+        for order_id in range(10):
+            db.get_order(order_id).cancel()
+        filename = chain.save(db)
+        
+        base_size = os.path.getsize(os.path.join(test_directory, chain.base_filename))
+        delta_size = os.path.getsize(os.path.join(test_directory, filename))
+        assert delta_size * 20 < base_size
+        assert not db.has_changes
+    
+    def test_load_applies_chain(self, test_directory):
+        """Загрузка применяет дельты по порядку"""
+        db = generate_database(50)
+        chain = SnapshotChain(test_directory)
+        chain.save(db)
+        db.get_order(1).complete()
+        db.add_user(User(100, "Новый", "new@example.com"))
+        chain.save(db)
+        db.get_order(1).cancel()
+        db.get_product(3).stock = 0
+        db.mark_dirty(db.get_product(3))
+        chain.save(db)
+        
+        loaded = SnapshotChain(test_directory).load()
+        assert len(chain.deltas) == 2
+        assert loaded.get_order(1).status == "cancelled"
+        assert loaded.get_user(100).name == "Новый"
+        assert loaded.get_product(3).stock == 0
+        order = loaded.get_order(1)
+        assert order.user is loaded.get_user(order.user.user_id)
+        assert not loaded.has_changes
+    
+    def test_no_changes_no_delta(self, test_directory):
+        """Без изменений дельта не пишется"""
+        db = generate_database(5)
+        chain = SnapshotChain(test_directory)
+        chain.save(db)
+        assert chain.save(db) is None
+        assert chain.deltas == []
+    
+    def test_compact(self, test_directory):
+        """Сжатие цепочки удаляет дельты и сохраняет состояние"""
+        db = generate_database(20)
+        chain = SnapshotChain(test_directory)
+        chain.save(db)
+        for order_id in range(3):
+            db.get_order(order_id).complete()
+            chain.save(db)
+        delta_files = list(chain.deltas)
+        
+        chain.compact()
+        assert chain.deltas == []
+        assert not any(os.path.exists(os.path.join(test_directory, f)) for f in delta_files)
+        loaded = SnapshotChain(test_directory).load()
+        assert [loaded.get_order(i).status for i in range(3)] == ["completed"] * 3
+    
+    def test_crash_in_compact_keeps_previous_chain(self, test_directory, monkeypatch):
+        """Прерванный compact не применяет старые дельты к новому снимку"""
+        db = generate_database(10)
+        chain = SnapshotChain(test_directory)
+        chain.save(db)
+        db.get_order(1).complete()
+        chain.save(db)
+        db.get_order(1).cancel()
+        db.add_user(User(100, "Новый", "new@example.com"))
+        
+        def crash():
+            raise OSError("сбой до записи манифеста")
+        
+        monkeypatch.setattr(chain, "_write_manifest", crash)
+        with pytest.raises(OSError):
+            chain.compact(db)
+        
+        # Манифест указывает на прежний снимок и его дельту
+        loaded = SnapshotChain(test_directory).load()
+        assert loaded.get_order(1).status == "completed"
+        assert loaded.get_user(100) is None
+        
+        monkeypatch.undo()
+        chain = SnapshotChain(test_directory)
+        chain.compact(db)
+        assert SnapshotChain(test_directory).load().get_order(1).status == "cancelled"
+        assert sorted(f for f in os.listdir(test_directory) if f.endswith(".pkl")) == \
+            [chain.base_filename]
+    
+    def test_delta_durable_before_manifest(self, test_directory, monkeypatch):
+        """Дельта сбрасывается на диск и подменяется до записи манифеста"""
+        import delta
+        db = generate_database(10)
+        chain = SnapshotChain(test_directory)
+        chain.save(db)
+        db.get_order(2).complete()
+        events = []
+        real_fsync, real_replace, real_manifest = os.fsync, os.replace, chain._write_manifest
+        monkeypatch.setattr(delta.os, "fsync", lambda fd: (events.append("fsync"), real_fsync(fd)))
+        monkeypatch.setattr(delta.os, "replace",
+                            lambda src, dst: (events.append(os.path.basename(dst)), real_replace(src, dst)))
+        monkeypatch.setattr(chain, "_write_manifest", lambda: (events.append("manifest"), real_manifest()))
+        
+        filename = chain.save_delta(db)
+        
+        assert events[:3] == ["fsync", filename, "manifest"]
+        monkeypatch.undo()
+        assert SnapshotChain(test_directory).load().get_order(2).status == "completed"
+    
+    def test_max_deltas_triggers_compaction(self, test_directory):
+        """По достижении max_deltas save() записывает новый базовый снимок"""
+        db = generate_database(10)
+        chain = SnapshotChain(test_directory, max_deltas=2)
+        chain.save(db)
+        db.get_order(0).cancel()
+        assert chain.save(db).startswith("database.delta-")
+        db.get_order(1).cancel()
+        assert chain.save(db) == chain.base_filename
+        assert chain.deltas == []
+    
+    def test_delta_without_base(self, test_directory):
+        """Дельту нельзя записать без базового снимка"""
+        with pytest.raises(FileNotFoundError):
+            SnapshotChain(test_directory).save_delta(generate_database(1))
+    
+    def test_apply_delta_idempotent(self):
+        """Повторное применение дельты не меняет базу"""
+        db = Database()
+        user = User(1, "Иван", "ivan@example.com")
+        db.add_user(user)
+        changed = pickle.loads(pickle.dumps(user))
+        changed.email = "ivan@new.example.com"
+        delta = {'users': [changed], 'products': [Product(1, "Ноутбук", 10.0, 1)], 'orders': []}
+        
+        apply_delta(db, delta)
+        apply_delta(db, delta)
+        assert db.get_user(1) is user
+        assert db.get_user_by_email("ivan@new.example.com") is user
+        assert len(db.products) == 1
@@ -9,8 +9,11 @@ sys.path.insert(0, '..')
 from file_operations import (
     write_text, read_text, write_binary, read_binary,
     file_exists, get_file_size, delete_file, list_files,
-    ensure_data_dir
+    ensure_data_dir, read_binary_mmap, iter_binary_chunks, iter_binary_into,
+    readinto_binary, iter_text_chunks, write_binary_chunks, write_text_chunks,
+    enable_content_cache, disable_content_cache, content_cache
 )
+import struct
 from pathlib import Path
 
 # Тестовая директория
@@ -28,6 +31,14 @@ def test_directory():
         shutil.rmtree(TEST_DIR)
 
 
+@pytest.fixture
+def cache():
+    """Включить кэш содержимого на время теста"""
+    cache = enable_content_cache(max_bytes=1024)
+    yield cache
+    disable_content_cache()
+
+
 class TestTextOperations:
     """Тесты для текстовых операций"""
     
@@ -155,5 +166,190 @@ class TestFileManagement:
         shutil.rmtree(test_dir)
 
 
+class TestMemoryMappedRead:
+    """Тесты для чтения через mmap"""
+    
+    def test_mmap_contents(self, test_directory):
+        """Проверить содержимое отображения"""
+        data = bytes(range(256)) * 4
+        write_binary("mapped.bin", data, test_directory)
+        
+        with read_binary_mmap("mapped.bin", test_directory) as view:
+            assert isinstance(view, memoryview)
+            assert view.readonly
+            assert len(view) == len(data)
+            assert view[10:20] == data[10:20]
+            assert bytes(view) == data
+    
+    def test_mmap_released_after_block(self, test_directory):
+        """Проверить освобождение представления после блока"""
+        write_binary("mapped.bin", b"abc", test_directory)
+        
+        with read_binary_mmap("mapped.bin", test_directory) as view:
+            pass
+        
+        with pytest.raises(ValueError):
+            view[0]
+    
+    def test_mmap_empty_file(self, test_directory):
+        """Проверить отображение пустого файла"""
+        write_binary("empty.bin", b"", test_directory)
+        
+        with read_binary_mmap("empty.bin", test_directory) as view:
+            assert len(view) == 0
+    
+    def test_mmap_missing_file(self, test_directory):
+        """Проверить ошибку для отсутствующего файла"""
+        with pytest.raises(FileNotFoundError):
+            with read_binary_mmap("missing.bin", test_directory):
+                pass
+    
+    def test_mmap_struct_decoding(self, test_directory):
+        """Проверить разбор struct прямо из отображения"""
+        record = struct.Struct("<I20s")
+        payload = b"".join(record.pack(i, f"user{i}".encode()) for i in range(5))
+        write_binary("records.bin", payload, test_directory)
+        
+        with read_binary_mmap("records.bin", test_directory) as view:
+            user_id, name = record.unpack_from(view, 3 * record.size)
+            ids = [fields[0] for fields in record.iter_unpack(view)]
+        
+        assert user_id == 3
+        assert name.rstrip(b"\0") == b"user3"
+        assert ids == [0, 1, 2, 3, 4]
+
+
+class TestChunkedOperations:
+    """Тесты для потокового чтения и записи блоками"""
+    
+    def test_iter_binary_chunks(self, test_directory):
+        """Проверить чтение блоками заданного размера"""
+        data = bytes(range(256)) * 10
+        write_binary("chunks.bin", data, test_directory)
+        
+        chunks = list(iter_binary_chunks("chunks.bin", test_directory, chunk_size=1000))
+        
+        assert [len(c) for c in chunks] == [1000, 1000, 560]
+        assert b"".join(chunks) == data
+    
+    def test_iter_binary_into_reuses_buffer(self, test_directory):
+        """Проверить чтение в один переиспользуемый буфер"""
+        data = bytes(range(100)) * 3
+        write_binary("into.bin", data, test_directory)
+        buffer = bytearray(128)
+        
+        collected = bytearray()
+        for view in iter_binary_into("into.bin", buffer, test_directory):
+            assert view.obj is buffer
+            collected += view
+        
+        assert collected == data
+    
+    def test_readinto_binary(self, test_directory):
+        """Проверить readinto в заранее выделенный буфер"""
+        write_binary("readinto.bin", b"0123456789", test_directory)
+        buffer = bytearray(4)
+        
+        assert readinto_binary("readinto.bin", buffer, test_directory, offset=3) == 4
+        assert buffer == b"3456"
+        assert readinto_binary("readinto.bin", buffer, test_directory, offset=8) == 2
+        assert buffer[:2] == b"89"
+    
+    def test_write_binary_chunks(self, test_directory):
+        """Проверить запись из генератора блоков"""
+        total = write_binary_chunks("out.bin", (bytes([i]) * 10 for i in range(5)), test_directory)
+        total += write_binary_chunks("out.bin", [b"tail"], test_directory, append=True)
+        
+        assert total == 54
+        assert read_binary("out.bin", test_directory) == b"".join(bytes([i]) * 10 for i in range(5)) + b"tail"
+    
+    def test_pipe_transform(self, test_directory):
+        """Проверить потоковое преобразование файла без полной копии"""
+        write_binary("source.bin", b"abcdef" * 1000, test_directory)
+        
+        write_binary_chunks(
+            "upper.bin",
+            (chunk.upper() for chunk in iter_binary_chunks("source.bin", test_directory, chunk_size=512)),
+            test_directory)
+        
+        assert read_binary("upper.bin", test_directory) == b"ABCDEF" * 1000
+    
+    def test_text_chunks(self, test_directory):
+        """Проверить запись и чтение текста блоками"""
+        write_text_chunks("text.txt", ["Привет, ", "мир", "!"], test_directory)
+        
+        chunks = list(iter_text_chunks("text.txt", test_directory, chunk_size=5))
+        
+        assert "".join(chunks) == "Привет, мир!"
+        assert all(len(c) <= 5 for c in chunks)
+    
+    def test_invalid_chunk_size(self, test_directory):
+        """Проверить проверку размера блока"""
+        write_binary("x.bin", b"x", test_directory)
+        with pytest.raises(ValueError):
+            list(iter_binary_chunks("x.bin", test_directory, chunk_size=0))
+
+
+class TestContentCache:
+    """Тесты кэша содержимого read_text/read_binary"""
+    
+    def test_disabled_by_default(self):
+        """Кэш выключен, пока его не включили"""
+        assert content_cache() is None
+    
+    def test_repeated_reads_hit(self, test_directory, cache):
+        """Повторное чтение неизменённого файла берётся из кэша"""
+        write_binary("a.bin", b"abc", test_directory)
+        first = read_binary("a.bin", test_directory)
+        second = read_binary("a.bin", test_directory)
+        
+        assert second is first
+        assert (cache.hits, cache.misses) == (1, 1)
+        write_text("a.txt", "Привет", test_directory)
+        assert read_text("a.txt", test_directory) == read_text("a.txt", test_directory) == "Привет"
+        assert cache.hits == 2
+    
+    def test_writes_invalidate(self, test_directory, cache):
+        """write_*, потоковая запись и delete_file сбрасывают запись кэша"""
+        write_text("a.txt", "один", test_directory)
+        read_text("a.txt", test_directory)
+        write_text("a.txt", "два", test_directory)
+        assert read_text("a.txt", test_directory) == "два"
+        
+        write_binary_chunks("a.bin", [b"x"], test_directory)
+        read_binary("a.bin", test_directory)
+        write_binary_chunks("a.bin", [b"y"], test_directory, append=True)
+        assert read_binary("a.bin", test_directory) == b"xy"
+        
+        delete_file("a.bin", test_directory)
+        assert len(cache) == 1
+        with pytest.raises(FileNotFoundError):
+            read_binary("a.bin", test_directory)
+    
+    def test_external_change_detected(self, test_directory, cache):
+        """Файл, изменённый в обход модуля, перечитывается по mtime/размеру"""
+        write_text("a.txt", "один", test_directory)
+        read_text("a.txt", test_directory)
+        path = os.path.join(test_directory, "a.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("совсем другое")
+        
+        assert read_text("a.txt", test_directory) == "совсем другое"
+    
+    def test_byte_budget(self, test_directory, cache):
+        """Давно не использованные записи вытесняются, большие не кэшируются"""
+        for name in ("a", "b", "c"):
+            write_binary(name, b"x" * 400, test_directory)
+            read_binary(name, test_directory)
+        write_binary("big", b"x" * 2000, test_directory)
+        read_binary("big", test_directory)
+        
+        stats = cache.stats()
+        assert stats.entries == 2 and stats.bytes == 800
+        assert stats.evictions == 1
+        read_binary("a", test_directory)
+        assert cache.stats().misses == 5
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
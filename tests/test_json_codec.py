@@ -0,0 +1,148 @@
+"""
+Тесты для JSON-кодека моделей
+"""
+import json
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+from json_codec import ModelJSONCodec, available_backends, dumps, loads
+from models import Database, User, Product, Order
+from serialization import JSONSerializer
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_json_codec"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+@pytest.fixture(params=available_backends())
+def codec(request):
+    """Кодек для каждого доступного бэкенда"""
+    return ModelJSONCodec(backend=request.param)
+
+
+class TestModelJSONCodec:
+    """Тесты ModelJSONCodec"""
+    
+    def test_database_round_trip(self, codec):
+        """База восстанавливается с индексами и связями заказов"""
+        db = generate_database(30)
+        loaded = codec.decode(codec.encode(db))
+        
+        assert isinstance(loaded, Database)
+        assert [(u.user_id, u.email, u._created_us) for u in loaded.users] == \
+            [(u.user_id, u.email, u._created_us) for u in db.users]
+        assert [(p.product_id, p.price, p.stock) for p in loaded.products] == \
+            [(p.product_id, p.price, p.stock) for p in db.products]
+        order = loaded.get_order(4)
+        assert order.status == db.get_order(4).status
+        assert order.user is loaded.get_user(order.user.user_id)
+        assert all(p is loaded.get_product(p.product_id) for p in order.products)
+        assert not loaded.has_changes
+    
+    def test_compact_rows_with_references(self, codec):
+        """Записи - массивы, заказ ссылается на пользователя и продукты по ID"""
+        db = Database()
+        user = User(1, "Анна", "anna@example.com")
+        product = Product(2, "Книга", 250.0, 5)
+        db.add_user(user)
+        db.add_product(product)
+        db.add_order(Order(3, user, [product], 250.0))
+        
+        document = json.loads(codec.encode(db))
+        assert document['users'] == [[1, "Анна", "anna@example.com", user._created_us]]
+        assert document['orders'][0][:4] == [3, 1, [2], 250.0]
+    
+    def test_nested_models(self, codec):
+        """Модели внутри обычных списков и словарей"""
+        user = User(1, "Анна", "anna@example.com")
+        order = Order(7, user, [Product(2, "Книга", 250.0, 5)], 250.0)
+        order.cancel()
+        
+        loaded = codec.decode(codec.encode({"owner": user, "orders": [order], "n": 1}))
+        assert loaded["n"] == 1
+        assert loaded["owner"] == user
+        assert loaded["orders"][0].status == "cancelled"
+        assert loaded["orders"][0].products[0].price == 250.0
+        assert loaded["orders"][0].created_at == order.created_at
+    
+    def test_non_str_keys_and_big_ints(self, codec):
+        """Нестроковые ключи и большие целые кодируются одинаково всеми бэкендами"""
+        user = User(1, "Анна", "anna@example.com")
+        payload = {1: user, 2: {"big": 2 ** 70}}
+        
+        data = codec.encode(payload)
+        assert json.loads(data)["2"] == {"big": 2 ** 70}
+        loaded = codec.decode(data)
+        assert loaded == {"1": user, "2": {"big": 2 ** 70}}
+        assert all(json.loads(ModelJSONCodec(backend=backend).encode(payload)) == json.loads(data)
+                   for backend in available_backends())
+    
+    def test_iso_timestamps(self):
+        """Время в ISO 8601 восстанавливается с точностью до микросекунды"""
+        user = User(1, "Анна", "anna@example.com")
+        user._created_us = 1_700_000_000_123_456
+        codec = ModelJSONCodec(timestamps='iso')
+        
+        data = codec.encode(user)
+        assert b"2023-11-14T22:13:20.123456+00:00" in data
+        assert loads(data)._created_us == user._created_us
+    
+    def test_foreign_user_embedded(self, codec):
+        """Пользователь заказа не из базы записывается целиком"""
+        db = Database()
+        db.add_order(Order(1, User(9, "Гость", "guest@example.com"), [], 0.0))
+        
+        loaded = codec.decode(codec.encode(db))
+        assert loaded.get_order(1).user.name == "Гость"
+        assert loaded.get_user(9) is None
+    
+    def test_errors(self, codec):
+        """Неизвестные типы, модели и версии отвергаются"""
+        with pytest.raises(TypeError):
+            codec.encode(object())
+        with pytest.raises(ValueError):
+            codec.decode('{"$model": "Invoice", "v": 1}')
+        with pytest.raises(ValueError):
+            codec.decode('{"$model": "User", "v": 99, "row": []}')
+        with pytest.raises(ValueError):
+            ModelJSONCodec(timestamps='rfc')
+    
+    def test_module_helpers(self):
+        """dumps/loads с кодеком по умолчанию"""
+        product = Product(1, "Книга", 250.0, 5)
+        assert loads(dumps([product])) == [product]
+
+
+class TestJSONSerializerModels:
+    """Тесты serialize_model / deserialize_model"""
+    
+    def test_round_trip_file(self, test_directory):
+        """Тест записи базы в файл и чтения обратно"""
+        db = generate_database(20)
+        JSONSerializer.serialize_model(db, "db.json", test_directory)
+        loaded = JSONSerializer.deserialize_model("db.json", test_directory)
+        
+        assert len(loaded.orders) == 20
+        assert loaded.get_user(3).email == "user3@example.com"
+    
+    def test_compressed(self, test_directory):
+        """Тест записи со сжатием"""
+        db = generate_database(20)
+        JSONSerializer.serialize_model(db, "db.json.gz", test_directory,
+                                       compression='zlib', timestamps='iso')
+        loaded = JSONSerializer.deserialize_model("db.json.gz", test_directory)
+        assert loaded.get_order(1)._created_us == db.get_order(1)._created_us
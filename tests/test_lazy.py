@@ -0,0 +1,187 @@
+"""
+Тесты для ленивой загрузки Database
+"""
+import pickle
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+import lazy as lazy_module
+from lazy import save_lazy, LazyDatabase
+from models import Database, User, Product, Order
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_lazy"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+@pytest.fixture
+def saved_db(test_directory):
+    """База из 100 записей каждого вида, сохранённая в ленивом формате"""
+    db = generate_database(100)
+    save_lazy(db, "db.lazy", test_directory)
+    return db
+
+
+class TestLazyDatabase:
+    """Тесты LazyDatabase"""
+    
+    def test_open_materializes_nothing(self, saved_db):
+        """При открытии объекты не создаются"""
+        with LazyDatabase("db.lazy", TEST_DIR) as lazy:
+            assert lazy.live_objects == 0
+            assert len(lazy.users) == 100
+            assert lazy.get_user(42).email == "user42@example.com"
+            assert lazy.live_objects == 1
+    
+    def test_lookups_match_source(self, saved_db):
+        """Тест поиска по ID и email"""
+        with LazyDatabase("db.lazy", TEST_DIR) as lazy:
+            assert lazy.get_product(7).price == saved_db.get_product(7).price
+            assert lazy.get_user_by_email("user9@example.com").user_id == 9
+            assert lazy.get_user(1000) is None
+            assert lazy.get_user_by_email("nobody@example.com") is None
+            
+            order = lazy.get_order(3)
+            source = saved_db.get_order(3)
+            assert order.status == source.status
+            assert order._created_us == source._created_us
+            assert [p.product_id for p in order.products] == [p.product_id for p in source.products]
+    
+    def test_identity_without_cache_limit(self, saved_db):
+        """Без ограничения кэша заказ ссылается на тот же объект пользователя"""
+        with LazyDatabase("db.lazy", TEST_DIR) as lazy:
+            order = lazy.get_order(5)
+            assert order.user is lazy.get_user(order.user.user_id)
+            assert lazy.get_order(5) is order
+    
+    def test_iteration_order(self, saved_db):
+        """Итерация идёт в исходном порядке"""
+        with LazyDatabase("db.lazy", TEST_DIR) as lazy:
+            assert [u.user_id for u in lazy.users] == [u.user_id for u in saved_db.users]
+            assert lazy.orders[-1].order_id == saved_db.orders[-1].order_id
+            assert [p.product_id for p in lazy.products[2:5]] == [2, 3, 4]
+            with pytest.raises(IndexError):
+                lazy.users[100]
+    
+    def test_lru_bound(self, saved_db):
+        """С cache_size число живых объектов ограничено"""
+        with LazyDatabase("db.lazy", TEST_DIR, cache_size=10) as lazy:
+            for user in lazy.users:
+                pass
+            assert lazy.live_objects == 10
+            lazy.get_user(99)
+            assert lazy.hits == 1
+            lazy.get_user(0)
+            assert lazy.misses == 101
+    
+    def test_unsorted_ids(self, test_directory):
+        """Поиск работает при ID, добавленных не по порядку"""
+        db = Database()
+        for user_id in (50, 3, 17, -2):
+            db.add_user(User(user_id, f"U{user_id}", f"u{user_id}@example.com"))
+        save_lazy(db, "db.lazy", test_directory)
+        
+        with LazyDatabase("db.lazy", test_directory) as lazy:
+            assert [lazy.get_user(i).name for i in (-2, 3, 17, 50)] == ["U-2", "U3", "U17", "U50"]
+            assert lazy.get_user(4) is None
+    
+    def test_order_with_foreign_user(self, test_directory):
+        """Пользователь заказа, которого нет в базе, сохраняется целиком"""
+        db = Database()
+        product = Product(1, "Ноутбук", 999.99, 5)
+        db.add_product(product)
+        db.add_order(Order(1, User(9, "Гость", "guest@example.com"), [product], 999.99))
+        save_lazy(db, "db.lazy", test_directory)
+        
+        with LazyDatabase("db.lazy", test_directory) as lazy:
+            order = lazy.get_order(1)
+            assert order.user.name == "Гость"
+            assert order.products[0] is lazy.get_product(1)
+            assert lazy.get_user(9) is None
+    
+    def test_to_database(self, saved_db):
+        """Тест материализации в обычную Database"""
+        with LazyDatabase("db.lazy", TEST_DIR, cache_size=5) as lazy:
+            db = lazy.to_database()
+        assert len(db.orders) == 100
+        order = db.get_order(10)
+        assert order.user is db.get_user(order.user.user_id)
+    
+    def test_invalid_file(self, test_directory):
+        """Тест файла в другом формате"""
+        with open(os.path.join(test_directory, "db.pkl"), 'wb') as f:
+            pickle.dump(Database(), f)
+        with pytest.raises(pickle.UnpicklingError):
+            LazyDatabase("db.pkl", test_directory)
+    
+    def test_corrupt_index_closes_file(self, saved_db, monkeypatch):
+        """Обрезанный индекс отклоняется, файл и mmap закрываются"""
+        path = os.path.join(TEST_DIR, "db.lazy")
+        opened = []
+        
+        def spy_open(*args, **kwargs):
+            f = open(*args, **kwargs)
+            opened.append(f)
+            return f
+        
+        monkeypatch.setattr(lazy_module, 'open', spy_open, raising=False)
+        size = os.path.getsize(path)
+        for cut in (10, 6000):
+            os.truncate(path, size - cut)
+            with pytest.raises(pickle.UnpicklingError):
+                LazyDatabase("db.lazy", TEST_DIR)
+        assert len(opened) == 2 and all(f.closed for f in opened)
+    
+    def test_index_is_zero_copy(self, saved_db):
+        """Столбцы индекса - представления над mmap, close их освобождает"""
+        lazy = LazyDatabase("db.lazy", TEST_DIR)
+        ids = lazy._sections['orders'].ids
+        if lazy_module._ZERO_COPY:
+            assert isinstance(ids, memoryview)
+        assert list(ids) == list(range(100))
+        lazy.get_order(5)
+        lazy.close()
+        assert len(lazy.orders) == 100
+    
+    def test_reads_version_1(self, test_directory):
+        """Файл версии 1 (невыровненный индекс в порядке байтов платформы)"""
+        from array import array
+        users = [User(2, "B", "b@example.com"), User(1, "A", "a@example.com")]
+        with open(os.path.join(test_directory, "v1.lazy"), 'wb') as f:
+            f.write(lazy_module._HEADER.pack(b'LZDB', 1, 0))
+            offsets, lengths = array('Q'), array('I')
+            for user in users:
+                payload = pickle.dumps(user)
+                offsets.append(f.tell())
+                lengths.append(len(payload))
+                f.write(payload)
+            index_offset = f.tell()
+            f.write(lazy_module._COUNT.pack(2))
+            for column in (array('q', [2, 1]), offsets, lengths, array('q', [1, 0])):
+                column.tofile(f)
+            for _ in range(2):
+                f.write(lazy_module._COUNT.pack(0))
+            emails = pickle.dumps({user.email: user.user_id for user in users})
+            f.write(lazy_module._COUNT.pack(len(emails)))
+            f.write(emails)
+            f.seek(0)
+            f.write(lazy_module._HEADER.pack(b'LZDB', 1, index_offset))
+        
+        with LazyDatabase("v1.lazy", test_directory) as lazy:
+            assert lazy.get_user(1).name == "A"
+            assert lazy.get_user_by_email("b@example.com").user_id == 2
+            assert [user.user_id for user in lazy.users] == [2, 1]
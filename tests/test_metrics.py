@@ -0,0 +1,162 @@
+"""
+Тесты для метрик операций
+"""
+import logging
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+import metrics
+from metrics import MetricsRegistry, InMemorySink, LoggingSink, LATENCY_BUCKETS
+from file_operations import write_binary, read_binary, write_text, read_text, delete_file
+from serialization import PickleSerializer, JSONSerializer
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_metrics"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+@pytest.fixture
+def sink():
+    """Включить метрики по умолчанию с приёмником в памяти"""
+    memory = InMemorySink()
+    metrics.REGISTRY.reset()
+    metrics.enable(memory)
+    yield memory
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+class TestMetricsRegistry:
+    """Тесты для MetricsRegistry"""
+    
+    def test_disabled_by_default(self):
+        """Проверить, что выключенный реестр ничего не считает"""
+        registry = MetricsRegistry()
+        
+        started = registry.clock()
+        registry.observe("op", started, 100)
+        
+        assert started == 0.0
+        assert registry.snapshot() == {}
+    
+    def test_counters_and_histogram(self):
+        """Проверить счётчики и гистограмму задержек"""
+        registry = MetricsRegistry()
+        registry.enabled = True
+        
+        for _ in range(3):
+            registry.observe("op", registry.clock(), 10)
+        registry.observe("op", registry.clock(), error=IOError("boom"))
+        
+        stats = registry.snapshot()["op"]
+        assert stats["calls"] == 4
+        assert stats["errors"] == 1
+        assert stats["bytes"] == 30
+        assert sum(stats["buckets"]) == 4
+        assert len(stats["buckets"]) == len(LATENCY_BUCKETS) + 1
+    
+    def test_prometheus_text(self):
+        """Проверить выгрузку в формате Prometheus"""
+        registry = MetricsRegistry()
+        registry.enabled = True
+        registry.observe("read_binary", registry.clock(), 42)
+        
+        text = registry.to_prometheus()
+        
+        assert '# TYPE file_io_calls_total counter' in text
+        assert 'file_io_calls_total{op="read_binary"} 1' in text
+        assert 'file_io_bytes_total{op="read_binary"} 42' in text
+        assert 'file_io_latency_seconds_bucket{op="read_binary",le="+Inf"} 1' in text
+        assert 'file_io_latency_seconds_count{op="read_binary"} 1' in text
+    
+    def test_dump_prometheus(self, test_directory, sink):
+        """Проверить запись файла для textfile collector"""
+        write_binary("x.bin", b"abc", test_directory)
+        path = os.path.join(test_directory, "metrics.prom")
+        
+        metrics.dump_prometheus(path)
+        
+        with open(path, encoding="utf-8") as f:
+            assert 'op="write_binary"' in f.read()
+
+
+class TestInstrumentation:
+    """Тесты для инструментирования модулей"""
+    
+    def test_no_print(self, test_directory, capsys):
+        """Проверить, что операции больше не печатают в stdout"""
+        write_text("a.txt", "текст", test_directory)
+        read_text("a.txt", test_directory)
+        PickleSerializer.serialize([1, 2], "a.pkl", test_directory)
+        PickleSerializer.deserialize("a.pkl", test_directory)
+        delete_file("a.txt", test_directory)
+        
+        assert capsys.readouterr().out == ""
+    
+    def test_file_operations(self, test_directory, sink):
+        """Проверить метрики операций с файлами"""
+        write_binary("data.bin", b"12345", test_directory)
+        read_binary("data.bin", test_directory)
+        with pytest.raises(IOError):
+            read_binary("missing.bin", test_directory)
+        
+        stats = metrics.REGISTRY.snapshot()
+        assert stats["write_binary"]["bytes"] == 5
+        assert stats["read_binary"]["calls"] == 2
+        assert stats["read_binary"]["errors"] == 1
+        assert [event.op for event in sink.events] == ["write_binary", "read_binary", "read_binary"]
+        assert isinstance(sink.events[-1].error, FileNotFoundError)
+    
+    def test_delete_missing_file(self, test_directory, sink):
+        """Удаление отсутствующего файла учитывается как ошибка"""
+        write_binary("data.bin", b"1", test_directory)
+        assert delete_file("data.bin", test_directory) is True
+        assert delete_file("data.bin", test_directory) is False
+        
+        stats = metrics.REGISTRY.snapshot()
+        assert stats["delete_file"]["calls"] == 2
+        assert stats["delete_file"]["errors"] == 1
+        assert isinstance(sink.events[-1].error, FileNotFoundError)
+    
+    def test_serializers(self, test_directory, sink):
+        """Проверить метрики сериализаторов"""
+        PickleSerializer.serialize({"a": 1}, "a.pkl", test_directory)
+        PickleSerializer.deserialize("a.pkl", test_directory)
+        JSONSerializer.serialize({"a": 1}, "a.json", test_directory)
+        JSONSerializer.deserialize("a.json", test_directory)
+        
+        stats = metrics.REGISTRY.snapshot()
+        size = os.path.getsize(os.path.join(test_directory, "a.pkl"))
+        assert stats["pickle.serialize"]["bytes"] == size
+        assert stats["pickle.deserialize"]["bytes"] == size
+        assert stats["json.serialize"]["calls"] == 1
+        assert stats["json.deserialize"]["calls"] == 1
+    
+    def test_logging_sink(self, test_directory, caplog):
+        """Проверить приёмник logging"""
+        metrics.enable(LoggingSink(level=logging.INFO))
+        try:
+            with caplog.at_level(logging.INFO, logger="file_io"):
+                write_text("a.txt", "abc", test_directory)
+        finally:
+            metrics.disable()
+            metrics.REGISTRY.reset()
+        
+        assert "write_text" in caplog.text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,11 +1,16 @@
 """
 Тесты для моделей
 """
+import copyreg
+import io
+import pickle
 import pytest
 import sys
+import tracemalloc
+from datetime import datetime
 sys.path.insert(0, '..')
 
-from models import User, Product, Order, Database
+from models import User, Product, Order, Database, IngestResult, PICKLE_STATE_VERSION, _restore_user
 
 
 class TestUser:
@@ -141,6 +146,318 @@ class TestDatabase:
         found_product = db.get_product(3)
         assert found_product is not None
         assert found_product == product
+    
+    def test_add_duplicate_user(self):
+        """Проверить, что дубликат по ID не добавляется"""
+        db = Database()
+        db.add_user(User(1, "Татьяна", "tatiana@example.com"))
+        db.add_user(User(1, "Другая", "other@example.com"))
+        
+        assert len(db.users) == 1
+        assert db.get_user(1).name == "Татьяна"
+    
+    def test_unique_email(self):
+        """Проверить уникальность email"""
+        db = Database()
+        db.add_user(User(1, "Анна", "same@example.com"))
+        db.add_user(User(2, "Инна", "same@example.com"))
+        
+        assert len(db.users) == 1
+        assert db.get_user(2) is None
+        assert db.get_user_by_email("same@example.com").user_id == 1
+    
+    def test_get_order(self):
+        """Поверить получение заказа"""
+        db = Database()
+        user = User(1, "Иван", "ivan@example.com")
+        order = Order(7, user, [], 100.00)
+        db.add_order(order)
+        db.add_order(Order(7, user, [], 999.00))
+        
+        assert len(db.orders) == 1
+        assert db.get_order(7) is order
+        assert db.get_order(8) is None
+    
+    def test_get_missing(self):
+        """Проверить поиск отсутствующих записей"""
+        db = Database()
+        assert db.get_user(1) is None
+        assert db.get_product(1) is None
+    
+    def test_indexes_after_pickle(self):
+        """Проверить восстановление индексов после pickle"""
+        db = Database()
+        db.add_user(User(1, "Анна", "anna@example.com"))
+        db.add_product(Product(2, "Книга", 250.00, 5))
+        
+        loaded = pickle.loads(pickle.dumps(db))
+        
+        assert loaded.get_user(1) == db.users[0]
+        assert loaded.get_user_by_email("anna@example.com") is loaded.users[0]
+        assert loaded.get_product(2) is loaded.products[0]
+    
+    def test_rebuild_indexes(self):
+        """Проверить перестроение индексов после прямой правки списка"""
+        db = Database()
+        db.users.append(User(3, "Олег", "oleg@example.com"))
+        assert db.get_user(3) is None
+        
+        db.rebuild_indexes()
+        
+        assert db.get_user(3) is db.users[0]
+    
+    def test_add_users_bulk(self):
+        """Проверить пакетное добавление пользователей из генератора"""
+        db = Database()
+        db.add_user(User(1, "Анна", "anna@example.com"))
+        
+        result = db.add_users(
+            User(i, f"User{i}", f"user{i}@example.com") for i in range(2, 102)
+        )
+        
+        assert result == IngestResult(inserted=100, skipped=0, conflicts=0)
+        assert len(db.users) == 101
+        assert db.get_user(50).name == "User50"
+    
+    def test_add_users_bulk_duplicates(self):
+        """Проверить подсчёт дубликатов и конфликтов"""
+        db = Database()
+        db.add_user(User(1, "Анна", "anna@example.com"))
+        
+        result = db.add_users(iter([
+            User(1, "Анна", "anna@example.com"),    # точный дубликат
+            User(1, "Не Анна", "x@example.com"),    # тот же ID, другие данные
+            User(2, "Борис", "anna@example.com"),   # занятый email
+            User(3, "Вера", "vera@example.com"),
+            User(3, "Вера", "vera@example.com"),    # дубликат внутри пакета
+        ]))
+        
+        assert result.inserted == 1
+        assert result.skipped == 2
+        assert result.conflicts == 2
+        assert [u.user_id for u in db.users] == [1, 3]
+    
+    def test_add_products_and_orders_bulk(self):
+        """Проверить пакетное добавление продуктов и заказов"""
+        db = Database()
+        products = [Product(i, f"P{i}", 10.0 * i, i) for i in range(1, 6)]
+        user = User(1, "Анна", "anna@example.com")
+        
+        assert db.add_products(products) == (5, 0, 0)
+        assert db.add_products([Product(1, "P1", 10.0, 99), Product(2, "Другой", 1.0, 1)]) == (0, 1, 1)
+        assert db.add_orders(Order(i, user, products[:i], 1.0) for i in range(3)) == (3, 0, 0)
+        assert db.get_order(2).products == products[:2]
+
+
+class _LegacyRecord:
+    """Запись старого формата: состояние в ``__dict__`` и datetime"""
+    
+    def __init__(self, cls, state):
+        self._cls = cls
+        self._state = state
+    
+    def __reduce__(self):
+        return copyreg._reconstructor, (self._cls, object, None), self._state
+
+
+class _DictUser:
+    """Пользователь с ``__dict__`` и datetime, как до перехода на слоты"""
+    
+    def __init__(self, user_id, name, email):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.created_at = datetime.now()
+
+
+def _bytes_per_record(factory, count=20000):
+    """Измерить память на одну запись через tracemalloc"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        records = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # Список ссылок тоже учтён, но он одинаков для обоих вариантов
+    assert len(records) == count
+    return (after - before) / count
+
+
+class TestCompactModels:
+    """Тесты для компактного представления моделей"""
+    
+    def test_no_instance_dict(self):
+        """Проверить отсутствие __dict__ у экземпляров"""
+        user = User(1, "Анна", "anna@example.com")
+        order = Order(1, user, [Product(1, "Книга", 250.00, 5)], 250.00)
+        for obj in (user, order, order.products[0]):
+            assert not hasattr(obj, "__dict__")
+    
+    def test_created_at(self):
+        """Проверить хранение created_at"""
+        user = User(1, "Анна", "anna@example.com")
+        assert isinstance(user.created_at, datetime)
+        assert abs((datetime.now() - user.created_at).total_seconds()) < 5
+        
+        moment = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        user.created_at = moment
+        assert user.created_at == moment
+    
+    def test_pickle_roundtrip(self):
+        """Проверить pickle round-trip слотовых объектов"""
+        user = User(1, "Анна", "anna@example.com")
+        order = Order(2, user, [Product(3, "Книга", 250.00, 5)], 250.00)
+        order.complete()
+        
+        loaded = pickle.loads(pickle.dumps(order))
+        
+        assert loaded == order
+        assert loaded.status == "completed"
+        assert loaded.created_at == order.created_at
+        assert loaded.products == order.products
+        assert loaded.user.email == "anna@example.com"
+    
+    def test_load_legacy_pickle(self):
+        """Проверить загрузку pickle старого формата с __dict__"""
+        moment = datetime(2023, 1, 2, 3, 4, 5, 678901)
+        legacy = _LegacyRecord(User, {
+            "user_id": 1, "name": "Анна",
+            "email": "anna@example.com", "created_at": moment,
+        })
+        
+        user = pickle.loads(pickle.dumps(legacy))
+        
+        assert isinstance(user, User)
+        assert user == User(1, "Анна", "anna@example.com")
+        assert user.created_at == moment
+    
+    def test_memory_per_record(self):
+        """Измерить память на запись User и сравнить со старой моделью"""
+        # Строки общие, чтобы измерялась только сама запись
+        name, email = "Пользователь", "user@example.com"
+        slotted = _bytes_per_record(lambda i: User(i, name, email))
+        legacy = _bytes_per_record(lambda i: _DictUser(i, name, email))
+        print(f"\nUser: {slotted:.0f} байт/запись (было {legacy:.0f})")
+        
+        assert slotted < legacy * 0.85
+
+
+class _SlotStatePickler(pickle.Pickler):
+    """Pickler, сохраняющий модели стандартным состоянием слотов (как до __reduce__)"""
+    
+    def reducer_override(self, obj):
+        if isinstance(obj, (User, Product, Order)):
+            state = {slot: getattr(obj, slot) for slot in type(obj).__slots__
+                     if slot != '_owner' and hasattr(obj, slot)}
+            return copyreg.__newobj__, (type(obj),), (None, state)
+        return NotImplemented
+
+
+class TestCompactPickleState:
+    """Тесты компактного pickle-состояния моделей"""
+    
+    def test_state_is_positional(self):
+        """Состояние - кортеж с версией и целым временем, без имён атрибутов"""
+        user = User(1, "Анна", "anna@example.com")
+        restore, args = user.__reduce__()
+        
+        assert args == (PICKLE_STATE_VERSION, 1, "Анна", "anna@example.com", user._created_us)
+        assert b"user_id" not in pickle.dumps(user)
+        assert restore(*args).created_at == user.created_at
+    
+    def test_shared_references_preserved(self):
+        """Заказы ссылаются на те же объекты пользователя и продуктов"""
+        user = User(1, "Анна", "anna@example.com")
+        product = Product(1, "Книга", 250.00, 5)
+        orders = [Order(i, user, [product], 250.00) for i in range(3)]
+        
+        loaded = pickle.loads(pickle.dumps(orders))
+        assert loaded[0].user is loaded[2].user
+        assert loaded[1].products[0] is loaded[2].products[0]
+        assert loaded[0].products[0].stock == 5
+    
+    def test_slot_state_pickle_still_loads(self):
+        """Pickle со стандартным состоянием слотов загружается"""
+        user = User(1, "Анна", "anna@example.com")
+        order = Order(1, user, [Product(1, "Книга", 250.00, 5)], 250.00)
+        buffer = io.BytesIO()
+        _SlotStatePickler(buffer, pickle.HIGHEST_PROTOCOL).dump(order)
+        
+        loaded = pickle.loads(buffer.getvalue())
+        assert loaded == order
+        assert loaded.created_at == order.created_at
+    
+    def test_newer_version_rejected(self):
+        """Состояние более новой версии не загружается молча"""
+        with pytest.raises(pickle.UnpicklingError):
+            _restore_user(PICKLE_STATE_VERSION + 1, 1, "Анна", "anna@example.com", 0)
+    
+    def test_size_reduction(self):
+        """Компактное состояние заметно меньше стандартного"""
+        db = Database()
+        db.add_users(User(i, f"User {i}", f"user{i}@example.com") for i in range(2000))
+        db.add_products(Product(i, f"Product {i}", 1.5 * i, i) for i in range(2000))
+        db.add_orders(Order(i, db.users[i], [db.products[i]], 1.5 * i) for i in range(2000))
+        
+        compact = len(pickle.dumps(db, pickle.HIGHEST_PROTOCOL))
+        buffer = io.BytesIO()
+        _SlotStatePickler(buffer, pickle.HIGHEST_PROTOCOL).dump(db)
+        default = len(buffer.getvalue())
+        print(f"\nDatabase: {compact} байт (стандартное состояние - {default})")
+        
+        assert compact < default * 0.8
+
+
+class TestChangeTracking:
+    """Тесты отслеживания изменений Database"""
+    
+    def test_new_records_tracked(self):
+        """Добавленные записи попадают в new"""
+        db = Database()
+        user = User(1, "Иван", "ivan@example.com")
+        db.add_user(user)
+        db.add_products([Product(1, "Ноутбук", 999.99, 5)])
+        
+        changes = db.changes()
+        assert changes.new['users'] == [user]
+        assert len(changes.new['products']) == 1
+        assert changes.size == 2
+    
+    def test_order_status_marks_dirty(self):
+        """complete()/cancel() отмечают заказ изменённым"""
+        db = Database()
+        user = User(1, "Иван", "ivan@example.com")
+        order = Order(1, user, [], 0)
+        db.add_user(user)
+        db.add_order(order)
+        db.clear_changes()
+        assert not db.has_changes
+        
+        order.complete()
+        assert db.changes().dirty['orders'] == [order]
+        assert db.changes().new['orders'] == []
+    
+    def test_owner_not_pickled(self):
+        """Ссылка заказа на базу не сериализуется и восстанавливается при загрузке базы"""
+        db = Database()
+        user = User(1, "Иван", "ivan@example.com")
+        db.add_user(user)
+        db.add_order(Order(1, user, [], 0))
+        
+        order = pickle.loads(pickle.dumps(db.get_order(1)))
+        assert getattr(order, '_owner', None) is None
+        order.cancel()
+        
+        loaded = pickle.loads(pickle.dumps(db))
+        assert not loaded.has_changes
+        loaded.get_order(1).cancel()
+        assert loaded.changes().dirty['orders'][0].order_id == 1
+    
+    def test_mark_dirty_rejects_unknown(self):
+        """mark_dirty принимает только записи моделей"""
+        with pytest.raises(TypeError):
+            Database().mark_dirty("запись")
 
 
 if __name__ == "__main__":
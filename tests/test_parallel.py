@@ -0,0 +1,170 @@
+"""
+Тесты для параллельного сохранения и загрузки
+"""
+import json
+import pickle
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+from models import Order, User
+from parallel import save_parallel, load_parallel, read_manifest, MANIFEST_NAME
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_parallel"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+def assert_same_database(loaded, db):
+    """Сравнить содержимое двух баз"""
+    assert [(u.user_id, u.email, u._created_us) for u in loaded.users] == \
+        [(u.user_id, u.email, u._created_us) for u in db.users]
+    assert [(p.product_id, p.price, p.stock) for p in loaded.products] == \
+        [(p.product_id, p.price, p.stock) for p in db.products]
+    assert [(o.order_id, o.user.user_id, [p.product_id for p in o.products], o.status)
+            for o in loaded.orders] == \
+        [(o.order_id, o.user.user_id, [p.product_id for p in o.products], o.status)
+         for o in db.orders]
+
+
+class TestParallel:
+    """Тесты save_parallel / load_parallel"""
+    
+    def test_round_trip_with_pool(self, test_directory):
+        """Тест сохранения и загрузки несколькими процессами"""
+        db = generate_database(250)
+        manifest = save_parallel(db, test_directory, chunk_size=100, workers=2)
+        
+        assert [part['count'] for part in manifest['parts']] == [100, 100, 50] * 3
+        loaded = load_parallel(test_directory, workers=2)
+        assert_same_database(loaded, db)
+    
+    def test_round_trip_inline_compressed(self, test_directory):
+        """Тест без пула и со сжатием частей"""
+        db = generate_database(120)
+        save_parallel(db, test_directory, chunk_size=50, workers=1, compression='zlib')
+        
+        assert read_manifest(test_directory)['compression'] == 'zlib'
+        assert_same_database(load_parallel(test_directory, workers=1), db)
+    
+    def test_orders_relinked(self, test_directory):
+        """Заказы ссылаются на загруженных пользователей и продукты"""
+        save_parallel(generate_database(50), test_directory, chunk_size=20, workers=2)
+        loaded = load_parallel(test_directory, workers=2)
+        
+        for order in loaded.orders:
+            assert order.user is loaded.get_user(order.user.user_id)
+            for product in order.products:
+                assert product is loaded.get_product(product.product_id)
+        assert loaded.get_user_by_email("user7@example.com").user_id == 7
+    
+    def test_order_parts_store_ids(self, test_directory):
+        """Части заказов ссылаются на пользователей и продукты по ID"""
+        db = generate_database(30)
+        foreign = User(999, "Гость", "guest@example.com")
+        db.add_order(Order(1000, foreign, [db.get_product(1)], 10.0))
+        save_parallel(db, test_directory, chunk_size=100, workers=1)
+        
+        part = [p for p in read_manifest(test_directory)['parts'] if p['kind'] == 'orders'][0]
+        with open(os.path.join(test_directory, part['file']), 'rb') as f:
+            rows = pickle.load(f)
+        assert all(isinstance(row[1], int) for row in rows[:30])
+        assert rows[30][1] == foreign and rows[30][2] == [1]
+        
+        loaded = load_parallel(test_directory, workers=1)
+        assert_same_database(loaded, db)
+        assert loaded.get_order(1000).user.email == "guest@example.com"
+    
+    def test_reads_version_1_parts(self, test_directory):
+        """Части версии 1 с заказами целиком загружаются и связываются"""
+        db = generate_database(20)
+        save_parallel(db, test_directory, chunk_size=100, workers=1)
+        manifest = read_manifest(test_directory)
+        manifest['version'] = 1
+        for part in manifest['parts']:
+            if part['kind'] == 'orders':
+                with open(os.path.join(test_directory, part['file']), 'wb') as f:
+                    pickle.dump(db.orders, f)
+        with open(os.path.join(test_directory, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        
+        loaded = load_parallel(test_directory, workers=1)
+        assert_same_database(loaded, db)
+        assert loaded.get_order(3).user is loaded.get_user(loaded.get_order(3).user.user_id)
+    
+    def test_stale_parts_removed(self, test_directory):
+        """Части предыдущего, более крупного сохранения удаляются"""
+        save_parallel(generate_database(100), test_directory, chunk_size=10, workers=1)
+        save_parallel(generate_database(30), test_directory, chunk_size=10, workers=1)
+        
+        files = sorted(os.listdir(test_directory))
+        assert files == sorted([MANIFEST_NAME] + [f"{kind}-part-g00002-{i:05d}.pkl"
+                                                  for kind in ('users', 'products', 'orders')
+                                                  for i in range(3)])
+        assert len(load_parallel(test_directory, workers=1).users) == 30
+    
+    def test_crash_mid_save_keeps_previous_version(self, test_directory, monkeypatch):
+        """Сбой до подмены манифеста не портит предыдущее сохранение"""
+        import parallel
+        save_parallel(generate_database(40), test_directory, chunk_size=10, workers=1)
+        
+        def crash(path):
+            raise OSError("сбой при сбросе на диск")
+        
+        monkeypatch.setattr(parallel, "_fsync_file", crash)
+        with pytest.raises(OSError):
+            save_parallel(generate_database(60), test_directory, chunk_size=10, workers=1)
+        monkeypatch.undo()
+        
+        assert read_manifest(test_directory)['generation'] == 1
+        assert_same_database(load_parallel(test_directory, workers=1), generate_database(40))
+        
+        save_parallel(generate_database(60), test_directory, chunk_size=10, workers=1)
+        assert len(load_parallel(test_directory, workers=1).users) == 60
+        assert not any(name.startswith("users-part-g00001") for name in os.listdir(test_directory))
+    
+    def test_other_files_kept(self, test_directory):
+        """Файлы, не являющиеся частями (шарды и т.п.), не удаляются"""
+        for name in ("users-0003.pkl", "orders-backup.pkl"):
+            with open(os.path.join(test_directory, name), 'wb') as f:
+                f.write(b"data")
+        save_parallel(generate_database(20), test_directory, chunk_size=10, workers=1)
+        save_parallel(generate_database(20), test_directory, chunk_size=10, workers=1)
+        
+        files = os.listdir(test_directory)
+        assert "users-0003.pkl" in files and "orders-backup.pkl" in files
+        assert not any("-g00001-" in name for name in files)
+    
+    def test_empty_database(self, test_directory):
+        """Тест пустой базы"""
+        save_parallel(generate_database(0), test_directory)
+        loaded = load_parallel(test_directory)
+        assert loaded.users == [] and loaded.orders == []
+    
+    def test_missing_manifest(self, test_directory):
+        """Тест загрузки без манифеста"""
+        with pytest.raises(FileNotFoundError):
+            load_parallel(test_directory)
+    
+    def test_truncated_part_detected(self, test_directory):
+        """Часть с другим числом записей отвергается"""
+        save_parallel(generate_database(20), test_directory, chunk_size=10, workers=1)
+        path = os.path.join(test_directory, read_manifest(test_directory)['parts'][1]['file'])
+        with open(path, 'wb') as f:
+            pickle.dump([], f)
+        
+        with pytest.raises(pickle.UnpicklingError):
+            load_parallel(test_directory, workers=1)
@@ -0,0 +1,118 @@
+"""
+Тесты для запросов к Database
+"""
+import pytest
+import sys
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+from query import Query, ACCESS_INDEX, ACCESS_SCAN
+
+
+@pytest.fixture(scope="module")
+def db():
+    """База из 200 записей каждого вида"""
+    return generate_database(200)
+
+
+class TestQueryPlan:
+    """Тесты выбора индекса и explain()"""
+    
+    def test_primary_key_uses_index(self, db):
+        """Условие == по первичному ключу выполняется через индекс"""
+        query = Query(db, 'orders').where('status', '==', 'pending').where('order_id', '==', 5)
+        plan = query.plan()
+        
+        assert plan.access == ACCESS_INDEX
+        assert plan.index == 'order_id'
+        assert [str(p) for p in plan.filters] == ["status == 'pending'"]
+        assert query.explain().startswith("IndexLookup orders.order_id keys=1")
+    
+    def test_email_and_in_use_index(self, db):
+        """email пользователя и 'in' по ключу тоже используют индекс"""
+        assert Query(db, 'users').where('email', '==', 'user3@example.com').plan().index == 'email'
+        plan = Query(db, 'products').where('product_id', 'in', [1, 2, 2, 500]).plan()
+        assert plan.access == ACCESS_INDEX
+        assert plan.keys == (1, 2, 500)
+    
+    def test_other_fields_scan(self, db):
+        """Без условия по индексируемому полю выполняется обход"""
+        query = Query(db, 'orders').where('user.user_id', '==', 1).group_by('status')
+        assert query.plan().access == ACCESS_SCAN
+        explain = query.explain()
+        assert explain.startswith("Scan orders (200 records)")
+        assert "Filter user.user_id == 1" in explain
+        assert "GroupBy status" in explain
+    
+    def test_invalid_arguments(self, db):
+        """Неизвестные коллекция, оператор и агрегат отклоняются"""
+        with pytest.raises(ValueError):
+            Query(db, 'carts')
+        with pytest.raises(ValueError):
+            Query(db, 'users').where('name', '~', 'x')
+        with pytest.raises(ValueError):
+            Query(db, 'users').aggregate(x=('median', 'user_id'))
+        with pytest.raises(ValueError):
+            Query(db, 'users').aggregate(x=('sum', None))
+
+
+class TestQueryExecution:
+    """Тесты выполнения запросов"""
+    
+    def test_index_and_scan_agree(self, db):
+        """Результат через индекс совпадает с результатом обхода"""
+        by_index = Query(db, 'orders').where('order_id', 'in', range(10, 20)).where('total', '>', 500).all()
+        by_scan = Query(db, 'orders').where(lambda o: 10 <= o.order_id < 20).where('total', '>', 500).all()
+        assert by_index == by_scan
+        assert Query(db, 'orders').where('order_id', '==', 1000).all() == []
+    
+    def test_filter_and_select(self, db):
+        """Фильтр по порогу и проекция полей"""
+        low_stock = Query(db, 'products').where('stock', '<', 50)
+        expected = [(p.product_id, p.stock) for p in db.products if p.stock < 50]
+        
+        assert low_stock.select('product_id', 'stock') == expected
+        assert low_stock.count() == len(expected)
+        assert low_stock.first() is db.get_product(expected[0][0])
+    
+    def test_builders_do_not_mutate(self, db):
+        """where возвращает новый запрос"""
+        base = Query(db, 'users')
+        filtered = base.where('user_id', '<', 10)
+        assert base.count() == 200
+        assert filtered.count() == 10
+    
+    def test_group_by_aggregate(self, db):
+        """Выручка по пользователям и число заказов по статусам"""
+        revenue = (Query(db, 'orders')
+                   .where('status', '==', 'completed')
+                   .group_by('user.user_id')
+                   .aggregate(revenue=('sum', 'total'), orders=('count', None)))
+        expected = {}
+        for order in db.orders:
+            if order.status == 'completed':
+                expected[order.user.user_id] = expected.get(order.user.user_id, 0) + order.total
+        assert {row['user.user_id']: row['revenue'] for row in revenue} == expected
+        
+        by_status = Query(db, 'orders').group_by('status').aggregate(n=('count', None))
+        assert sum(row['n'] for row in by_status) == 200
+    
+    def test_aggregate_without_groups(self, db):
+        """Агрегаты по всем записям"""
+        totals = [order.total for order in db.orders]
+        result = Query(db, 'orders').aggregate(n=('count', None), total=('sum', 'total'),
+                                               low=('min', 'total'), avg=('avg', 'total'))
+        assert result == {'n': 200, 'total': sum(totals), 'low': min(totals),
+                          'avg': sum(totals) / 200}
+        empty = Query(db, 'orders').where('order_id', '==', -1).aggregate(avg=('avg', 'total'))
+        assert empty == {'avg': None}
+    
+    def test_top(self, db):
+        """top-k по наибольшему и наименьшему значению"""
+        prices = sorted(p.price for p in db.products)
+        assert [p.price for p in Query(db, 'products').top(3, 'price')] == prices[::-1][:3]
+        assert [p.price for p in Query(db, 'products').top(3, 'price', largest=False)] == prices[:3]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,8 +6,9 @@ import sys
 import os
 sys.path.insert(0, '..')
 
-from serialization import PickleSerializer, JSONSerializer
+from serialization import PickleSerializer, JSONSerializer, configure_object_cache, object_cache
 from models import User, Product, Database
+import pickle
 from pathlib import Path
 
 # Тестовая директория
@@ -80,6 +81,25 @@ class TestPickleSerializer:
         
         assert loaded_user == original_user
         assert loaded_user.name == "ByteTest"
+    
+    def test_deserialize_from_memoryview(self):
+        """Проверить десериализацию из memoryview без копирования"""
+        original_user = User(5, "ViewTest", "view@example.com")
+        data = bytearray(PickleSerializer.serialize_to_bytes(original_user))
+        
+        loaded_user = PickleSerializer.deserialize_from_bytes(memoryview(data))
+        
+        assert loaded_user == original_user
+    
+    def test_deserialize_mmap(self, test_directory):
+        """Проверить десериализацию из отображённого в память файла"""
+        db = Database()
+        db.add_user(User(1, "Jude", "jude@example.com"))
+        PickleSerializer.serialize(db, "mapped_db.pkl", test_directory)
+        
+        loaded_db = PickleSerializer.deserialize_mmap("mapped_db.pkl", test_directory)
+        
+        assert loaded_db.get_user(1).name == "Jude"
 
 
 class TestJSONSerializer:
@@ -144,5 +164,186 @@ class TestJSONSerializer:
         assert loaded["departments"][0]["name"] == "IT"
 
 
+class TestPickleStream:
+    """Тесты для потокового pickle-формата"""
+    
+    def test_roundtrip_records(self, test_directory):
+        """Проверить запись и чтение по одному объекту в кадре"""
+        users = [User(i, f"User{i}", f"user{i}@example.com") for i in range(10)]
+        
+        count = PickleSerializer.serialize_iter(iter(users), "users.pkls", test_directory)
+        loaded = list(PickleSerializer.deserialize_iter("users.pkls", test_directory))
+        
+        assert count == 10
+        assert loaded == users
+    
+    def test_roundtrip_batches(self, test_directory):
+        """Проверить запись пачками из генератора"""
+        count = PickleSerializer.serialize_iter(
+            (Product(i, f"P{i}", float(i), i) for i in range(25)),
+            "products.pkls", test_directory, batch_size=10)
+        
+        loaded = PickleSerializer.deserialize_iter("products.pkls", test_directory)
+        
+        assert count == 25
+        assert [p.product_id for p in loaded] == list(range(25))
+    
+    def test_lazy_reading(self, test_directory):
+        """Проверить, что чтение ленивое"""
+        PickleSerializer.serialize_iter(range(1000), "numbers.pkls", test_directory)
+        
+        reader = PickleSerializer.deserialize_iter("numbers.pkls", test_directory)
+        
+        assert next(reader) == 0
+        assert next(reader) == 1
+        reader.close()
+    
+    def test_append(self, test_directory):
+        """Проверить дозапись кадров в существующий файл"""
+        PickleSerializer.serialize_iter([1, 2], "append.pkls", test_directory)
+        PickleSerializer.serialize_iter([3, 4], "append.pkls", test_directory, batch_size=2, append=True)
+        
+        assert list(PickleSerializer.deserialize_iter("append.pkls", test_directory)) == [1, 2, 3, 4]
+    
+    def test_truncated_stream(self, test_directory):
+        """Проверить ошибку на обрезанном кадре"""
+        PickleSerializer.serialize_iter(["a" * 100], "cut.pkls", test_directory)
+        path = os.path.join(test_directory, "cut.pkls")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 10)
+        
+        with pytest.raises(pickle.UnpicklingError):
+            list(PickleSerializer.deserialize_iter("cut.pkls", test_directory))
+    
+    def test_not_a_stream(self, test_directory):
+        """Проверить отказ читать обычный pickle-файл"""
+        PickleSerializer.serialize([1, 2, 3], "plain.pkl", test_directory)
+        
+        with pytest.raises(pickle.UnpicklingError):
+            list(PickleSerializer.deserialize_iter("plain.pkl", test_directory))
+
+
+class TestJSONLines:
+    """Тесты для режима JSON Lines"""
+    
+    def test_roundtrip(self, test_directory):
+        """Проверить запись и чтение JSON Lines"""
+        rows = [{"id": i, "name": f"Товар {i}"} for i in range(5)]
+        
+        count = JSONSerializer.serialize_lines(iter(rows), "rows.jsonl", test_directory)
+        loaded = list(JSONSerializer.deserialize_lines("rows.jsonl", test_directory))
+        
+        assert count == 5
+        assert loaded == rows
+    
+    def test_one_compact_object_per_line(self, test_directory):
+        """Проверить компактный построчный вывод"""
+        JSONSerializer.serialize_lines([{"a": 1, "b": [1, 2]}, {"c": "Мир"}], "compact.jsonl", test_directory)
+        
+        with open(os.path.join(test_directory, "compact.jsonl"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        
+        assert lines == ['{"a":1,"b":[1,2]}', '{"c":"Мир"}']
+    
+    def test_append(self, test_directory):
+        """Проверить дозапись строк"""
+        JSONSerializer.serialize_lines([1, 2], "append.jsonl", test_directory)
+        JSONSerializer.serialize_lines([3], "append.jsonl", test_directory, append=True)
+        
+        assert list(JSONSerializer.deserialize_lines("append.jsonl", test_directory)) == [1, 2, 3]
+    
+    def test_smaller_than_indented(self, test_directory):
+        """Проверить, что JSON Lines компактнее документа с отступами"""
+        rows = [{"id": i, "name": f"Item{i}", "tags": ["a", "b"]} for i in range(200)]
+        JSONSerializer.serialize(rows, "rows.json", test_directory)
+        JSONSerializer.serialize_lines(rows, "rows.jsonl", test_directory)
+        
+        indented = os.path.getsize(os.path.join(test_directory, "rows.json"))
+        lines = os.path.getsize(os.path.join(test_directory, "rows.jsonl"))
+        
+        assert lines < indented * 0.6
+
+
+@pytest.fixture
+def object_cache_budget():
+    """Отдельный кэш deserialize_cached на время теста"""
+    cache = configure_object_cache(1024 * 1024)
+    yield cache
+    configure_object_cache(0)
+
+
+class TestDeserializeCached:
+    """Тесты deserialize_cached"""
+    
+    def test_shared_returns_same_object(self, test_directory, object_cache_budget):
+        """В режиме shared повторные вызовы отдают тот же объект"""
+        db = Database()
+        db.add_user(User(1, "Иван", "ivan@example.com"))
+        PickleSerializer.serialize(db, "db.pkl", test_directory, compression='zlib')
+        
+        first = PickleSerializer.deserialize_cached("db.pkl", test_directory)
+        assert PickleSerializer.deserialize_cached("db.pkl", test_directory) is first
+        assert first.get_user(1).name == "Иван"
+        assert object_cache_budget.stats().hits == 1
+    
+    def test_copy_returns_fresh_objects(self, test_directory, object_cache_budget):
+        """В режиме copy каждый вызов получает независимый объект"""
+        JSONSerializer.serialize({"items": [1, 2]}, "data.json", test_directory)
+        
+        first = JSONSerializer.deserialize_cached("data.json", test_directory, mode='copy')
+        first["items"].append(3)
+        second = JSONSerializer.deserialize_cached("data.json", test_directory, mode='copy')
+        assert second == {"items": [1, 2]}
+        assert object_cache_budget.stats().hits == 1
+    
+    def test_rewrite_invalidates(self, test_directory, object_cache_budget):
+        """Перезапись файла сериализатором или в обход него сбрасывает кэш"""
+        PickleSerializer.serialize([1], "list.pkl", test_directory)
+        assert PickleSerializer.deserialize_cached("list.pkl", test_directory) == [1]
+        PickleSerializer.serialize([2], "list.pkl", test_directory)
+        assert PickleSerializer.deserialize_cached("list.pkl", test_directory) == [2]
+        
+        with open(os.path.join(test_directory, "list.pkl"), 'wb') as f:
+            pickle.dump([3, 3], f)
+        assert PickleSerializer.deserialize_cached("list.pkl", test_directory) == [3, 3]
+    
+    def test_size_aware_eviction(self, test_directory):
+        """Файлы сверх бюджета вытесняют старые записи"""
+        cache = configure_object_cache(3000)
+        try:
+            for i in range(3):
+                PickleSerializer.serialize(bytes(1200), f"{i}.pkl", test_directory)
+                PickleSerializer.deserialize_cached(f"{i}.pkl", test_directory)
+            assert cache.stats().entries == 2
+            assert cache.stats().evictions == 1
+        finally:
+            configure_object_cache(0)
+    
+    def test_disabled_by_default(self, test_directory):
+        """С нулевым бюджетом каждый вызов читает файл заново"""
+        cache = configure_object_cache(0)
+        PickleSerializer.serialize([1, 2], "list.pkl", test_directory)
+        first = PickleSerializer.deserialize_cached("list.pkl", test_directory)
+        assert PickleSerializer.deserialize_cached("list.pkl", test_directory) is not first
+        assert cache.stats().entries == 0
+    
+    def test_compressed_entry_weighed_by_payload(self, test_directory, object_cache_budget):
+        """Сжатый файл учитывается в бюджете по распакованному размеру"""
+        PickleSerializer.serialize(bytes(500_000), "zeros.pkl", test_directory, compression='zlib')
+        assert os.path.getsize(os.path.join(test_directory, "zeros.pkl")) < 10_000
+        
+        PickleSerializer.deserialize_cached("zeros.pkl", test_directory)
+        assert object_cache_budget.stats().bytes >= 500_000
+    
+    def test_invalid_mode_and_missing_file(self, test_directory, object_cache_budget):
+        """Тест неверного режима и отсутствующего файла"""
+        PickleSerializer.serialize(1, "one.pkl", test_directory)
+        with pytest.raises(ValueError):
+            PickleSerializer.deserialize_cached("one.pkl", test_directory, mode='weak')
+        with pytest.raises(FileNotFoundError):
+            PickleSerializer.deserialize_cached("missing.pkl", test_directory)
+        assert object_cache() is object_cache_budget
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,161 @@
+"""
+Тесты для шардированного хранения Database
+"""
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+from models import User, Product
+from sharding import ShardedDatabase, MANIFEST_NAME
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_shards"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+class TestShardedDatabase:
+    """Тесты ShardedDatabase"""
+    
+    def test_lookup_loads_single_shard(self, test_directory):
+        """Поиск по ID загружает только нужный шард"""
+        ShardedDatabase.from_database(generate_database(200), test_directory, shard_count=8)
+        sharded = ShardedDatabase(test_directory)
+        
+        assert sharded.get_user(13).email == "user13@example.com"
+        assert sharded.loaded_shards('users') == [13 % 8]
+        assert sharded.loaded_shards('products') == []
+        assert sharded.count('users') == 200
+    
+    def test_range_partition_iteration(self, test_directory):
+        """При разбиении по диапазонам обход загружает только пересекающие шарды"""
+        ShardedDatabase.from_database(generate_database(100), test_directory,
+                                      partition='range', range_size=25)
+        sharded = ShardedDatabase(test_directory)
+        
+        ids = [user.user_id for user in sharded.iter_users(30, 55)]
+        assert ids == list(range(30, 55))
+        assert sharded.loaded_shards('users') == [1, 2]
+    
+    def test_manifest_parameters_win(self, test_directory):
+        """Параметры разбиения берутся из существующего манифеста"""
+        ShardedDatabase.from_database(generate_database(10), test_directory, shard_count=3)
+        sharded = ShardedDatabase(test_directory, shard_count=50)
+        assert sharded.shard_count == 3
+        assert os.path.exists(os.path.join(test_directory, MANIFEST_NAME))
+    
+    def test_only_dirty_shards_written(self, test_directory):
+        """save() записывает только изменённые шарды"""
+        ShardedDatabase.from_database(generate_database(40), test_directory, shard_count=4)
+        sharded = ShardedDatabase(test_directory)
+        
+        assert sharded.add_user(User(1000, "Новый", "new@example.com"))
+        sharded.complete_order(5)
+        assert sharded.dirty == [('orders', 1), ('users', 0)]
+        assert sharded.save() == 2
+        assert sharded.save() == 0
+        
+        reopened = ShardedDatabase(test_directory)
+        assert reopened.get_user(1000).name == "Новый"
+        assert reopened.get_order(5).status == "completed"
+        assert reopened.count('users') == 41
+    
+    def test_duplicates_skipped(self, test_directory):
+        """Повторный ID и email в загруженных шардах не добавляются"""
+        sharded = ShardedDatabase(test_directory, shard_count=2)
+        assert sharded.add_user(User(1, "Иван", "ivan@example.com"))
+        assert not sharded.add_user(User(1, "Иван", "other@example.com"))
+        assert not sharded.add_user(User(2, "Иван", "ivan@example.com"))
+        assert sharded.add_product(Product(1, "Ноутбук", 999.99, 5))
+        assert not sharded.add_product(Product(1, "Ноутбук", 999.99, 5))
+    
+    def test_orders_relinked_to_loaded_shards(self, test_directory):
+        """Заказ связывается с пользователем из загруженного шарда"""
+        ShardedDatabase.from_database(generate_database(30), test_directory, shard_count=3)
+        sharded = ShardedDatabase(test_directory)
+        order_user = ShardedDatabase(test_directory).get_order(7).user.user_id
+        
+        user = sharded.get_user(order_user)
+        assert sharded.get_order(7).user is user
+    
+    def test_unload_keeps_dirty(self, test_directory):
+        """unload() не выгружает несохранённые шарды"""
+        ShardedDatabase.from_database(generate_database(20), test_directory, shard_count=2)
+        sharded = ShardedDatabase(test_directory)
+        sharded.get_user(0)
+        sharded.get_user(1)
+        sharded.mark_dirty('users', 1)
+        
+        assert sharded.unload() == 1
+        assert sharded.loaded_shards('users') == [1]
+    
+    def test_to_database(self, test_directory):
+        """Тест сборки обычной базы из шардов"""
+        db = generate_database(50)
+        ShardedDatabase.from_database(db, test_directory, shard_count=4)
+        loaded = ShardedDatabase(test_directory).to_database()
+        
+        assert sorted(u.user_id for u in loaded.users) == list(range(50))
+        assert loaded.get_user_by_email("user3@example.com").user_id == 3
+        order = loaded.get_order(10)
+        assert order.user is loaded.get_user(order.user.user_id)
+        assert order.status == db.get_order(10).status
+    
+    def test_get_user_by_email_and_missing(self, test_directory):
+        """Тест поиска по email и отсутствующих ключей"""
+        ShardedDatabase.from_database(generate_database(10), test_directory, shard_count=2)
+        sharded = ShardedDatabase(test_directory)
+        
+        assert sharded.get_user_by_email("user4@example.com").user_id == 4
+        assert sharded.get_user(999) is None
+        with pytest.raises(KeyError):
+            sharded.cancel_order(999)
+    
+    def test_email_index_follows_shards(self, test_directory):
+        """Словарь email ведётся при загрузке, выгрузке и изменении шардов"""
+        ShardedDatabase.from_database(generate_database(20), test_directory, shard_count=2)
+        sharded = ShardedDatabase(test_directory)
+        sharded.get_user(0)
+        
+        assert not sharded.add_user(User(100, "Дубль", "user2@example.com"))
+        sharded.unload()
+        assert sharded.get_user_by_email("user2@example.com").user_id == 2
+        
+        user = sharded.get_user(2)
+        user.email = "changed@example.com"
+        sharded.mark_dirty('users', 2)
+        assert sharded.get_user_by_email("user2@example.com") is None
+        assert sharded.get_user_by_email("changed@example.com") is user
+        assert sharded.add_user(User(100, "Новый", "user2@example.com"))
+    
+    def test_bulk_add_users(self, test_directory):
+        """Пакетное добавление не сканирует всех загруженных пользователей"""
+        sharded = ShardedDatabase(test_directory, shard_count=4)
+        for i in range(20_000):
+            assert sharded.add_user(User(i, f"User {i}", f"user{i}@example.com"))
+        assert not sharded.add_user(User(20_000, "Дубль", "user19999@example.com"))
+        assert sharded.count('users') == 20_000
+    
+    def test_range_partition_rejects_negative_keys(self, test_directory):
+        """При разбиении по диапазонам отрицательный ключ отвергается"""
+        sharded = ShardedDatabase(test_directory, partition='range', range_size=10)
+        with pytest.raises(ValueError):
+            sharded.add_user(User(-1, "Минус", "minus@example.com"))
+        assert ShardedDatabase(test_directory + "_hash").shard_of(-1) >= 0
+    
+    def test_invalid_partition(self, test_directory):
+        """Тест неизвестного способа разбиения"""
+        with pytest.raises(ValueError):
+            ShardedDatabase(test_directory, partition='list')
@@ -0,0 +1,181 @@
+"""
+Тесты для хранения Database в SQLite
+"""
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from benchmark import generate_database
+from models import User, Product, Order
+from serialization import PickleSerializer
+from sqlite_backend import SQLiteDatabase
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_sqlite"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+@pytest.fixture
+def sqlite_db(test_directory):
+    """SQLite-база из 100 записей каждого вида"""
+    db = generate_database(100)
+    with SQLiteDatabase.from_database(db, "db.sqlite", test_directory) as sqlite_db:
+        yield sqlite_db
+
+
+class TestSQLiteDatabase:
+    """Тесты SQLiteDatabase"""
+    
+    def test_lookups(self, sqlite_db):
+        """Поиск по ID и email возвращает записи с исходными полями"""
+        source = generate_database(100)
+        user = sqlite_db.get_user(42)
+        assert user == source.get_user(42)
+        assert user.email == source.get_user(42).email
+        assert user._created_us == source.get_user(42)._created_us
+        assert sqlite_db.get_user_by_email("user7@example.com").user_id == 7
+        assert sqlite_db.get_product(3).price == source.get_product(3).price
+        assert sqlite_db.get_user(1000) is None
+        assert sqlite_db.get_product(1000) is None
+        assert sqlite_db.get_order(1000) is None
+    
+    def test_get_order_with_lines(self, sqlite_db):
+        """Заказ читается с пользователем и продуктами в исходном порядке"""
+        source = generate_database(100).get_order(5)
+        order = sqlite_db.get_order(5)
+        
+        assert order == source
+        assert order.status == source.status
+        assert order.total == source.total
+        assert [p.product_id for p in order.products] == [p.product_id for p in source.products]
+    
+    def test_add_skips_duplicates(self, sqlite_db):
+        """Занятые ID и email не добавляются"""
+        assert sqlite_db.add_user(User(500, "New", "new@example.com")) is True
+        assert sqlite_db.add_user(User(500, "Dup", "dup@example.com")) is False
+        assert sqlite_db.add_user(User(501, "Dup", "user1@example.com")) is False
+        assert sqlite_db.add_products([Product(0, "P", 1.0, 1), Product(500, "P", 1.0, 1)]) == 1
+        assert sqlite_db.count('users') == 101
+        assert sqlite_db.count('products') == 101
+    
+    def test_add_orders_batch(self, test_directory):
+        """Пакетная вставка заказов со строками и повторяющимися ID"""
+        with SQLiteDatabase("db.sqlite", test_directory) as sqlite_db:
+            user = User(1, "Alice", "alice@example.com")
+            product = Product(1, "Laptop", 999.99, 5)
+            sqlite_db.add_user(user)
+            sqlite_db.add_product(product)
+            orders = [Order(i, user, [product, product], 1999.98) for i in range(5)]
+            
+            inserted = sqlite_db.add_orders(orders + [Order(0, user, [], 0.0)], batch_size=2)
+            
+            assert inserted == 5
+            order = sqlite_db.get_order(0)
+            assert len(order.products) == 2
+            assert order.products[0].name == "Laptop"
+    
+    def test_order_status_persisted(self, sqlite_db):
+        """complete() у заказа из базы сразу сохраняет статус"""
+        order = sqlite_db.get_order(10)
+        order.complete()
+        assert sqlite_db.get_order(10).status == "completed"
+        
+        sqlite_db.cancel_order(11)
+        assert sqlite_db.get_order(11).status == "cancelled"
+        with pytest.raises(KeyError):
+            sqlite_db.complete_order(1000)
+    
+    def test_mark_dirty(self, sqlite_db):
+        """mark_dirty сохраняет изменения пользователя и продукта"""
+        product = sqlite_db.get_product(1)
+        product.stock = 0
+        sqlite_db.mark_dirty(product)
+        assert sqlite_db.get_product(1).stock == 0
+        
+        with pytest.raises(TypeError):
+            sqlite_db.mark_dirty("not a record")
+    
+    def test_iter_orders_range(self, sqlite_db):
+        """Обход заказов по диапазону ID"""
+        orders = list(sqlite_db.iter_orders(10, 20))
+        assert [order.order_id for order in orders] == list(range(10, 20))
+        assert len(list(sqlite_db.iter_users())) == 100
+    
+    def test_orders_by_user_batched(self, test_directory):
+        """Заказы пользователя читаются фиксированным числом запросов"""
+        with SQLiteDatabase("db.sqlite", test_directory) as sqlite_db:
+            user = User(1, "Alice", "alice@example.com")
+            products = [Product(i, f"P{i}", 1.0, 1) for i in range(3)]
+            sqlite_db.add_user(user)
+            sqlite_db.add_products(products)
+            sqlite_db.add_orders(Order(i, user, products[:i % 3 + 1], 1.0) for i in range(50))
+            statements = []
+            sqlite_db._conn.set_trace_callback(statements.append)
+            
+            orders = sqlite_db.orders_by_user(1)
+            
+            assert [order.order_id for order in orders] == list(range(50))
+            assert [len(order.products) for order in orders[:3]] == [1, 2, 3]
+            assert orders[0].user is orders[49].user
+            assert len(statements) == 4
+            assert sqlite_db.orders_by_user(2) == []
+    
+    def test_to_database_roundtrip(self, sqlite_db):
+        """to_database возвращает базу, равную исходной"""
+        source = generate_database(100)
+        db = sqlite_db.to_database()
+        
+        assert db.users == source.users
+        assert db.products == source.products
+        assert db.orders == source.orders
+        assert db.get_order(3).user is db.get_user(db.get_order(3).user.user_id)
+        assert not db.has_changes
+    
+    def test_from_pickle(self, test_directory):
+        """Миграция из pickle-файла одним вызовом"""
+        db = generate_database(50)
+        PickleSerializer.serialize(db, "database.pkl", test_directory)
+        
+        with SQLiteDatabase.from_pickle("database.pkl", test_directory, "database.db") as sqlite_db:
+            assert sqlite_db.count('orders') == 50
+        
+        with SQLiteDatabase("database.db", test_directory) as sqlite_db:
+            assert sqlite_db.get_order(49) == db.get_order(49)
+    
+    def test_from_pickle_rejects_other_objects(self, test_directory):
+        """В pickle-файле должна быть Database"""
+        PickleSerializer.serialize([1, 2, 3], "list.pkl", test_directory)
+        with pytest.raises(TypeError):
+            SQLiteDatabase.from_pickle("list.pkl", test_directory)
+    
+    def test_failed_batch_rolls_back(self, test_directory):
+        """Ошибка посреди пакета откатывает всю транзакцию"""
+        def users():
+            yield User(1, "Alice", "alice@example.com")
+            raise RuntimeError("ошибка источника")
+        
+        with SQLiteDatabase("db.sqlite", test_directory) as sqlite_db:
+            with pytest.raises(RuntimeError):
+                sqlite_db.add_users(users(), batch_size=1)
+            assert sqlite_db.count('users') == 0
+    
+    def test_wal_mode(self, sqlite_db):
+        """База открывается в режиме WAL"""
+        mode = sqlite_db._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,156 @@
+"""
+Тесты для журнала изменений
+"""
+import pytest
+import sys
+import os
+sys.path.insert(0, '..')
+
+from models import User, Product, Order, Database
+from serialization import PickleSerializer
+import wal
+from wal import MutationLog
+from pathlib import Path
+
+# Тестовая директория
+TEST_DIR = "test_wal"
+
+
+@pytest.fixture(scope="function")
+def test_directory():
+    """Убедиться и очистить тестовую директорию"""
+    Path(TEST_DIR).mkdir(exist_ok=True)
+    yield TEST_DIR
+    # Очистить после теста
+    import shutil
+    if os.path.exists(TEST_DIR):
+        shutil.rmtree(TEST_DIR)
+
+
+def _fill(log):
+    """Записать в журнал типичный набор изменений"""
+    user = User(1, "Анна", "anna@example.com")
+    product = Product(1, "Книга", 250.00, 5)
+    log.add_user(user)
+    log.add_product(product)
+    log.add_order(Order(1, user, [product], 250.00))
+    log.add_order(Order(2, user, [product], 250.00))
+    log.complete_order(1)
+    log.cancel_order(2)
+
+
+class TestMutationLog:
+    """Тесты для MutationLog"""
+    
+    def test_replay(self, test_directory):
+        """Проверить восстановление базы из журнала"""
+        with MutationLog(Database(), "db.wal", test_directory) as log:
+            _fill(log)
+        
+        db = Database()
+        count = MutationLog.replay(db, "db.wal", test_directory)
+        
+        assert count == 6
+        assert db.get_user(1).name == "Анна"
+        assert db.get_order(1).status == "completed"
+        assert db.get_order(2).status == "cancelled"
+        # Заказы связаны с объектами восстановленной базы
+        assert db.get_order(1).user is db.get_user(1)
+        assert db.get_order(1).products[0] is db.get_product(1)
+    
+    def test_duplicates_not_logged(self, test_directory):
+        """Проверить, что отклонённые изменения не попадают в журнал"""
+        with MutationLog(Database(), "db.wal", test_directory) as log:
+            log.add_user(User(1, "Анна", "anna@example.com"))
+            log.add_user(User(1, "Анна", "anna@example.com"))
+        
+        assert MutationLog.replay(Database(), "db.wal", test_directory) == 1
+    
+    def test_group_commit(self, test_directory):
+        """Проверить групповую фиксацию"""
+        log = MutationLog(Database(), "db.wal", test_directory, commit_every=3)
+        log.add_product(Product(1, "A", 1.0, 1))
+        log.add_product(Product(2, "B", 1.0, 1))
+        assert log.pending == 2
+        
+        log.add_product(Product(3, "C", 1.0, 1))
+        assert log.pending == 0
+        
+        log.add_product(Product(4, "D", 1.0, 1))
+        log.close()
+        assert MutationLog.replay(Database(), "db.wal", test_directory) == 4
+    
+    def test_unknown_order(self, test_directory):
+        """Проверить ошибку при изменении отсутствующего заказа"""
+        with MutationLog(Database(), "db.wal", test_directory) as log:
+            with pytest.raises(KeyError):
+                log.complete_order(42)
+            assert log.pending == 0
+    
+    def test_truncated_tail(self, test_directory):
+        """Проверить отбрасывание обрезанной последней записи"""
+        with MutationLog(Database(), "db.wal", test_directory) as log:
+            log.add_user(User(1, "Анна", "anna@example.com"))
+            log.add_user(User(2, "Борис", "boris@example.com"))
+        path = os.path.join(test_directory, "db.wal")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 5)
+        
+        db = Database()
+        
+        assert MutationLog.replay(db, "db.wal", test_directory) == 1
+        assert db.get_user(2) is None
+        # После восстановления журнал можно продолжать
+        with MutationLog(db, "db.wal", test_directory) as log:
+            log.add_user(User(3, "Вера", "vera@example.com"))
+        assert MutationLog.replay(Database(), "db.wal", test_directory) == 2
+    
+    def test_torn_header_is_empty_log(self, test_directory):
+        """Журнал, обрезанный внутри заголовка, считается пустым"""
+        with open(os.path.join(test_directory, "db.wal"), "wb") as f:
+            f.write(b"PK")
+        
+        with MutationLog.open("db.pkl", "db.wal", test_directory) as log:
+            assert len(log.db.users) == 0
+            log.add_user(User(1, "Анна", "anna@example.com"))
+        assert MutationLog.replay(Database(), "db.wal", test_directory) == 1
+    
+    def test_replay_opens_read_only(self, test_directory, monkeypatch):
+        """Целый журнал читается без открытия на запись"""
+        with MutationLog(Database(), "db.wal", test_directory) as log:
+            _fill(log)
+        modes = []
+        
+        def spy_open(file, mode='r', *args, **kwargs):
+            modes.append(mode)
+            return open(file, mode, *args, **kwargs)
+        
+        monkeypatch.setattr(wal, 'open', spy_open, raising=False)
+        assert MutationLog.replay(Database(), "db.wal", test_directory) > 0
+        assert modes == ['rb']
+    
+    def test_open_and_compact(self, test_directory):
+        """Проверить сворачивание журнала в снимок"""
+        with MutationLog.open("db.pkl", "db.wal", test_directory) as log:
+            _fill(log)
+            log.compact()
+            log.add_user(User(2, "Борис", "boris@example.com"))
+        
+        assert MutationLog.replay(Database(), "db.wal", test_directory) == 1
+        snapshot = PickleSerializer.deserialize("db.pkl", test_directory)
+        assert snapshot.get_user(2) is None
+        
+        with MutationLog.open("db.pkl", "db.wal", test_directory) as log:
+            db = log.db
+        assert len(db.users) == 2
+        assert db.get_order(1).status == "completed"
+    
+    def test_compact_without_snapshot(self, test_directory):
+        """Проверить ошибку сворачивания без файла снимка"""
+        with MutationLog(Database(), "db.wal", test_directory) as log:
+            with pytest.raises(ValueError):
+                log.compact()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,257 @@
+"""
+Журнал изменений (write-ahead log) для Database
+"""
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from models import Database, Order, Product, User
+from serialization import STREAM_HEADER_SIZE, PickleSerializer
+
+# Операции журнала
+OP_ADD_USER = 'add_user'
+OP_ADD_PRODUCT = 'add_product'
+OP_ADD_ORDER = 'add_order'
+OP_COMPLETE_ORDER = 'complete_order'
+OP_CANCEL_ORDER = 'cancel_order'
+
+
+def apply_mutation(db: Database, record: Tuple[str, Any]) -> None:
+    """Применить одну запись журнала к базе
+    
+    Все операции идемпотентны, поэтому повторное применение журнала к
+    снимку, в который он уже вошёл, ничего не меняет.
+    
+    Args:
+        db: База данных
+        record: Пара (операция, данные)
+    """
+    op, payload = record
+    if op == OP_ADD_USER:
+        db.add_user(payload)
+    elif op == OP_ADD_PRODUCT:
+        db.add_product(payload)
+    elif op == OP_ADD_ORDER:
+        db.add_order(db.relink_order(payload))
+    elif op == OP_COMPLETE_ORDER or op == OP_CANCEL_ORDER:
+        order = db.get_order(payload)
+        if order is None:
+            raise KeyError(f"Заказ {payload} не найден")
+        if op == OP_COMPLETE_ORDER:
+            order.complete()
+        else:
+            order.cancel()
+    else:
+        raise ValueError(f"Неизвестная операция журнала: {op!r}")
+
+
+class MutationLog:
+    """Журнал изменений Database с групповой фиксацией
+    
+    Каждое изменение применяется к базе и дописывается в конец журнала
+    кадром потокового pickle-формата (см. ``PickleSerializer.dump_stream``).
+    Записи сбрасываются на диск (``fsync``) не по одной, а группой: после
+    ``commit_every`` записей, по истечении ``commit_interval`` секунд или
+    при явном ``commit()``. Стоимость сохранения изменения зависит от
+    размера изменения, а не от размера базы.
+    
+    Типичное использование::
+    
+        with MutationLog.open("database.pkl", "database.wal") as log:
+            log.add_user(User(1, "Анна", "anna@example.com"))
+            log.complete_order(10)
+    """
+    
+    def __init__(self, db: Database, filename: str, directory: str = 'data',
+                 commit_every: int = 64, commit_interval: Optional[float] = None):
+        """
+        Args:
+            db: База данных, к которой применяются изменения
+            filename: Название файла журнала
+            directory: Директория
+            commit_every: Размер группы записей между вызовами fsync
+            commit_interval: Максимальное время (сек) между fsync, None - не ограничено
+        """
+        if commit_every < 1:
+            raise ValueError("commit_every должен быть не меньше 1")
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.db = db
+        self.directory = directory
+        self.file_path = Path(directory) / filename
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.snapshot_filename: Optional[str] = None
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._file = self._open_for_append()
+    
+    def _open_for_append(self):
+        """Открыть журнал на дозапись, создав заголовок для нового файла"""
+        f = open(self.file_path, 'ab')
+        if f.tell() == 0:
+            PickleSerializer.write_stream_header(f)
+            f.flush()
+            os.fsync(f.fileno())
+        return f
+    
+    @classmethod
+    def open(cls, snapshot_filename: str, log_filename: str, directory: str = 'data',
+             **kwargs) -> 'MutationLog':
+        """Восстановить базу из снимка и журнала и продолжить журналирование
+        
+        Args:
+            snapshot_filename: Файл снимка (может отсутствовать)
+            log_filename: Файл журнала (может отсутствовать)
+            directory: Директория
+            **kwargs: Параметры группового commit для конструктора
+        
+        Returns:
+            Журнал, привязанный к восстановленной базе
+        """
+        if (Path(directory) / snapshot_filename).exists():
+            db = PickleSerializer.deserialize(snapshot_filename, directory)
+        else:
+            db = Database()
+        MutationLog.replay(db, log_filename, directory)
+        log = cls(db, log_filename, directory, **kwargs)
+        log.snapshot_filename = snapshot_filename
+        return log
+    
+    @staticmethod
+    def replay(db: Database, filename: str, directory: str = 'data') -> int:
+        """Применить журнал к базе
+        
+        Обрезанная последняя запись (сбой во время записи) считается
+        незафиксированной: она отбрасывается, а файл укорачивается до
+        последней целой записи. Файл короче заголовка (сбой до fsync
+        заголовка нового журнала) считается пустым журналом. Файл
+        открывается только на чтение и переоткрывается лишь для обрезки.
+        
+        Args:
+            db: База данных
+            filename: Название файла журнала
+            directory: Директория
+        
+        Returns:
+            Количество применённых записей
+        """
+        file_path = Path(directory) / filename
+        if not file_path.exists():
+            return 0
+        size = file_path.stat().st_size
+        if size < STREAM_HEADER_SIZE:
+            if size:
+                os.truncate(file_path, 0)
+            return 0
+        count = 0
+        torn = False
+        with open(file_path, 'rb') as f:
+            PickleSerializer.read_stream_header(f)
+            good = f.tell()
+            try:
+                for record in PickleSerializer.load_stream(f):
+                    apply_mutation(db, record)
+                    good = f.tell()
+                    count += 1
+            except (pickle.UnpicklingError, EOFError):
+                torn = True
+        if torn:
+            os.truncate(file_path, good)
+        return count
+    
+    def _append(self, op: str, payload: Any) -> None:
+        """Дописать запись и при необходимости зафиксировать группу"""
+        PickleSerializer.dump_stream(((op, payload),), self._file)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+        elif (self.commit_interval is not None
+              and time.monotonic() - self._last_commit >= self.commit_interval):
+            self.commit()
+    
+    def add_user(self, user: User) -> None:
+        """Добавить пользователя и записать изменение в журнал"""
+        self.db.add_user(user)
+        if self.db.get_user(user.user_id) is user:
+            self._append(OP_ADD_USER, user)
+    
+    def add_product(self, product: Product) -> None:
+        """Добавить продукт и записать изменение в журнал"""
+        self.db.add_product(product)
+        if self.db.get_product(product.product_id) is product:
+            self._append(OP_ADD_PRODUCT, product)
+    
+    def add_order(self, order: Order) -> None:
+        """Добавить заказ и записать изменение в журнал"""
+        self.db.add_order(order)
+        if self.db.get_order(order.order_id) is order:
+            self._append(OP_ADD_ORDER, order)
+    
+    def complete_order(self, order_id: int) -> None:
+        """Завершить заказ и записать изменение в журнал"""
+        apply_mutation(self.db, (OP_COMPLETE_ORDER, order_id))
+        self._append(OP_COMPLETE_ORDER, order_id)
+    
+    def cancel_order(self, order_id: int) -> None:
+        """Отменить заказ и записать изменение в журнал"""
+        apply_mutation(self.db, (OP_CANCEL_ORDER, order_id))
+        self._append(OP_CANCEL_ORDER, order_id)
+    
+    @property
+    def pending(self) -> int:
+        """Количество записей, ещё не сброшенных на диск"""
+        return self._pending
+    
+    def commit(self) -> None:
+        """Сбросить накопленные записи на диск одним fsync"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_commit = time.monotonic()
+    
+    def compact(self, snapshot_filename: Optional[str] = None) -> None:
+        """Свернуть журнал в снимок базы
+        
+        Снимок сначала пишется во временный файл и атомарно подменяет
+        старый, после чего журнал очищается. Сбой между этими шагами не
+        теряет данных: журнал просто применится к новому снимку повторно.
+        
+        Args:
+            snapshot_filename: Файл снимка (по умолчанию тот, из которого
+                журнал был открыт через ``MutationLog.open``)
+        """
+        snapshot_filename = snapshot_filename or self.snapshot_filename
+        if snapshot_filename is None:
+            raise ValueError("Не задан файл снимка")
+        self.commit()
+        tmp_name = snapshot_filename + '.tmp'
+        PickleSerializer.serialize(self.db, tmp_name, self.directory)
+        tmp_path = Path(self.directory) / tmp_name
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, Path(self.directory) / snapshot_filename)
+        self.snapshot_filename = snapshot_filename
+        
+        self._file.close()
+        with open(self.file_path, 'wb') as f:
+            PickleSerializer.write_stream_header(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self._file = self._open_for_append()
+    
+    def close(self) -> None:
+        """Зафиксировать оставшиеся записи и закрыть журнал"""
+        if not self._file.closed:
+            self.commit()
+            self._file.close()
+    
+    def __enter__(self) -> 'MutationLog':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def __repr__(self) -> str:
+        return f"MutationLog(file='{self.file_path}', pending={self._pending})"